@@ -0,0 +1,141 @@
+"""
+Benchmark of the LLM result consolidation in Evaluator.evaluate.
+
+Compares the previous row-wise merge (result_df.iterrows() with per-cell NaN
+checks and input_df.iloc per row) against llm_metric_results on a synthetic
+run, checks both produce the same eval_results, and prints the timings.
+
+    uv run python benchmarks/bench_llm_consolidation.py --rows 5000 --metrics 20
+"""
+
+import argparse
+import json
+import random
+import time
+
+import pandas as pd
+
+from evaluation.core.evaluator import json_serializer, llm_metric_results
+
+
+def iterrows_metric_results(result_df, metric_name, input_df):
+    """The consolidation loop as it was before llm_metric_results (reference only)."""
+    results = []
+    for result_idx, row in result_df.iterrows():
+        idx = int(row["original_index"])
+        score = row.get(f"{metric_name}/score")
+        try:
+            if pd.isna(score):
+                score = None
+        except (ValueError, TypeError):
+            pass
+        metric_result = {"score": score}
+
+        explanation = row.get(f"{metric_name}/explanation")
+        if explanation is not None:
+            try:
+                if pd.isna(explanation):
+                    explanation = None
+            except (ValueError, TypeError):
+                pass
+        if explanation and explanation != "":
+            if isinstance(explanation, str) and explanation.startswith("["):
+                try:
+                    explanation = json.loads(explanation)
+                except (json.JSONDecodeError, TypeError):
+                    pass
+            metric_result["explanation"] = explanation
+
+        rubric_verdicts_key = f"{metric_name}/rubric_verdicts"
+        if rubric_verdicts_key in row and row[rubric_verdicts_key] is not None:
+            metric_result["rubric_verdicts"] = row[rubric_verdicts_key]
+
+        error_key = f"{metric_name}/error"
+        if error_key in row:
+            error_val = row[error_key]
+            try:
+                if error_val is not None and not pd.isna(error_val):
+                    metric_result["error"] = str(error_val)
+            except (ValueError, TypeError):
+                if error_val is not None:
+                    metric_result["error"] = str(error_val)
+
+        if isinstance(input_df, pd.DataFrame) and result_idx < len(input_df):
+            input_row = input_df.iloc[result_idx]
+            input_data = {}
+            for col in input_df.columns:
+                val = input_row[col]
+                if isinstance(val, str) and len(val) > 500:
+                    input_data[col] = val[:500] + "... [truncated]"
+                elif isinstance(val, (list, dict)):
+                    input_data[col] = val
+                elif val is not None:
+                    try:
+                        if not pd.isna(val):
+                            input_data[col] = val
+                    except (ValueError, TypeError):
+                        input_data[col] = val
+            if input_data:
+                metric_result["input"] = input_data
+        results.append((idx, metric_result))
+    return results
+
+
+def synthetic_results(rows: int, metrics: int, seed: int = 0):
+    """(result_df, metric_name, input_df) per metric, shaped like _run_judge_tasks output."""
+    rng = random.Random(seed)
+    input_df = pd.DataFrame({
+        "prompt": [f"question {i} " + "x" * rng.randint(50, 1200) for i in range(rows)],
+        "response": [None if i % 17 == 0 else f"answer {i} " + "y" * rng.randint(50, 900) for i in range(rows)],
+        "tool_calls": [[{"name": "lookup", "args": {"id": i}}] for i in range(rows)],
+        "reference": [float("nan") if i % 5 == 0 else f"ref {i}" for i in range(rows)],
+    })
+    all_results = []
+    for m in range(metrics):
+        name = f"metric_{m}"
+        result_df = pd.DataFrame({
+            "original_index": range(rows),
+            f"{name}/score": [float("nan") if rng.random() < 0.05 else float(rng.randint(1, 5)) for _ in range(rows)],
+            f"{name}/explanation": [
+                "" if i % 11 == 0 else ('["claim", "supported"]' if m % 4 == 0 else f"because {i}")
+                for i in range(rows)
+            ],
+            f"{name}/error": [("Deadline exceeded" if rng.random() < 0.02 else None) for _ in range(rows)],
+        })
+        all_results.append((result_df, name, input_df))
+    return all_results
+
+
+def consolidate(all_results, merge, rows: int):
+    eval_results_list = [{} for _ in range(rows)]
+    for result_df, metric_name, input_df in all_results:
+        for idx, metric_result in merge(result_df, metric_name, input_df):
+            if idx < len(eval_results_list):
+                eval_results_list[idx][metric_name] = metric_result
+    return [json.dumps(r, default=json_serializer) for r in eval_results_list]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--metrics", type=int, default=20)
+    args = parser.parse_args()
+
+    all_results = synthetic_results(args.rows, args.metrics)
+    timings = {}
+    outputs = {}
+    for label, merge in [("iterrows", iterrows_metric_results), ("columnar", llm_metric_results)]:
+        start = time.perf_counter()
+        outputs[label] = consolidate(all_results, merge, args.rows)
+        timings[label] = time.perf_counter() - start
+
+    if outputs["iterrows"] != outputs["columnar"]:
+        raise SystemExit("eval_results differ between the two implementations")
+    print(f"{args.rows} rows x {args.metrics} metrics")
+    for label, seconds in timings.items():
+        print(f"  {label:<9} {seconds:8.2f}s")
+    print(f"  speedup   {timings['iterrows'] / timings['columnar']:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,84 @@
 import argparse
 import asyncio
-import json
 import os
+import shutil
 import sys
 from pathlib import Path
 from datetime import datetime
 
 from evaluation.core.interactions import InteractionRunner
+from evaluation.core.journal import InteractionJournal, is_failed
+from evaluation.core.loadtest import LoadTester
 from evaluation.core.processor import InteractionProcessor
 from evaluation.core.evaluator import Evaluator
 from evaluation.core.analyzer import Analyzer
-from evaluation.core.converters import AdkHistoryConverter, TestToGoldenConverter, write_jsonl, read_jsonl
+from evaluation.core.blob_store import BLOB_FIELDS
+from evaluation.core.config import CONFIG
+from evaluation.core.converters import (
+    CONVERT_MANIFEST_FILE,
+    AdkHistoryConverter,
+    ConversionManifest,
+    TestToGoldenConverter,
+)
+from evaluation.core.parquet_store import write_parquet_from_jsonl
+
+async def _run_and_enrich(
+    runner: InteractionRunner,
+    processor: InteractionProcessor,
+    raw_journal: InteractionJournal,
+    processed_journal: InteractionJournal,
+) -> int:
+    """
+    Runs the interaction and enrichment phases as one pipeline on one event loop.
+
+    Every finished session goes straight onto an enrichment queue, so state and
+    trace fetching overlap with the sessions still talking to the agent, and
+    enriched rows are written as they complete instead of being held in memory.
+
+    Pairs already in the processed journal are skipped entirely; pairs that were
+    run but not yet enriched (in the raw journal only) are enriched without being
+    re-run. Pairs whose last run failed, e.g. cut off by the interruption being
+    resumed from, are run again. Returns the number of rows enriched.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    consumer = asyncio.create_task(processor.consume(queue, journal=processed_journal))
+    try:
+        processed_keys = processed_journal.completed_keys()
+        pending_raw = [
+            record for key, record in raw_journal.latest_records().items()
+            if key not in processed_keys and not is_failed(record)
+        ]
+        skip = processed_keys | raw_journal.completed_keys()
+        if pending_raw:
+            print(f"Enriching {len(pending_raw)} journaled interactions from an interrupted run.")
+            for record in pending_raw:
+                queue.put_nowait(record)
+
+        print("\n=== Running Interactions (enriching each as it finishes) ===")
+        try:
+            await runner.run(journal=raw_journal, skip=skip, on_record=queue.put_nowait)
+        except Exception as e:
+            print(f"Error during interaction run: {e}")
+            sys.exit(1)
+
+        queue.put_nowait(None)
+        try:
+            return await consumer
+        except Exception as e:
+            print(f"Error during processing: {e}")
+            sys.exit(1)
+    finally:
+        if not consumer.done():
+            consumer.cancel()
+            await asyncio.gather(consumer, return_exceptions=True)
+        await processor.aclose()
 
 def interact_command(args):
     """
     Handles the 'interact' command: InteractionRunner -> InteractionProcessor
+
+    Results are journaled as they finish, so an interrupted run can be continued
+    with --resume <run_dir>.
     """
     # 1. Configuration
     config = {
@@ -28,61 +92,98 @@ def interact_command(args):
         "metadata_filters": args.metadata_filters,
         "state_variables": args.state_variables,
         "skip_traces": args.skip_traces,
-        "user": args.user
+        "user": args.user,
+        "pool_size": args.pool_size,
+        "max_concurrency": args.max_concurrency,
+        "requests_per_second": args.requests_per_second,
+        "streaming": args.streaming,
+        "trace_deadline": args.trace_deadline,
+        "agents_dir": args.agents_dir
     }
 
-    # 2. Run Interactions
-    print("\n=== Step 1: Running Interactions ===")
+    # 2. Run folder (datetime-stamped, or the one being resumed)
+    if args.resume:
+        run_dir = args.resume
+        if not os.path.isdir(run_dir):
+            print(f"Error: Run folder to resume not found: {run_dir}")
+            sys.exit(1)
+    else:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        run_dir = os.path.join(args.results_dir, timestamp)
+    raw_dir = os.path.join(run_dir, "raw")
+    os.makedirs(raw_dir, exist_ok=True)
+
+    # Using JSONL instead of CSV to avoid serialization issues with nested JSON.
+    # Raw runner rows are journaled as-is so they can be re-enriched on resume;
+    # enriched rows are appended to the output file as soon as they are ready.
+    output_path = os.path.join(raw_dir, f"processed_interaction_{args.app_name}.jsonl")
+    raw_journal = InteractionJournal(os.path.join(raw_dir, f"interaction_journal_{args.app_name}.jsonl"))
+    processed_journal = InteractionJournal(output_path, parse_json_strings=True, blob_fields=BLOB_FIELDS)
+
+    # 3 + 4. Run Interactions and Process/Enrich Data as one pipeline on the same
+    # event loop, so the processor can reuse the runner's async client and its pool.
     runner = InteractionRunner(config)
-    
-    # We need to run async code here
-    try:
-        raw_df = asyncio.run(runner.run())
-    except Exception as e:
-        print(f"Error during interaction run: {e}")
-        sys.exit(1)
+    processor = InteractionProcessor(config, agent_client=runner.agent_client)
+    enriched_count = asyncio.run(_run_and_enrich(runner, processor, raw_journal, processed_journal))
 
-    if raw_df.empty:
+    if not enriched_count and not os.path.exists(output_path):
         print("No interactions were run.")
         sys.exit(0)
+    if not enriched_count:
+        print("Nothing left to run; every interaction is already journaled.")
 
-    # 3. Process/Enrich Data
-    print("\n=== Step 2: Processing & Enriching Logs ===")
-    processor = InteractionProcessor(config)
-    try:
-        enriched_df = asyncio.run(processor.process(raw_df))
-    except Exception as e:
-        print(f"Error during processing: {e}")
-        sys.exit(1)
-
-    # 4. Save Output as JSONL (in datetime-stamped folder structure)
-    # Using JSONL instead of CSV to avoid serialization issues with nested JSON
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    run_dir = os.path.join(args.results_dir, timestamp)
-    raw_dir = os.path.join(run_dir, "raw")
-    os.makedirs(raw_dir, exist_ok=True)
+    # Rows of failed runs that were run again are replaced by their latest row
+    replaced = processed_journal.compact()
+    if replaced:
+        print(f"Replaced {replaced} rows of failed runs with their re-run results.")
 
-    output_path = os.path.join(raw_dir, f"processed_interaction_{args.app_name}.jsonl")
+    if args.format == "parquet":
+        # The JSONL journal stays the source of truth (it is what --resume appends to)
+        parquet_path = os.path.splitext(output_path)[0] + ".parquet"
+        write_parquet_from_jsonl(output_path, parquet_path)
+        output_path = parquet_path
 
-    # Convert DataFrame to list of dicts and write as JSONL
-    records = enriched_df.to_dict(orient='records')
-    # Parse JSON strings back to dicts for clean JSONL output
-    for record in records:
-        for key, value in record.items():
-            if isinstance(value, str):
-                try:
-                    parsed = json.loads(value)
-                    if isinstance(parsed, (dict, list)):
-                        record[key] = parsed
-                except (json.JSONDecodeError, TypeError):
-                    pass
-
-    write_jsonl(records, output_path)
     print(f"\nSUCCESS: Enriched data saved to: {output_path}")
     print(f"Run folder: {run_dir}")
     print("\nTo evaluate, run:")
     print(f"agent-eval evaluate --interaction-file {output_path} --metrics-files <metrics.json> --results-dir {run_dir}")
 
+def loadtest_command(args):
+    """
+    Handles the 'loadtest' command: sustained closed-loop or open-loop load using
+    the golden questions as the workload mix.
+    """
+    config = {
+        "app_name": args.app_name,
+        "questions_file": args.questions_file,
+        "base_url": args.base_url,
+        "user_id": args.user_id,
+        "num_questions": args.num_questions,
+        "metadata_filters": args.metadata_filters,
+        "state_variables": args.state_variables,
+        "user": args.user,
+        "pool_size": args.pool_size,
+        "requests_per_second": args.requests_per_second,
+        "streaming": args.streaming,
+        "duration": args.duration,
+        "concurrency": args.concurrency,
+        "arrival_rate": args.arrival_rate,
+        "seed": args.seed,
+    }
+
+    try:
+        tester = LoadTester(config)
+        report = asyncio.run(tester.run())
+    except Exception as e:
+        print(f"Error during load test: {e}")
+        sys.exit(1)
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    run_dir = os.path.join(args.results_dir, timestamp)
+    tester.write_report(report, run_dir)
+    print(f"\nSUCCESS: Load test report saved to: {os.path.join(run_dir, 'loadtest_summary.json')}")
+    print(f"Latency vs load curve: {os.path.join(run_dir, 'loadtest_curve.csv')}")
+
 def evaluate_command(args):
     """
     Handles the 'evaluate' command: Evaluator
@@ -92,7 +193,10 @@ def evaluate_command(args):
     config = {
         "metric_filters": None, # Could add arg for this
         "input_label": args.input_label,
-        "test_description": args.test_description
+        "test_description": args.test_description,
+        "output_format": args.format,
+        "judge_cache_dir": None if args.no_judge_cache else (args.judge_cache_dir or CONFIG.JUDGE_CACHE_DIR),
+        "resume": args.resume,
     }
     
     # Parse metric filters if provided
@@ -144,14 +248,26 @@ def convert_command(args):
     """
     Handles the 'convert' command: AdkHistoryConverter
     Outputs JSONL format for clean handling of nested JSON data.
+
+    History files are converted on a process pool and their records streamed to
+    the output as each file finishes. Files recorded in the output directory's
+    conversion manifest are skipped unless --all is given.
     """
     print("\n=== Converting ADK History to Dataset ===")
 
     try:
         converter = AdkHistoryConverter(args.agent_dir, args.questions_file)
-        records = converter.run()
+        files = converter.history_files()
+        manifest = ConversionManifest(os.path.join(args.output_dir, CONVERT_MANIFEST_FILE))
+        pending = files if args.all else [f for f in files if not manifest.is_converted(f)]
+        skipped = len(files) - len(pending)
+        if skipped:
+            print(f"Skipping {skipped} history files already converted (use --all to convert them again).")
 
-        if not records:
+        if not pending:
+            if skipped:
+                # Keeps the mtimes of touched-but-unchanged files
+                manifest.save()
             print("No history found to convert.")
             return
 
@@ -161,20 +277,33 @@ def convert_command(args):
         raw_dir = os.path.join(run_dir, "raw")
         os.makedirs(raw_dir, exist_ok=True)
 
-        # Auto-name output if not provided - now using .jsonl extension
+        # Auto-name output if not provided - now using .jsonl (or .parquet) extension
+        extension = f".{args.format}"
         if not args.output_file:
-            output_path = os.path.join(raw_dir, f"processed_interaction_sim.jsonl")
+            output_path = os.path.join(raw_dir, f"processed_interaction_sim{extension}")
         else:
-            # Ensure .jsonl extension
+            # Ensure the extension matches the format
             output_file = args.output_file
-            if not output_file.endswith('.jsonl'):
-                output_file = output_file.replace('.csv', '.jsonl')
-                if not output_file.endswith('.jsonl'):
-                    output_file += '.jsonl'
+            if not output_file.endswith(extension):
+                stem, ext = os.path.splitext(output_file)
+                output_file = (stem if ext in (".csv", ".jsonl", ".parquet") else output_file) + extension
             output_path = os.path.join(raw_dir, output_file)
 
-        write_jsonl(records, output_path)
-        print(f"SUCCESS: Converted {len(records)} interactions to: {output_path}")
+        # Records are streamed to JSONL; Parquet output is streamed from it at the
+        # end, after which the intermediate JSONL is removed
+        jsonl_path = os.path.splitext(output_path)[0] + ".jsonl"
+        print(f"Converting {len(pending)} history files with {args.workers} workers...")
+        count = converter.convert(pending, jsonl_path, manifest=manifest, workers=args.workers)
+
+        if not count:
+            shutil.rmtree(run_dir)
+            print("No history found to convert.")
+            return
+
+        if args.format == "parquet":
+            write_parquet_from_jsonl(jsonl_path, output_path)
+            os.remove(jsonl_path)
+        print(f"SUCCESS: Converted {count} interactions to: {output_path}")
         print(f"Run folder: {run_dir}")
         print("\nTo evaluate, run:")
         print(f"agent-eval evaluate --interaction-file {output_path} --metrics-files <metrics.json> --results-dir {run_dir}")
@@ -220,8 +349,37 @@ def main():
     interact_parser.add_argument("--filter", action="append", dest="metadata_filters", help="Metadata filters (key:val).")
     interact_parser.add_argument("--state", action="append", dest="state_variables", help="State variables (key:val).")
     interact_parser.add_argument("--user", default=os.environ.get("USER"), help="Operator username.")
+    interact_parser.add_argument("--pool-size", type=int, default=10, help="Max keep-alive HTTP connections to the agent.")
+    interact_parser.add_argument("--max-concurrency", type=int, default=10, help="Max agent calls in flight at once (turns are interleaved across sessions).")
+    interact_parser.add_argument("--requests-per-second", type=float, help="Cap on HTTP requests per second to the agent (token bucket).")
+    interact_parser.add_argument("--streaming", action="store_true", help="Use /run_sse and record time-to-first-token latencies.")
+    interact_parser.add_argument("--trace-deadline", type=float, default=30.0, help="Seconds to poll for a session trace before giving up.")
+    interact_parser.add_argument("--agents-dir", help="Run the agent in-process from this ADK agents directory and capture spans directly (ignores --base-url).")
+    interact_parser.add_argument("--resume", metavar="RUN_DIR", help="Continue an interrupted run in this run folder, skipping journaled question/run pairs.")
+    interact_parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl", help="Output format for processed interactions (parquet also keeps the JSONL journal).")
     interact_parser.set_defaults(func=interact_command)
 
+    # --- Command: loadtest ---
+    loadtest_parser = subparsers.add_parser("loadtest", help="Drive sustained load against a live agent and report latency/throughput.")
+    loadtest_parser.add_argument("--app-name", required=True, help="Name of the agent application.")
+    loadtest_parser.add_argument("--questions-file", required=True, help="Path to the Golden Dataset JSON (workload mix).")
+    loadtest_parser.add_argument("--base-url", default="http://localhost:8080", help="Agent API URL.")
+    loadtest_parser.add_argument("--user-id", default="eval_user", help="Session User ID.")
+    loadtest_parser.add_argument("--results-dir", default="results", help="Directory for outputs.")
+    loadtest_parser.add_argument("--num-questions", type=int, default=-1, help="Limit number of questions in the mix.")
+    loadtest_parser.add_argument("--filter", action="append", dest="metadata_filters", help="Metadata filters (key:val).")
+    loadtest_parser.add_argument("--state", action="append", dest="state_variables", help="State variables (key:val).")
+    loadtest_parser.add_argument("--user", default=os.environ.get("USER"), help="Operator username.")
+    load_mode = loadtest_parser.add_mutually_exclusive_group(required=True)
+    load_mode.add_argument("--concurrency", type=int, nargs="+", help="Closed loop: virtual users per stage (e.g. 1 4 16).")
+    load_mode.add_argument("--arrival-rate", type=float, nargs="+", help="Open loop: new conversations per second per stage (e.g. 0.5 1 2).")
+    loadtest_parser.add_argument("--duration", type=float, default=60.0, help="Seconds per stage.")
+    loadtest_parser.add_argument("--pool-size", type=int, help="Max HTTP connections (default: highest --concurrency; unlimited with --arrival-rate).")
+    loadtest_parser.add_argument("--requests-per-second", type=float, help="Cap on HTTP requests per second to the agent (token bucket).")
+    loadtest_parser.add_argument("--streaming", action="store_true", help="Use /run_sse for every turn.")
+    loadtest_parser.add_argument("--seed", type=int, help="Seed for workload shuffling and arrival times.")
+    loadtest_parser.set_defaults(func=loadtest_command)
+
     # --- Command: evaluate ---
     eval_parser = subparsers.add_parser("evaluate", help="Run evaluation metrics on processed logs.")
     eval_parser.add_argument("--interaction-file", required=True, help="Path to processed_interaction CSV.")
@@ -230,6 +388,10 @@ def main():
     eval_parser.add_argument("--input-label", default="manual", help="Label for this run.")
     eval_parser.add_argument("--test-description", default="Automated evaluation", help="Description.")
     eval_parser.add_argument("--filter", action="append", dest="metric_filter", help="Metric filters (key:val).")
+    eval_parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="Output format for evaluation results.")
+    eval_parser.add_argument("--judge-cache-dir", help="Directory of cached LLM-judge results (default: EVAL_JUDGE_CACHE_DIR or .agent_eval_cache/judge).")
+    eval_parser.add_argument("--no-judge-cache", action="store_true", help="Send every row to the judge, ignoring and not updating the cache.")
+    eval_parser.add_argument("--resume", action="store_true", help="Reuse LLM metric results checkpointed in --results-dir by an interrupted run; only missing metrics are evaluated.")
     eval_parser.set_defaults(func=evaluate_command)
 
     # --- Command: analyze ---
@@ -253,6 +415,9 @@ def main():
     convert_parser.add_argument("--questions-file", help="Optional: Path to Golden Dataset to merge reference data.")
     convert_parser.add_argument("--output-dir", default="results", help="Directory for outputs.")
     convert_parser.add_argument("--output-file", help="Custom output filename.")
+    convert_parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl", help="Output format.")
+    convert_parser.add_argument("--workers", type=int, default=CONFIG.CONVERT_WORKERS, help="Processes converting history files in parallel (1 = no pool).")
+    convert_parser.add_argument("--all", action="store_true", help="Convert every history file, including ones already converted into --output-dir.")
     convert_parser.set_defaults(func=convert_command)
 
     # --- Command: create-dataset ---
@@ -1,17 +1,105 @@
+import asyncio
 import json
 import re
-import subprocess
 import time
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+
+from evaluation.core.credentials import CredentialProvider
+from evaluation.core.rate_limiter import TokenBucket
+from evaluation.core.span_index import (
+    F_AGENT_RUN,
+    F_HTTP_REQUEST,
+    F_LLM_CALL,
+    F_TIMED,
+    F_TOOL_CALL,
+    F_TOOL_RESPONSE,
+    HTTP_REQUEST,
+    SPAN_KINDS,
+    SpanIndex,
+)
+from evaluation.core.trace_fetcher import DEFAULT_TRACE_DEADLINE, SessionSpanCollector, TraceFetcher
+
+DEFAULT_POOL_SIZE = 10
+
+
+class SseTurnRecorder:
+    """
+    Consumes the Server-Sent Events of one /run_sse turn and records user-perceived latency.
+
+    Feed it raw response lines as they arrive; it collects the decoded events and
+    timestamps the first event, the first user-visible text and every gap between
+    consecutive events.
+    """
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self._start = time.perf_counter()
+        self._first_event: Optional[float] = None
+        self._first_text: Optional[float] = None
+        self._last_event: Optional[float] = None
+        self._gaps: List[float] = []
+
+    def feed(self, line: str) -> None:
+        """Processes one line of the event stream. Non-data lines are ignored."""
+        if not line.startswith("data:"):
+            return
+        data = line[len("data:"):].strip()
+        if not data:
+            return
+        now = time.perf_counter()
+        event = json.loads(data)
+        if isinstance(event, dict) and "error" in event and len(event) == 1:
+            raise RuntimeError(f"Agent stream failed: {event['error']}")
+
+        if self._first_event is None:
+            self._first_event = now
+        else:
+            self._gaps.append(now - self._last_event)
+        self._last_event = now
+        if self._first_text is None and self._has_visible_text(event):
+            self._first_text = now
+        self.events.append(event)
+
+    @staticmethod
+    def _has_visible_text(event: Dict[str, Any]) -> bool:
+        """True if the event carries non-thought text the user would see."""
+        content = event.get("content") if isinstance(event, dict) else None
+        if not isinstance(content, dict):
+            return False
+        return any(
+            isinstance(part, dict) and part.get("text") and not part.get("thought")
+            for part in content.get("parts") or []
+        )
+
+    def latency(self) -> Dict[str, Any]:
+        """Returns the latency summary for the turn (seconds, relative to request start)."""
+        end = time.perf_counter()
+
+        def since_start(t: Optional[float]) -> Optional[float]:
+            return round(t - self._start, 4) if t is not None else None
+
+        return {
+            "time_to_first_event_seconds": since_start(self._first_event),
+            "time_to_first_text_seconds": since_start(self._first_text),
+            "total_seconds": round(end - self._start, 4),
+            "event_count": len(self.events),
+            "inter_event_gaps_seconds": [round(g, 4) for g in self._gaps],
+        }
 
 
 class AgentClient:
     """
     A client for interacting with the Agent service.
     Encapsulates session creation, message sending, state retrieval, and trace analysis.
+
+    Each client owns a pooled, keep-alive HTTP session, so one instance should be
+    shared by every caller talking to the same agent. Call close() (or use the
+    client as a context manager) to release the pooled connections.
     """
 
     def __init__(
@@ -20,6 +108,9 @@ class AgentClient:
         app_name: str,
         user_id: str = "eval_user",
         token: Optional[str] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        trace_deadline: float = DEFAULT_TRACE_DEADLINE,
+        credentials: Optional[CredentialProvider] = None,
     ):
         """
         Initialize the AgentClient.
@@ -28,48 +119,62 @@ class AgentClient:
             base_url: The base URL of the agent service.
             app_name: The name of the application/agent.
             user_id: The user ID to associate with sessions.
-            token: Optional gcloud identity token. If not provided, it will be fetched using gcloud.
+            token: Optional fixed identity token. If not provided, one is taken from `credentials`.
+            pool_size: Maximum number of keep-alive connections kept open to the agent.
+            trace_deadline: Seconds to keep polling for a session trace before giving up.
+            credentials: Token cache to use; defaults to the process-wide CredentialProvider.
         """
         self.base_url = base_url.rstrip("/")
         self.app_name = app_name
         self.user_id = user_id
         self._token = token
+        self.credentials = credentials or CredentialProvider.default()
+        self.pool_size = pool_size
+        self.trace_fetcher = TraceFetcher(self.base_url, app_name, deadline=trace_deadline)
+        self._http = self._build_http_session(pool_size)
+
+    def _build_http_session(self, pool_size: int) -> requests.Session:
+        """Builds a requests.Session whose connection pool is sized for concurrent callers."""
+        http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        http.mount("http://", adapter)
+        http.mount("https://", adapter)
+        return http
+
+    def close(self) -> None:
+        """Closes the pooled HTTP connections."""
+        self._http.close()
+
+    def __enter__(self) -> "AgentClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     @property
     def token(self) -> Optional[str]:
         """Returns the current token, fetching it if necessary. Returns None for localhost."""
         if self._is_localhost():
             return None
-        if not self._token:
-            self._token = self._fetch_gcloud_token()
-        return self._token
+        return self._token or self.credentials.get_token(self.base_url)
 
     def _is_localhost(self) -> bool:
         """Check if the base_url is localhost (no auth needed)."""
         return "localhost" in self.base_url or "127.0.0.1" in self.base_url
 
-    def _fetch_gcloud_token(self) -> str:
-        """Fetches the gcloud identity token from the environment."""
-        try:
-            token = subprocess.check_output(
-                ["gcloud", "auth", "print-identity-token"], text=True
-            ).strip()
-            return token
-        except (subprocess.CalledProcessError, FileNotFoundError) as e:
-            raise RuntimeError(
-                f"Error getting gcloud token: {e}. "
-                "Ensure you are logged in with 'gcloud auth login'."
-            ) from e
-
     def _get_headers(self) -> Dict[str, str]:
         """Returns the headers for API requests. Skips auth for localhost."""
+        return self._headers_with_token(self.token)
+
+    @staticmethod
+    def _headers_with_token(token: Optional[str]) -> Dict[str, str]:
         headers = {
             "accept": "application/json",
             "Content-Type": "application/json",
         }
-        # Only add Authorization header for non-localhost URLs
-        if not self._is_localhost() and self.token:
-            headers["Authorization"] = f"Bearer {self.token}"
+        # token is None for localhost URLs
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
         return headers
 
     def create_session(self, **session_data) -> str:
@@ -99,12 +204,23 @@ class AgentClient:
         Args:
             session_id: The current session ID.
             question: The user's question.
+            streaming: If True, uses the /run_sse endpoint and consumes events incrementally.
 
         Returns:
-            The agent's response payload.
+            The agent's response payload (the list of events).
         """
+        if streaming:
+            return self.stream_interaction(session_id, question)["events"]
+
         url = f"{self.base_url}/run"
-        payload = {
+        payload = self._run_payload(session_id, question, streaming=False)
+
+        print("Sending question to agent...")
+        return self._make_request("POST", url, json=payload)
+
+    def _run_payload(self, session_id: str, question: str, streaming: bool) -> Dict[str, Any]:
+        """Builds the request body shared by /run and /run_sse."""
+        return {
             "app_name": self.app_name,
             "user_id": self.user_id,
             "session_id": session_id,
@@ -112,8 +228,40 @@ class AgentClient:
             "streaming": streaming,
         }
 
-        print("Sending question to agent...")
-        return self._make_request("POST", url, json=payload)
+    def stream_interaction(self, session_id: str, question: str) -> Dict[str, Any]:
+        """
+        Sends a question through /run_sse and records time-to-first-token latencies.
+
+        Args:
+            session_id: The current session ID.
+            question: The user's question.
+
+        Returns:
+            {"events": [...], "latency": {...}} where latency is SseTurnRecorder.latency().
+        """
+        url = f"{self.base_url}/run_sse"
+        payload = self._run_payload(session_id, question, streaming=True)
+        headers = self._get_headers()
+        headers["accept"] = "text/event-stream"
+
+        print("Streaming question to agent...")
+        retries = 3
+        delay = 1
+        for i in range(retries):
+            recorder = SseTurnRecorder()
+            try:
+                with self._http.post(url, headers=headers, json=payload, stream=True) as response:
+                    response.raise_for_status()
+                    for line in response.iter_lines(decode_unicode=True):
+                        recorder.feed(line)
+                return {"events": recorder.events, "latency": recorder.latency()}
+            except requests.exceptions.RequestException as e:
+                # Only retry if nothing was consumed; a partial turn cannot be replayed safely
+                if recorder.events or i == retries - 1:
+                    raise
+                print(f"Stream failed with {e}. Retrying in {delay} seconds...")
+                time.sleep(delay)
+                delay *= 2
 
     def get_session_state(self, session_id: str) -> Dict[str, Any]:
         """
@@ -131,7 +279,10 @@ class AgentClient:
 
     def get_session_trace(self, session_id: str) -> Dict[str, Any]:
         """
-        Get the session trace. Tries multiple endpoints.
+        Get the session trace, polling until it is ready or the trace deadline passes.
+
+        Each poll tries the candidate trace routes (only the remembered one once
+        the server is known); 404s and empty bodies mean "not ready yet".
 
         Args:
             session_id: Session ID to retrieve trace for.
@@ -142,25 +293,28 @@ class AgentClient:
         Raises:
             RuntimeError: If trace cannot be retrieved.
         """
-        urls = [
-            f"{self.base_url}/debug/trace/session/{session_id}",
-            f"{self.base_url}/apps/{self.app_name}/sessions/{session_id}/trace",
-        ]
-
-        for url in urls:
-            try:
-                # We use a custom retry loop here because of the 404/empty check logic
-                # which is specific to traces being ready.
-                trace = self._make_request_with_custom_retry(url)
+        headers = self._get_headers()
+        last_error = None
+        for delay in self.trace_fetcher.poll_delays():
+            time.sleep(delay)
+            for template, url in self.trace_fetcher.candidates(session_id):
+                try:
+                    response = self._http.get(url, headers=headers)
+                    if response.status_code == 404:
+                        continue
+                    response.raise_for_status()
+                    self.trace_fetcher.remember(template)
+                    trace = response.json()
+                except requests.exceptions.RequestException as e:
+                    last_error = e
+                    continue
                 if trace:
                     print(f"[SUCCESS] Retrieving [TRACE] for session {session_id}!")
                     return trace
-            except Exception as e:
-                print(f"Failed to get trace from {url}: {e}")
-                continue
 
         raise RuntimeError(
-            f"Failed to retrieve trace for session {session_id} after trying all URLs."
+            f"Failed to retrieve trace for session {session_id} within "
+            f"{self.trace_fetcher.deadline}s" + (f": {last_error}" if last_error else ".")
         )
 
     def _make_request(self, method: str, url: str, **kwargs) -> Any:
@@ -174,7 +328,7 @@ class AgentClient:
         delay = 1
         for i in range(retries):
             try:
-                response = requests.request(method, url, headers=headers, **kwargs)
+                response = self._http.request(method, url, headers=headers, **kwargs)
                 response.raise_for_status()
                 return response.json()
             except requests.exceptions.RequestException as e:
@@ -185,188 +339,105 @@ class AgentClient:
                 else:
                     raise
 
-    def _make_request_with_custom_retry(self, url: str) -> Any:
-        """Specific retry logic for traces which might return 404 or empty initially."""
-        headers = self._get_headers()
-        retries = 5
-        delay = 1
-        for i in range(retries):
-            try:
-                response = requests.get(url, headers=headers)
-                if response.status_code == 404:
-                    if i < retries - 1:
-                        time.sleep(delay)
-                        delay *= 2
-                        continue
-                    else:
-                        raise requests.exceptions.HTTPError(f"404 Not Found: {url}")
-
-                response.raise_for_status()
-                data = response.json()
-                if data:
-                    return data
-                print(f"Trace empty, retrying in {delay} seconds...")
-            except requests.exceptions.RequestException:
-                if i < retries - 1:
-                    time.sleep(delay)
-                    delay *= 2
-                else:
-                    raise
-            time.sleep(delay)
-            delay *= 2
-        raise RuntimeError("Retries exhausted")
-
     # --- Static Utility Methods for Analysis ---
 
     @staticmethod
-    def analyze_trace_and_extract_spans(trace_data: List[Dict]) -> List[Dict]:
-        """Analyzes raw trace data to build a tree and extract classified information."""
-
-        class _SpanNode:
-            def __init__(self, span_data):
-                self.data = span_data
-                self.id = span_data.get("span_id")
-                self.parent_id = span_data.get("parent_span_id")
-                self.children = []
-
-            def add_child(self, child_node):
-                self.children.append(child_node)
-
-        def build_trace_tree(trace_data):
-            span_nodes = {}
-            for span in trace_data:
-                span_nodes[span["span_id"]] = _SpanNode(span)
-            root_nodes = []
-            for span_id, node in span_nodes.items():
-                if node.parent_id and node.parent_id in span_nodes:
-                    span_nodes[node.parent_id].add_child(node)
-                else:
-                    root_nodes.append(node)
-            return root_nodes
+    def analyze_trace_and_extract_spans(trace_data: Union[List[Dict], SpanIndex]) -> List[Dict]:
+        """Analyzes raw trace data (or its SpanIndex) to build a tree and extract classified information."""
+        index = trace_data if isinstance(trace_data, SpanIndex) else SpanIndex(trace_data)
 
-        def extract_span_information(span_node):
-            span_data = span_node.data
-            name = span_data.get("name", "")
+        def extract_span_information(row):
+            span_data = index.spans[row]
             attributes = span_data.get("attributes", {})
-            start_time = span_data.get("start_time", 0)
-            end_time = span_data.get("end_time", 0)
-            duration_ms = (
-                (end_time - start_time) / 1_000_000 if start_time and end_time else 0
-            )
+            flags = index.flags[row]
 
             extracted_info = {
-                "name": name,
+                "name": span_data.get("name", ""),
                 "span_id": span_data.get("span_id"),
                 "parent_span_id": span_data.get("parent_span_id"),
-                "duration_ms": round(duration_ms, 2),
-                "type": "OTHER",
+                "duration_ms": round(index.duration_ms[row], 2) if flags & F_TIMED else 0,
+                "type": SPAN_KINDS[index.kind[row]],
                 "details": {},
             }
+            details = extracted_info["details"]
 
-            if "agent_run" in name or "invoke_agent" in name:
-                extracted_info["type"] = "AGENT_RUN"
-                try:
-                    # Support "agent_run [name]", "agent_run[name]", "invoke_agent name"
-                    if "[" in name and "]" in name:
-                        extracted_info["details"]["agent_name"] = re.search(
-                            r"\[(.*)\]", name
-                        ).group(1)
-                    else:
-                        # Assume "invoke_agent name" or similar
-                        parts = name.split(maxsplit=1)
-                        if len(parts) > 1:
-                            extracted_info["details"]["agent_name"] = parts[1].strip()
-                        else:
-                            extracted_info["details"]["agent_name"] = "unknown"
-                except (IndexError, AttributeError):
-                    extracted_info["details"]["agent_name"] = "unknown"
-            elif "tool_call" in name or "execute_tool" in name:
-                extracted_info["type"] = "TOOL_CALL"
-                tool_name = attributes.get("gen_ai.tool.name")
-                if not tool_name:
-                    try:
-                        tool_name = re.search(r"\[(.*)\]", name).group(1)
-                    except (IndexError, AttributeError):
-                        # Fallback for "execute_tool name"
-                        tool_name = name.split(" ")[-1] if " " in name else "unknown"
-
-                extracted_info["details"]["tool_name"] = tool_name
-
+            if flags & F_AGENT_RUN:
+                details["agent_name"] = index.agent_name[row]
+            elif flags & F_TOOL_CALL:
+                details["tool_name"] = index.tool_name[row]
                 if "gcp.vertex.agent.tool_call_args" in attributes:
                     try:
-                        extracted_info["details"]["arguments"] = json.loads(
-                            attributes["gcp.vertex.agent.tool_call_args"]
-                        )
+                        details["arguments"] = index.payload(row, "gcp.vertex.agent.tool_call_args")
                     except (json.JSONDecodeError, TypeError):
-                        extracted_info["details"]["arguments"] = attributes[
-                            "gcp.vertex.agent.tool_call_args"
-                        ]
-
-            # Check if it's a tool response (sometimes unified in execute_tool span)
-            if "tool_response" in name or (
-                "execute_tool" in name
-                and "gcp.vertex.agent.tool_response" in attributes
-            ):
-                if (
-                    extracted_info["type"] == "OTHER"
-                ):  # Don't overwrite if already classified as call
-                    extracted_info["type"] = "TOOL_RESPONSE"
+                        details["arguments"] = attributes["gcp.vertex.agent.tool_call_args"]
 
+            if flags & F_TOOL_RESPONSE:
                 if "gcp.vertex.agent.tool_response" in attributes:
                     try:
-                        tool_response = json.loads(
-                            attributes["gcp.vertex.agent.tool_response"]
-                        )
-                        extracted_info["details"]["response"] = tool_response
+                        details["response"] = index.tool_response(row)
                     except (json.JSONDecodeError, TypeError):
-                        extracted_info["details"]["raw_response"] = attributes[
-                            "gcp.vertex.agent.tool_response"
-                        ]
+                        details["raw_response"] = attributes["gcp.vertex.agent.tool_response"]
 
-            elif name == "call_llm":
-                extracted_info["type"] = "LLM_CALL"
+            elif flags & F_LLM_CALL:
                 if "gen_ai.request.model" in attributes:
-                    extracted_info["details"]["model"] = attributes[
-                        "gen_ai.request.model"
-                    ]
-                if "gcp.vertex.agent.llm_request" in attributes:
-                    try:
-                        extracted_info["details"]["request"] = json.loads(
-                            attributes["gcp.vertex.agent.llm_request"]
-                        )
-                    except (json.JSONDecodeError, TypeError):
-                        pass
-                if "gcp.vertex.agent.llm_response" in attributes:
-                    try:
-                        extracted_info["details"]["response"] = json.loads(
-                            attributes["gcp.vertex.agent.llm_response"]
-                        )
-                    except (json.JSONDecodeError, TypeError):
-                        pass
-
-            if "http.method" in attributes:
-                extracted_info["type"] = "HTTP_REQUEST"
-                extracted_info["details"]["method"] = attributes.get("http.method")
-                extracted_info["details"]["url"] = attributes.get("http.url")
-                extracted_info["details"]["status_code"] = attributes.get(
-                    "http.status_code"
-                )
+                    details["model"] = attributes["gen_ai.request.model"]
+                for key, field in (
+                    ("gcp.vertex.agent.llm_request", "request"),
+                    ("gcp.vertex.agent.llm_response", "response"),
+                ):
+                    if key in attributes:
+                        try:
+                            details[field] = index.payload(row, key)
+                        except (json.JSONDecodeError, TypeError):
+                            pass
+
+            if flags & F_HTTP_REQUEST:
+                details["method"] = attributes.get("http.method")
+                details["url"] = attributes.get("http.url")
+                details["status_code"] = attributes.get("http.status_code")
 
             return extracted_info
 
-        def traverse_and_extract(span_node):
-            extracted_info = extract_span_information(span_node)
+        def traverse_and_extract(row):
+            extracted_info = extract_span_information(row)
             extracted_info["children"] = [
-                traverse_and_extract(child) for child in span_node.children
+                traverse_and_extract(child) for child in index.children(row)
             ]
             return extracted_info
 
-        root_nodes = build_trace_tree(trace_data)
-        return [traverse_and_extract(root) for root in root_nodes]
+        return [traverse_and_extract(root) for root in index.tree_roots()]
 
     @staticmethod
-    def get_latency_from_spans(analyzed_trace: List[Dict]) -> List[Dict]:
-        """Extracts latency information from the analyzed trace."""
+    def get_latency_from_spans(analyzed_trace: Union[List[Dict], SpanIndex]) -> List[Dict]:
+        """
+        Extracts latency information from the analyzed trace.
+
+        Also accepts the trace's SpanIndex, which is walked directly instead of
+        building the analyzed tree first.
+        """
+        if isinstance(analyzed_trace, SpanIndex):
+            index = analyzed_trace
+
+            def process_row(row):
+                span = index.spans[row]
+                span_type = SPAN_KINDS[index.kind[row]]
+                name = span.get("name", "")
+                if index.kind[row] == HTTP_REQUEST:
+                    attributes = span.get("attributes", {})
+                    name = f"{attributes.get('http.method')} [{attributes.get('http.url')}]"
+                duration_ms = round(index.duration_ms[row], 2) if index.flags[row] & F_TIMED else 0
+
+                latency_info = {
+                    "name": name,
+                    "type": span_type,
+                    "duration_seconds": round(duration_ms / 1000.0, 4),
+                }
+                children = [process_row(child) for child in index.children(row)]
+                if children:
+                    latency_info["children"] = children
+                return latency_info
+
+            return [process_row(root) for root in index.tree_roots()]
 
         def process_span(span):
             span_type = span.get("type")
@@ -391,7 +462,7 @@ class AgentClient:
         return [process_span(root) for root in analyzed_trace]
 
     @staticmethod
-    def get_agent_trajectory(analyzed_trace: List[Dict]) -> List[str]:
+    def get_agent_trajectory(analyzed_trace: Union[List[Dict], SpanIndex]) -> List[str]:
         """
         Extracts the sequence of agents and tools invoked.
 
@@ -400,27 +471,22 @@ class AgentClient:
         - TOOL_CALL spans (tools and sub-agents called as tools)
         - Legacy span naming patterns
 
+        Accepts the analyzed trace or the trace's SpanIndex.
         Returns a deduplicated list showing the execution flow.
         """
         trajectory = []
         seen = set()  # Track seen items to avoid duplicates from parallel spans
 
-        def traverse(span):
-            span_type = span.get("type", "")
-            details = span.get("details", {})
-            name = span.get("name", "")
-
+        def visit(span_type, agent_name, tool_name, name):
             item = None
 
             # 1. AGENT_RUN spans - direct agent invocations
             if span_type == "AGENT_RUN":
-                agent_name = details.get("agent_name")
                 if agent_name:
                     item = f"agent:{agent_name}"
 
             # 2. TOOL_CALL spans - tools and sub-agents called as tools
             elif span_type == "TOOL_CALL":
-                tool_name = details.get("tool_name")
                 if tool_name:
                     # Check if it looks like a sub-agent (typically PascalCase with "Agent" suffix)
                     if tool_name.endswith("Agent") or tool_name == "transfer_to_agent":
@@ -439,6 +505,32 @@ class AgentClient:
                 seen.add(item)
                 trajectory.append(item)
 
+        if isinstance(analyzed_trace, SpanIndex):
+            index = analyzed_trace
+
+            def traverse_row(row):
+                kind = SPAN_KINDS[index.kind[row]]
+                visit(
+                    kind,
+                    index.agent_name[row] if kind == "AGENT_RUN" else None,
+                    index.tool_name[row] if kind == "TOOL_CALL" else None,
+                    index.spans[row].get("name", ""),
+                )
+                for child in index.children(row):
+                    traverse_row(child)
+
+            for root in index.tree_roots():
+                traverse_row(root)
+            return trajectory
+
+        def traverse(span):
+            details = span.get("details", {})
+            visit(
+                span.get("type", ""),
+                details.get("agent_name"),
+                details.get("tool_name"),
+                span.get("name", ""),
+            )
             for child in span.get("children", []):
                 traverse(child)
 
@@ -575,3 +667,274 @@ class AgentClient:
                     except (json.JSONDecodeError, TypeError):
                         continue
         return None
+
+
+class AsyncAgentClient(AgentClient):
+    """
+    Asyncio variant of AgentClient built on a pooled httpx.AsyncClient.
+
+    create_session, run_interaction, get_session_state and get_session_trace are
+    coroutines, so a single event loop can drive many concurrent sessions without
+    tying up a thread per in-flight request. Trace analysis helpers are inherited
+    unchanged from AgentClient.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        app_name: str,
+        user_id: str = "eval_user",
+        token: Optional[str] = None,
+        pool_size: Optional[int] = DEFAULT_POOL_SIZE,
+        timeout: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        trace_deadline: float = DEFAULT_TRACE_DEADLINE,
+        span_collector: Optional[SessionSpanCollector] = None,
+        credentials: Optional[CredentialProvider] = None,
+    ):
+        """
+        Initialize the AsyncAgentClient.
+
+        Args:
+            base_url: The base URL of the agent service.
+            app_name: The name of the application/agent.
+            user_id: The user ID to associate with sessions.
+            token: Optional fixed identity token. If not provided, one is taken from `credentials`.
+            pool_size: Maximum number of connections kept open to the agent. None leaves
+                it uncapped, so requests never queue in the client for a free connection.
+            timeout: Per-request timeout in seconds. None waits indefinitely, like AgentClient.
+            transport: Optional httpx transport (e.g. for tests or in-process apps).
+            rate_limiter: Optional token bucket every HTTP attempt (including retries) waits on.
+            trace_deadline: Seconds to keep polling for a session trace before giving up.
+            span_collector: Spans captured in-process; when set, traces are read from it
+                instead of the server's trace endpoint.
+            credentials: Token cache to use; defaults to the process-wide CredentialProvider.
+        """
+        self.timeout = timeout
+        self._transport = transport
+        self.rate_limiter = rate_limiter
+        self.span_collector = span_collector
+        super().__init__(
+            base_url, app_name, user_id=user_id, token=token, pool_size=pool_size,
+            trace_deadline=trace_deadline, credentials=credentials,
+        )
+
+    def _build_http_session(self, pool_size: Optional[int]) -> httpx.AsyncClient:
+        """Builds the pooled async HTTP client. HTTP/2 is negotiated when 'h2' is installed."""
+        limits = httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        )
+        return httpx.AsyncClient(
+            limits=limits,
+            timeout=httpx.Timeout(self.timeout),
+            http2=_http2_available(),
+            transport=self._transport,
+        )
+
+    def close(self) -> None:
+        raise TypeError("AsyncAgentClient must be closed with 'await client.aclose()'.")
+
+    def __enter__(self) -> "AsyncAgentClient":
+        raise TypeError("AsyncAgentClient must be used with 'async with', not 'with'.")
+
+    async def aclose(self) -> None:
+        """Closes the pooled HTTP connections."""
+        await self._http.aclose()
+
+    async def __aenter__(self) -> "AsyncAgentClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Sends one HTTP attempt, waiting on the shared rate limiter first."""
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+        return await self._http.request(method, url, **kwargs)
+
+    @staticmethod
+    def _retry_after_seconds(error: httpx.HTTPError) -> Optional[float]:
+        """Returns the server's Retry-After hint for 429/503 responses, if any."""
+        response = getattr(error, "response", None) if isinstance(error, httpx.HTTPStatusError) else None
+        if response is None or response.status_code not in (429, 503):
+            return None
+        try:
+            return float(response.headers.get("Retry-After", ""))
+        except ValueError:
+            return None
+
+    async def _get_headers_async(self) -> Dict[str, str]:
+        """Like _get_headers, but mints a missing token off the event loop."""
+        if self._is_localhost():
+            return self._headers_with_token(None)
+        token = self._token or await self.credentials.get_token_async(self.base_url)
+        return self._headers_with_token(token)
+
+    async def create_session(self, **session_data) -> str:
+        """
+        Creates a new session. session_data is optional.
+        """
+        session_id = f"session_{uuid.uuid4()}"
+        url = f"{self.base_url}/apps/{self.app_name}/users/{self.user_id}/sessions/{session_id}"
+        payload = session_data if session_data else None
+
+        print(f"Creating session: {session_id}...")
+        await self._make_request("POST", url, json=payload)
+
+        print("Session created successfully.")
+        return session_id
+
+    async def run_interaction(
+        self, session_id: str, question: str, streaming: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Sends a question to the agent.
+
+        Args:
+            session_id: The current session ID.
+            question: The user's question.
+            streaming: If True, uses the /run_sse endpoint and consumes events incrementally.
+
+        Returns:
+            The agent's response payload (the list of events).
+        """
+        if streaming:
+            return (await self.stream_interaction(session_id, question))["events"]
+
+        url = f"{self.base_url}/run"
+        payload = self._run_payload(session_id, question, streaming=False)
+
+        print("Sending question to agent...")
+        return await self._make_request("POST", url, json=payload)
+
+    async def stream_interaction(self, session_id: str, question: str) -> Dict[str, Any]:
+        """
+        Sends a question through /run_sse and records time-to-first-token latencies.
+
+        Args:
+            session_id: The current session ID.
+            question: The user's question.
+
+        Returns:
+            {"events": [...], "latency": {...}} where latency is SseTurnRecorder.latency().
+        """
+        url = f"{self.base_url}/run_sse"
+        payload = self._run_payload(session_id, question, streaming=True)
+        headers = await self._get_headers_async()
+        headers["accept"] = "text/event-stream"
+
+        print("Streaming question to agent...")
+        retries = 3
+        delay = 1
+        for i in range(retries):
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            recorder = SseTurnRecorder()
+            try:
+                async with self._http.stream("POST", url, headers=headers, json=payload) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        recorder.feed(line)
+                return {"events": recorder.events, "latency": recorder.latency()}
+            except httpx.HTTPError as e:
+                # Only retry if nothing was consumed; a partial turn cannot be replayed safely
+                if recorder.events or i == retries - 1:
+                    raise
+                wait = max(delay, self._retry_after_seconds(e) or 0)
+                print(f"Stream failed with {e}. Retrying in {wait} seconds...")
+                await asyncio.sleep(wait)
+                delay *= 2
+
+    async def get_session_state(self, session_id: str) -> Dict[str, Any]:
+        """
+        Retrieves the final state of a session.
+
+        Args:
+            session_id: The session ID.
+
+        Returns:
+            The session state dictionary.
+        """
+        url = f"{self.base_url}/apps/{self.app_name}/users/{self.user_id}/sessions/{session_id}"
+        print("Retrieving final session state...")
+        return await self._make_request("GET", url)
+
+    async def get_session_trace(self, session_id: str) -> Dict[str, Any]:
+        """
+        Get the session trace, polling until it is ready or the trace deadline passes.
+
+        With a span_collector (in-process agent) the spans are returned directly
+        and no HTTP request is made.
+
+        Args:
+            session_id: Session ID to retrieve trace for.
+
+        Returns:
+            The trace dictionary.
+
+        Raises:
+            RuntimeError: If trace cannot be retrieved.
+        """
+        if self.span_collector is not None:
+            trace = self.span_collector.get_session_trace(session_id)
+            if not trace:
+                raise RuntimeError(f"No spans were captured for session {session_id}.")
+            print(f"[SUCCESS] Retrieving [TRACE] for session {session_id}!")
+            return trace
+
+        headers = await self._get_headers_async()
+        last_error = None
+        for delay in self.trace_fetcher.poll_delays():
+            await asyncio.sleep(delay)
+            for template, url in self.trace_fetcher.candidates(session_id):
+                try:
+                    response = await self._send("GET", url, headers=headers)
+                    if response.status_code == 404:
+                        continue
+                    response.raise_for_status()
+                    self.trace_fetcher.remember(template)
+                    trace = response.json()
+                except httpx.HTTPError as e:
+                    last_error = e
+                    continue
+                if trace:
+                    print(f"[SUCCESS] Retrieving [TRACE] for session {session_id}!")
+                    return trace
+
+        raise RuntimeError(
+            f"Failed to retrieve trace for session {session_id} within "
+            f"{self.trace_fetcher.deadline}s" + (f": {last_error}" if last_error else ".")
+        )
+
+    async def _make_request(self, method: str, url: str, **kwargs) -> Any:
+        """Helper to make HTTP requests with retries."""
+        headers = await self._get_headers_async()
+        if "headers" in kwargs:
+            headers.update(kwargs.pop("headers"))
+
+        retries = 3
+        delay = 1
+        for i in range(retries):
+            try:
+                response = await self._send(method, url, headers=headers, **kwargs)
+                response.raise_for_status()
+                return response.json()
+            except httpx.HTTPError as e:
+                if i < retries - 1:
+                    wait = max(delay, self._retry_after_seconds(e) or 0)
+                    print(f"Request failed with {e}. Retrying in {wait} seconds...")
+                    await asyncio.sleep(wait)
+                    delay *= 2
+                else:
+                    raise
+
+
+def _http2_available() -> bool:
+    """Returns True if the optional 'h2' package is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
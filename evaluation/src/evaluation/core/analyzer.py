@@ -5,13 +5,37 @@ import json
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, TypedDict
+from typing import Any, Dict, Iterable, List, Optional, TypedDict, Union
 
 import pandas as pd
 from google import genai
 from google.genai.types import HttpOptions
 
 from evaluation.core.gemini_prompt_builder import GeminiAnalysisPrompter
+from evaluation.core.parquet_store import read_frame
+from evaluation.core.results_archive import ARCHIVE_INDEX_SUFFIX, ResultsArchive
+
+# Evaluation results files, in either storage format
+RESULTS_FILE_PATTERNS = ("evaluation_results_*.csv", "evaluation_results_*.parquet")
+
+# Explanations sampled per metric for the Gemini analysis prompt
+SAMPLE_EXPLANATIONS = 10
+
+# Columns read for the question-answer log; the raw trace and session state are never loaded
+LOG_COLUMNS = {
+    "question_id", "question_metadata", "user_inputs", "final_response", "trace_summary",
+    "extracted_data", "eval_results", "latency_data", "agents_evaluated",
+}
+
+
+def find_results_files(directory: Path) -> List[Path]:
+    """Returns the evaluation results files (CSV or Parquet) in a directory, not their archive indexes."""
+    return [
+        f
+        for pattern in RESULTS_FILE_PATTERNS
+        for f in directory.glob(pattern)
+        if not f.name.endswith(ARCHIVE_INDEX_SUFFIX)
+    ]
 
 
 class LogEntry(TypedDict):
@@ -58,8 +82,8 @@ class Analyzer:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
 
-    def _process_log_row(self, row: pd.Series, index: int) -> Optional[LogEntry]:
-        """Processes a single DataFrame row to extract structured log data for Markdown reporting."""
+    def _process_log_row(self, row: Union[pd.Series, Dict[str, Any]], index: int) -> Optional[LogEntry]:
+        """Processes a single results row (DataFrame row or archive record) to extract structured log data for Markdown reporting."""
         try:
             question_id = row.get("question_id", f"row_{index}")
             metadata = robust_json_loads(row.get("question_metadata", {})) or {}
@@ -102,7 +126,7 @@ class Analyzer:
 
             # ADK scores (hallucinations, safety)
             adk_scores = {}
-            for col in row.index:
+            for col in row.keys():
                 if col.startswith("adk_score."):
                     metric_name = col.replace("adk_score.", "")
                     adk_scores[metric_name] = row[col]
@@ -194,7 +218,9 @@ class Analyzer:
         metrics_md = "### Evaluation Metrics\n\n"
         for m_name, m_val in entry["eval_results"].items():
             if isinstance(m_val, dict):
-                score = m_val.get("score", "N/A")
+                score = m_val.get("score")
+                if score is None:
+                    score = "N/A"
                 score_str = f"{score:.2f}" if isinstance(score, (int, float)) else str(score)
                 expl = m_val.get("explanation", "")
                 # Truncate long explanations
@@ -217,12 +243,22 @@ class Analyzer:
         """Generates a detailed log comparing questions, reference data, and agent output."""
         print(f"\n--- Generating Question-Answer Log from {results_file} ---")
         try:
-            df = pd.read_csv(results_file)
-            print(f"Loaded {len(df)} evaluation results.")
+            archive = ResultsArchive.find(results_file)
+            if archive is not None:
+                # Rows are decoded one at a time from the indexed archive
+                rows = enumerate(archive.records())
+                print(f"Loaded {len(archive)} evaluation results from the results archive.")
+            else:
+                df = read_frame(
+                    results_file,
+                    columns=lambda col: col in LOG_COLUMNS or col.startswith("adk_score."),
+                )
+                rows = df.iterrows()
+                print(f"Loaded {len(df)} evaluation results.")
 
             log_entries = [
                 entry
-                for index, row in df.iterrows()
+                for index, row in rows
                 if (entry := self._process_log_row(row, index)) is not None
             ]
 
@@ -249,7 +285,9 @@ class Analyzer:
         """Analyzes evaluation results and returns the content for the Gemini prompt."""
         try:
             summary_data = json.loads(summary_path.read_text())
-            results_df = pd.read_csv(results_path)
+            archive = ResultsArchive.find(results_path)
+            if archive is None:
+                eval_results_column = read_frame(results_path, columns=["eval_results"])["eval_results"]
         except FileNotFoundError as e:
             print(f"Error: Input file not found: {e}")
             return None, None
@@ -264,27 +302,15 @@ class Analyzer:
              average_metrics.update(overall.get("llm_based_metrics", {}))
 
         all_explanations = {metric: [] for metric in average_metrics}
-
-        for _, row in results_df.iterrows():
-            try:
-                eval_results = robust_json_loads(row["eval_results"])
-                if not eval_results: continue
-                
-                for metric, details in eval_results.items():
-                    if (
-                        metric in all_explanations
-                        and isinstance(details, dict)
-                        and "explanation" in details
-                        and "score" in details
-                    ):
-                        all_explanations[metric].append(
-                            {
-                                "score": details["score"],
-                                "explanation": details["explanation"],
-                            }
-                        )
-            except (json.JSONDecodeError, TypeError, KeyError):
-                continue
+        if archive is not None:
+            # The index selects each metric's scored rows; only those are decoded,
+            # and reading stops once the sample is full
+            for metric in all_explanations:
+                records = archive.records(archive.select(metric))
+                eval_results_column = (record.get("eval_results") for record in records)
+                self._sample_explanations(eval_results_column, {metric: all_explanations[metric]})
+        else:
+            self._sample_explanations(eval_results_column, all_explanations)
 
         output_lines = ["--- Evaluation Analysis ---\n"]
         for metric, mean_score in average_metrics.items():
@@ -297,15 +323,46 @@ class Analyzer:
             output_lines.append(f"**Average Score:** {score_str}\n")
 
             if explanations := all_explanations.get(metric):
-                # Show first 10 explanations as a sample
+                # Show the first SAMPLE_EXPLANATIONS explanations as a sample
                 explanation_summary = "\n".join(
                     f"- [Score: {exp['score']}] {exp['explanation']}"
-                    for exp in explanations[:10]
+                    for exp in explanations[:SAMPLE_EXPLANATIONS]
                 )
                 output_lines.append(f"**Sample Explanations:**\n{explanation_summary}\n")
 
         return summary_data, "".join(output_lines)
 
+    def _sample_explanations(
+        self, eval_results_column: Iterable[Any], all_explanations: Dict[str, List[Dict[str, Any]]]
+    ) -> None:
+        """Appends up to SAMPLE_EXPLANATIONS scored explanations per metric, in row order."""
+        unfilled = {metric for metric in all_explanations}
+
+        for raw_results in eval_results_column:
+            if not unfilled:
+                break
+            try:
+                eval_results = robust_json_loads(raw_results)
+                if not eval_results: continue
+                
+                for metric, details in eval_results.items():
+                    if (
+                        metric in unfilled
+                        and isinstance(details, dict)
+                        and "explanation" in details
+                        and "score" in details
+                    ):
+                        all_explanations[metric].append(
+                            {
+                                "score": details["score"],
+                                "explanation": details["explanation"],
+                            }
+                        )
+                        if len(all_explanations[metric]) >= SAMPLE_EXPLANATIONS:
+                            unfilled.discard(metric)
+            except (json.JSONDecodeError, TypeError, KeyError):
+                continue
+
     def _discover_agent_context(self, agent_dir: Optional[Path]) -> Dict[str, str]:
         """Discovers and loads agent source code and ADK context from agent directory."""
         context = {}
@@ -504,13 +561,13 @@ class Analyzer:
     def _find_run_folder(self, results_dir: Path) -> Optional[Path]:
         """
         Find the run folder to analyze. Supports two structures:
-        1. Direct run folder: results_dir/raw/evaluation_results_*.csv
+        1. Direct run folder: results_dir/raw/evaluation_results_*.csv (or .parquet)
         2. Parent folder with timestamp subfolders: results_dir/{timestamp}/raw/...
         """
         # Check if this is a run folder (has raw/ subfolder with results)
         raw_dir = results_dir / "raw"
         if raw_dir.exists():
-            results_files = list(raw_dir.glob("evaluation_results_*.csv"))
+            results_files = find_results_files(raw_dir)
             if results_files:
                 return results_dir
 
@@ -521,12 +578,12 @@ class Analyzer:
         for subdir in subdirs:
             raw_dir = subdir / "raw"
             if raw_dir.exists():
-                results_files = list(raw_dir.glob("evaluation_results_*.csv"))
+                results_files = find_results_files(raw_dir)
                 if results_files:
                     return subdir
 
         # Legacy: Check for results directly in results_dir (old structure)
-        results_files = list(results_dir.glob("evaluation_results_*.csv"))
+        results_files = find_results_files(results_dir)
         if results_files:
             print("Note: Found legacy folder structure (no raw/ subfolder)")
             return results_dir
@@ -550,14 +607,14 @@ class Analyzer:
         # Determine paths based on folder structure
         raw_dir = run_folder / "raw"
         if raw_dir.exists():
-            results_files = list(raw_dir.glob("evaluation_results_*.csv"))
+            results_files = find_results_files(raw_dir)
         else:
             # Legacy structure
-            results_files = list(run_folder.glob("evaluation_results_*.csv"))
+            results_files = find_results_files(run_folder)
             raw_dir = run_folder  # Use run_folder for raw files in legacy mode
 
         if not results_files:
-            print(f"Error: No 'evaluation_results_*.csv' file found")
+            print(f"Error: No 'evaluation_results_*.csv' or '.parquet' file found")
             return
 
         # Sort by modification time, newest first
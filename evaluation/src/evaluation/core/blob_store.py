@@ -0,0 +1,177 @@
+import json
+import mmap
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Tuple, Union
+
+from evaluation.core.json_stream import LazyValue, json_default
+
+# Interaction fields kept in the side-car blob file instead of inline in each row
+BLOB_FIELDS = ("session_trace", "final_session_state")
+
+# Key of a blob reference: {"$blob": <blob file relative to the referencing file>, "offset": .., "length": ..}
+BLOB_REF_KEY = "$blob"
+
+# Suffix of the side-car blob file, next to the interaction file with the same stem
+BLOB_SUFFIX = ".blobs"
+
+# path -> ((inode, mtime, size) the file had when mapped, map)
+_maps: Dict[str, Tuple[Tuple[int, int, int], mmap.mmap]] = {}
+_maps_lock = threading.Lock()
+
+
+def blob_path(data_path: Union[str, Path]) -> str:
+    """Side-car blob file of an interaction file (shared by its .jsonl and .parquet forms)."""
+    return os.path.splitext(str(data_path))[0] + BLOB_SUFFIX
+
+
+def is_blob_ref(value: Any) -> bool:
+    return isinstance(value, dict) and BLOB_REF_KEY in value
+
+
+def _signature(stat: os.stat_result) -> Tuple[int, int, int]:
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _mapped(path: str, end: int = 0) -> mmap.mmap:
+    """
+    Shared read-only map of a blob file covering at least `end` bytes; the file
+    is mapped again when it has grown past the map. The file is not checked
+    for other changes here (see check_blob_file).
+    """
+    with _maps_lock:
+        cached = _maps.get(path)
+        if cached is None or len(cached[1]) < end:
+            with open(path, "rb") as f:
+                cached = _maps[path] = (_signature(os.fstat(f.fileno())), mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        return cached[1]
+
+
+def check_blob_file(path: str, referenced_from: Union[str, Path, None] = None) -> None:
+    """
+    Fails with FileNotFoundError if a blob file is missing, and drops a cached
+    map of a file replaced or rewritten since it was mapped. Call once per file
+    before reading its references.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        source = f" (referenced by {referenced_from})" if referenced_from else ""
+        raise FileNotFoundError(
+            f"Blob file {path}{source} not found; keep the {BLOB_SUFFIX} file next to the file that references it"
+        ) from None
+    with _maps_lock:
+        cached = _maps.get(path)
+        if cached is not None and cached[0] != _signature(stat):
+            del _maps[path]
+
+
+def bundle_blob_file(path: str, directory: Union[str, Path], name: str) -> str:
+    """
+    The blob file `path` as kept with the files in `directory`: the file itself
+    if it is already there, otherwise a hard link (or, across file systems, a
+    copy) named `name`, so references from `directory` stay readable when the
+    original folder is moved or deleted.
+    """
+    directory = os.path.abspath(str(directory))
+    if os.path.dirname(os.path.abspath(path)) == directory:
+        return path
+    target = os.path.join(directory, name)
+    if os.path.lexists(target):
+        os.remove(target)
+    try:
+        os.link(path, target)
+    except OSError:
+        shutil.copyfile(path, target)
+    return target
+
+
+class BlobRef(LazyValue):
+    """
+    A value stored in a side-car blob file, read on demand through a shared
+    read-only mmap of the file. Only load() decodes it; raw() hands out the
+    encoded bytes (e.g. to worker processes) without building objects.
+    """
+
+    __slots__ = ()
+
+    def raw(self) -> bytes:
+        end = self.offset + self.length
+        return _mapped(self.path, end)[self.offset:end]
+
+    def load(self) -> Any:
+        return json.loads(self.raw())
+
+    def reference(self, base_dir: Union[str, Path]) -> Dict[str, Any]:
+        """The JSON reference to this blob from a file in `base_dir`."""
+        return {BLOB_REF_KEY: os.path.relpath(self.path, base_dir), "offset": self.offset, "length": self.length}
+
+
+def open_blob_ref(value: Any, base_dir: Union[str, Path]) -> Any:
+    """A BlobRef for a reference read from a file in `base_dir`; other values are returned unchanged."""
+    if is_blob_ref(value):
+        return BlobRef(os.path.join(str(base_dir), value[BLOB_REF_KEY]), int(value["offset"]), int(value["length"]))
+    return value
+
+
+def load_blob(value: Any) -> Any:
+    """The value itself: lazy values are loaded, anything else is returned unchanged."""
+    return value.load() if isinstance(value, LazyValue) else value
+
+
+class BlobWriter:
+    """
+    Appends JSON values to a packed side-car blob file and returns references to them.
+
+    Values are written back to back without framing; a reference's offset and
+    length locate one. Call flush() before the records holding the references
+    are written, so a record never points past the data on disk. With
+    `truncate`, an existing file is replaced by a new one rather than emptied,
+    so hard links to it (see bundle_blob_file) keep their data.
+    """
+
+    def __init__(self, path: str, truncate: bool = False):
+        self.path = path
+        if truncate and os.path.lexists(path):
+            os.remove(path)
+        with _maps_lock:
+            _maps.pop(path, None)
+        self._file = open(path, "ab")
+        self._offset = self._file.seek(0, os.SEEK_END)
+
+    def put(
+        self, value: Any, base_dir: Union[str, Path], default: Callable[[Any], Any] = json_default
+    ) -> Dict[str, Any]:
+        """Writes one value (encoded with json.dumps `default`); returns its reference from a file in `base_dir`."""
+        data = json.dumps(value, ensure_ascii=False, default=default).encode("utf-8")
+        offset = self._offset
+        self._file.write(data)
+        self._offset += len(data)
+        return {BLOB_REF_KEY: os.path.relpath(self.path, base_dir), "offset": offset, "length": len(data)}
+
+    def externalize(
+        self, record: Dict[str, Any], base_dir: Union[str, Path], fields: Iterable[str] = BLOB_FIELDS
+    ) -> Dict[str, Any]:
+        """A copy of `record` whose non-empty `fields` are moved to the blob file as references."""
+        record = dict(record)
+        for field in fields:
+            value = record.get(field)
+            if isinstance(value, (dict, list)) and value and not is_blob_ref(value):
+                record[field] = self.put(value, base_dir)
+        return record
+
+    def flush(self, sync: bool = False) -> None:
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "BlobWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
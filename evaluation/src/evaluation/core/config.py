@@ -35,6 +35,33 @@ class EvalConfig(BaseSettings):
     MAX_RETRIES: int = Field(default=3, description="Max retries for LLM calls")
     RETRY_DELAY_SECONDS: int = Field(default=5, description="Base delay for retries")
     MAX_WORKERS: int = Field(default=4, description="Threads for parallel evaluation")
+    JUDGE_MAX_CONCURRENCY: int = Field(
+        default=32, description="Upper bound for adaptive judge concurrency (starts at MAX_WORKERS)"
+    )
+    JUDGE_MAX_QUOTA_RETRIES: int = Field(
+        default=8, description="Retries of a judge call after quota (429) errors"
+    )
+    DETERMINISTIC_WORKERS: int = Field(
+        default=1,
+        description="Processes for deterministic metrics (1 = run in the main process)",
+    )
+    CONVERT_WORKERS: int = Field(
+        default=4,
+        description="Processes for converting ADK history files (1 = run in the main process)",
+    )
+    JSON_MEMORY_LIMIT_MB: int = Field(
+        default=1024,
+        description="Memory ceiling for parsing one history/interaction JSON document (per worker process)",
+    )
+    JUDGE_CHUNK_SIZE: int = Field(default=10, description="Initial rows per judge call")
+    JUDGE_MAX_CHUNK_SIZE: int = Field(default=100, description="Largest row chunk per judge call")
+    JUDGE_CHUNK_TARGET_SECONDS: float = Field(
+        default=30.0, description="Judge call duration that chunk sizes adapt toward"
+    )
+    JUDGE_CACHE_DIR: str = Field(
+        default=".agent_eval_cache/judge",
+        description="On-disk cache of LLM-judge results (evaluate --judge-cache-dir)",
+    )
 
     # Data Mappings
     EXTRACTED_DATA_PREFIX: str = "extracted_data"
@@ -1,20 +1,57 @@
 import json
 import os
 import glob
+import hashlib
 import uuid
 import time
+import concurrent.futures
 import pandas as pd
+from collections import deque
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 
 # Import AgentClient for consistent trace analysis logic
 from evaluation.core.agent_client import AgentClient
-
-def robust_json_load(file_path: str) -> Optional[Dict[str, Any]]:
+from evaluation.core.blob_store import BlobWriter, blob_path
+from evaluation.core.config import CONFIG
+from evaluation.core.json_stream import LAZY, iter_json_values, load_json
+from evaluation.core.span_index import SpanIndex
+
+# Converted-file manifest of `agent-eval convert`, kept in its --output-dir
+CONVERT_MANIFEST_FILE = ".convert_manifest.json"
+
+
+# Members of an ADK eval history file read by AdkHistoryConverter.process_file.
+# eval_metric_result_per_invocation repeats every invocation and is skipped unparsed.
+HISTORY_FIELDS = {
+    "eval_case_results": [{
+        "eval_id": True,
+        "session_id": True,
+        "session_details": True,
+        "eval_metric_results": True,
+        "overall_eval_metric_results": True,
+    }]
+}
+
+# Interaction records as read for evaluation: the LLM request bodies in the trace
+# (full prompts, often the bulk of the file) stay in the file as lazy references.
+INTERACTION_FIELDS = {
+    "*": True,
+    "session_trace": [{
+        "*": True,
+        "attributes": {"*": True, "gcp.vertex.agent.llm_request": LAZY},
+    }],
+}
+
+
+def json_memory_limit() -> int:
+    """Per-document parse ceiling in bytes."""
+    return CONFIG.JSON_MEMORY_LIMIT_MB << 20
+
+
+def robust_json_load(file_path: str, fields: Any = True) -> Optional[Dict[str, Any]]:
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read().strip()
-        data = json.loads(content)
+        data = load_json(file_path, fields, max_bytes=json_memory_limit())
         if isinstance(data, str):
             try:
                 data = json.loads(data)
@@ -192,7 +229,7 @@ class AdkHistoryConverter:
         return mapping
 
     def process_file(self, file_path: str) -> List[Dict[str, Any]]:
-        data = robust_json_load(file_path)
+        data = robust_json_load(file_path, HISTORY_FIELDS)
         if not data:
             return []
 
@@ -256,9 +293,9 @@ class AdkHistoryConverter:
             )
 
             # 2. Analyze Trace (using AgentClient logic)
-            analyzed_trace = AgentClient.analyze_trace_and_extract_spans(synthetic_trace)
-            latency_data = AgentClient.get_latency_from_spans(analyzed_trace)
-            trace_summary = AgentClient.get_agent_trajectory(analyzed_trace)
+            span_index = SpanIndex(synthetic_trace)
+            latency_data = AgentClient.get_latency_from_spans(span_index)
+            trace_summary = AgentClient.get_agent_trajectory(span_index)
             
             # 3. Reconstruct Session Object (CamelCase for consistency with runtime)
             camel_events = convert_keys_to_camel_case(events)
@@ -445,23 +482,150 @@ class AdkHistoryConverter:
 
         return extracted_rows
 
+    def history_files(self) -> List[str]:
+        """ADK eval history files of the agent, in name order."""
+        history_dir = os.path.join(self.agent_dir, ".adk", "eval_history")
+        if not os.path.exists(history_dir):
+            raise FileNotFoundError(f"History directory not found: {history_dir}")
+        return sorted(glob.glob(os.path.join(history_dir, "*.json")))
+
+    def iter_file_rows(
+        self, files: Iterable[str], workers: int = 1
+    ) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """Yields (file_path, interaction records) per history file, in the order given.
+
+        With workers > 1 files are processed on a process pool. At most
+        2 * workers files are in flight, so finished rows are handed on as soon
+        as the files before them are done instead of being held until the end.
+        """
+        if workers <= 1:
+            for file_path in files:
+                yield file_path, self.process_file(file_path)
+            return
+
+        files = iter(files)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            in_flight = deque()
+
+            def submit_next() -> None:
+                file_path = next(files, None)
+                if file_path is not None:
+                    in_flight.append((file_path, executor.submit(self.process_file, file_path)))
+
+            for _ in range(workers * 2):
+                submit_next()
+            while in_flight:
+                file_path, future = in_flight.popleft()
+                rows = future.result()
+                submit_next()
+                yield file_path, rows
+
     def run(self) -> List[Dict[str, Any]]:
         """Processes ADK eval history files and returns a list of interaction records.
 
         Returns:
             List of dictionaries, each representing one interaction.
-            Use write_jsonl() to save to disk.
+            Use write_jsonl() to save to disk, or convert() to stream them there.
         """
-        history_dir = os.path.join(self.agent_dir, ".adk", "eval_history")
-        if not os.path.exists(history_dir):
-            raise FileNotFoundError(f"History directory not found: {history_dir}")
-
         all_rows = []
-        for file_path in glob.glob(os.path.join(history_dir, "*.json")):
-            all_rows.extend(self.process_file(file_path))
+        for _, rows in self.iter_file_rows(self.history_files()):
+            all_rows.extend(rows)
 
         return all_rows
 
+    def convert(
+        self,
+        files: Iterable[str],
+        output_path: str,
+        manifest: Optional["ConversionManifest"] = None,
+        workers: int = 1,
+    ) -> int:
+        """Converts history files straight into a JSONL file and returns the number of records.
+
+        Records are appended as each file finishes. Session traces and states go
+        to the side-car blob file (blob_path(output_path)) and the records
+        reference them. Files whose records were written are marked in the
+        manifest (saved even if conversion stops early).
+        """
+        count = 0
+        base_dir = os.path.dirname(os.path.abspath(output_path))
+        try:
+            with open(output_path, "w", encoding="utf-8") as f, BlobWriter(blob_path(output_path), truncate=True) as blobs:
+                for file_path, rows in self.iter_file_rows(files, workers):
+                    for row in rows:
+                        row = blobs.externalize(row, base_dir)
+                        f.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+                    blobs.flush()
+                    f.flush()
+                    count += len(rows)
+                    if manifest is not None:
+                        manifest.mark(file_path, output_path, len(rows))
+        finally:
+            if manifest is not None:
+                manifest.save()
+        return count
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ConversionManifest:
+    """
+    Record of the ADK history files already converted, kept in the convert output
+    directory (CONVERT_MANIFEST_FILE).
+
+    A file counts as converted while its mtime and size match the entry. If the
+    mtime changed, the content hash decides, so touched-but-unchanged files are
+    still skipped; changed files are converted again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.files = json.load(f).get("files", {})
+            except (OSError, json.JSONDecodeError, AttributeError) as e:
+                print(f"Warning: Ignoring unreadable conversion manifest {path}: {e}")
+
+    def is_converted(self, file_path: str) -> bool:
+        entry = self.files.get(os.path.abspath(file_path))
+        if not entry:
+            return False
+        stat = os.stat(file_path)
+        if stat.st_size != entry.get("size"):
+            return False
+        if stat.st_mtime == entry.get("mtime"):
+            return True
+        if file_sha256(file_path) == entry.get("sha256"):
+            entry["mtime"] = stat.st_mtime
+            return True
+        return False
+
+    def mark(self, file_path: str, output_path: str, rows: int) -> None:
+        stat = os.stat(file_path)
+        self.files[os.path.abspath(file_path)] = {
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "sha256": file_sha256(file_path),
+            "output": os.path.abspath(output_path),
+            "rows": rows,
+            "converted_at": datetime.now().isoformat(),
+        }
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": self.files}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
 
 def write_jsonl(records: List[Dict[str, Any]], output_path: str) -> None:
     """Writes a list of records to a JSONL file (one JSON object per line).
@@ -475,15 +639,21 @@ def write_jsonl(records: List[Dict[str, Any]], output_path: str) -> None:
             f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
 
 
-def read_jsonl(input_path: str) -> List[Dict[str, Any]]:
+def read_jsonl(input_path: str, fields: Any = None, on_limit: Any = None) -> List[Dict[str, Any]]:
     """Reads a JSONL file and returns a list of records.
 
     Args:
         input_path: Path to .jsonl file.
+        fields: Optional field spec (see json_stream.iter_json_values); records
+            are then parsed incrementally, keeping only the selected members.
+        on_limit: With fields, called with the JsonMemoryLimitError of each
+            record over the memory limit, which is then skipped.
 
     Returns:
         List of dictionaries.
     """
+    if fields is not None:
+        return list(iter_json_values(input_path, fields, max_bytes=json_memory_limit(), on_limit=on_limit))
     records = []
     with open(input_path, 'r', encoding='utf-8') as f:
         for line in f:
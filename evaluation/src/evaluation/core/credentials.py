@@ -0,0 +1,172 @@
+import asyncio
+import base64
+import json
+import subprocess
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Refresh a cached token once it is this close to expiring
+DEFAULT_REFRESH_MARGIN_SECONDS = 300.0
+# Lifetime assumed for tokens whose 'exp' claim cannot be read (Google ID tokens last 1h)
+DEFAULT_TOKEN_LIFETIME_SECONDS = 3600.0
+
+TokenMinter = Callable[[str], str]
+
+
+def token_expiry(token: str) -> Optional[float]:
+    """Returns the 'exp' claim (epoch seconds) of a JWT, or None if it cannot be read.
+
+    The signature is not verified; the claim is only used to schedule refreshes.
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def mint_with_google_auth(audience: str) -> str:
+    """Mints an ID token in-process from Application Default Credentials.
+
+    Works for service accounts and on GCE/Cloud Run/GKE metadata servers; raises
+    for end-user credentials, which can only mint tokens through gcloud.
+    """
+    import google.auth.transport.requests
+    import google.oauth2.id_token
+
+    return google.oauth2.id_token.fetch_id_token(google.auth.transport.requests.Request(), audience)
+
+
+def mint_with_gcloud(audience: str) -> str:
+    """Mints an ID token by shelling out to 'gcloud auth print-identity-token'."""
+    try:
+        return subprocess.check_output(
+            ["gcloud", "auth", "print-identity-token"], text=True
+        ).strip()
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        raise RuntimeError(
+            f"Error getting gcloud token: {e}. "
+            "Ensure you are logged in with 'gcloud auth login'."
+        ) from e
+
+
+class CredentialProvider:
+    """
+    Process-wide cache of identity tokens, keyed by audience (the agent's base URL).
+
+    A token is minted once and served to every client until it is within
+    `refresh_margin` seconds of expiring; from then on callers still get the
+    cached token while a background thread mints the next one. Only an expired
+    (or missing) token makes a caller wait, and concurrent callers share a single
+    mint. Minters are tried in order: in-process google-auth first, then gcloud.
+    """
+
+    _default: Optional["CredentialProvider"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(
+        self,
+        minters: Optional[List[TokenMinter]] = None,
+        refresh_margin: float = DEFAULT_REFRESH_MARGIN_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            minters: Functions audience -> token, tried in order until one succeeds.
+            refresh_margin: Seconds before expiry at which a background refresh starts.
+            clock: Source of the current epoch time (overridable for tests).
+        """
+        self.minters = minters if minters is not None else [mint_with_google_auth, mint_with_gcloud]
+        self.refresh_margin = refresh_margin
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, Tuple[str, float]] = {}
+        self._refreshing = set()
+        self._mint_locks: Dict[str, threading.Lock] = {}
+
+    @classmethod
+    def default(cls) -> "CredentialProvider":
+        """Returns the provider shared by every client in this process."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def _mint(self, audience: str) -> Tuple[str, float]:
+        errors = []
+        for minter in self.minters:
+            try:
+                token = minter(audience)
+            except Exception as e:
+                errors.append(f"{getattr(minter, '__name__', minter)}: {e}")
+                continue
+            expiry = token_expiry(token) or self._clock() + DEFAULT_TOKEN_LIFETIME_SECONDS
+            return token, expiry
+        raise RuntimeError("Could not obtain an identity token. " + " | ".join(errors))
+
+    def _store(self, audience: str, minted: Tuple[str, float]) -> None:
+        with self._lock:
+            self._tokens[audience] = minted
+
+    def _refresh_in_background(self, audience: str) -> None:
+        with self._lock:
+            if audience in self._refreshing:
+                return
+            self._refreshing.add(audience)
+
+        def refresh() -> None:
+            try:
+                self._store(audience, self._mint(audience))
+            except RuntimeError as e:
+                print(f"Warning: Background token refresh failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(audience)
+
+        threading.Thread(target=refresh, name="token-refresh", daemon=True).start()
+
+    def _cached(self, audience: str) -> Optional[str]:
+        """Returns a still-valid cached token, starting a refresh if it expires soon."""
+        with self._lock:
+            cached = self._tokens.get(audience)
+        if cached is None:
+            return None
+        token, expiry = cached
+        remaining = expiry - self._clock()
+        if remaining <= 0:
+            return None
+        if remaining <= self.refresh_margin:
+            self._refresh_in_background(audience)
+        return token
+
+    def get_token(self, audience: str) -> str:
+        """Returns a valid identity token for `audience`, minting one if needed."""
+        token = self._cached(audience)
+        if token is not None:
+            return token
+        # One caller mints; the rest wait on the lock and then hit the cache
+        with self._mint_lock(audience):
+            token = self._cached(audience)
+            if token is None:
+                minted = self._mint(audience)
+                self._store(audience, minted)
+                token = minted[0]
+        return token
+
+    async def get_token_async(self, audience: str) -> str:
+        """Like get_token, but mints (if needed) off the event loop."""
+        token = self._cached(audience)
+        if token is not None:
+            return token
+        return await asyncio.to_thread(self.get_token, audience)
+
+    def _mint_lock(self, audience: str) -> threading.Lock:
+        with self._lock:
+            return self._mint_locks.setdefault(audience, threading.Lock())
+
+    def clear(self) -> None:
+        """Drops every cached token."""
+        with self._lock:
+            self._tokens.clear()
@@ -5,6 +5,9 @@ import pandas as pd
 from google.genai import types as genai_types
 from vertexai import types
 
+from evaluation.core.blob_store import BLOB_FIELDS, load_blob
+from evaluation.core.json_stream import LazyValue
+
 logger = logging.getLogger("agent_eval")
 
 
@@ -12,6 +15,8 @@ def robust_json_loads(x: Any) -> Optional[Union[Dict, List, str]]:
     """Safely parse a JSON string, returning None for invalid or empty inputs."""
     if x is None:
         return None
+    if isinstance(x, LazyValue):
+        return x.load()
     if isinstance(x, (dict, list)):
         return x
     if not isinstance(x, str) or not x:
@@ -161,6 +166,299 @@ def get_nested_value(row_val: Any, path: str) -> Any:
     return curr
 
 
+# Agent metrics that require intermediate_events in Event format
+AGENT_METRICS_REQUIRING_EVENTS = {
+    "TOOL_USE_QUALITY", "FINAL_RESPONSE_QUALITY", "HALLUCINATION",
+    "tool_use_quality", "final_response_quality", "hallucination",
+    "agent_tool_use_quality", "agent_hallucination"
+}
+_EVENT_METRIC_KEYS = {m.upper().replace("AGENT_", "") for m in AGENT_METRICS_REQUIRING_EVENTS}
+
+# Placeholders converted to Event dicts for the agent metrics above
+EVENT_PLACEHOLDERS = ("intermediate_events", "tool_usage")
+
+# Fields that need to stay as lists/objects: they are passed directly to the SDK
+# without string conversion. "history" is NOT included here - it needs to be
+# converted to string for MULTI_TURN_CHAT_QUALITY template substitution ({history} placeholder)
+SDK_LIST_FIELDS = {"tool_declarations", "conversation_history", "intermediate_events"}
+
+
+def requires_events(metric_name: str) -> bool:
+    return metric_name.upper().replace("AGENT_", "") in _EVENT_METRIC_KEYS
+
+
+def _prompt_text(x: Any) -> str:
+    # Normalize multi-turn lists into a single context string
+    if isinstance(x, list):
+        return "\n".join(x)
+    return str(x) if x is not None else ""
+
+
+def _response_text(x: Any) -> str:
+    # Convert dicts/lists to JSON strings for SDK compatibility
+    if isinstance(x, (dict, list)):
+        return json.dumps(x)
+    return str(x) if x is not None else ""
+
+
+def _last_item(x: Any) -> Any:
+    # Extract last item from list (for multi-turn prompt extraction)
+    if isinstance(x, list) and len(x) > 0:
+        return x[-1]
+    elif isinstance(x, str):
+        # Try parsing as JSON list
+        parsed = robust_json_loads(x)
+        if isinstance(parsed, list) and len(parsed) > 0:
+            return parsed[-1]
+    return x if x is not None else ""
+
+
+def _sdk_list(x: Any) -> Any:
+    # Keep as list/object - SDK expects these as proper structures
+    if isinstance(x, str):
+        parsed = robust_json_loads(x)
+        return parsed if parsed is not None else []
+    return x if x is not None else []
+
+
+def _template_text(x: Any, grounding_context: bool = False) -> str:
+    # Robust Flattening for custom placeholders (Templates need strings)
+    if isinstance(x, list):
+        # For grounding context, convert to JSON array (not newline-separated):
+        # SDK's grounding API fails with "Extra data" on multiple JSON objects
+        if grounding_context:
+            return json.dumps(x)
+        # For other list fields, convert each item to JSON string
+        try:
+            json_items = []
+            for item in x:
+                if isinstance(item, dict):
+                    json_items.append(json.dumps(item))
+                else:
+                    json_items.append(str(item))
+            return "\n".join(json_items) if json_items else ""
+        except (TypeError, ValueError):
+            return json.dumps(x)
+    elif isinstance(x, dict):
+        return json.dumps(x)
+    return str(x) if x is not None else ""
+
+
+def _column_candidates(col_path: str) -> List[str]:
+    return [
+        col_path.replace(":", "."),
+        f"extracted_data.{col_path}",
+        f"reference_data.{col_path}",
+        col_path,
+    ]
+
+
+class MappingPlanner:
+    """
+    Compiles the dataset_mapping of many metrics against one agent DataFrame and
+    materializes each distinct column once.
+
+    Every placeholder of a mapping compiles to a hashable column spec (source
+    path + transform + output form, template, default prompt/response, ...).
+    Metrics that map the same source the same way share the spec, so the nested
+    lookups, JSON parsing and Event conversion behind it run once per row no
+    matter how many metrics use it; dataset() assembles a metric's eval dataset
+    from the materialized columns.
+    """
+
+    def __init__(self, agent_df: pd.DataFrame, original_df: pd.DataFrame):
+        self.agent_df = agent_df
+        self.original_df = original_df
+        self._plans: Dict[str, List] = {}
+        self._columns: Dict[tuple, Any] = {}
+        self._sources: Dict[tuple, Optional[pd.Series]] = {}
+
+    def compile(self, mappings: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Compiles {metric_name: dataset_mapping} up front; returns the number of
+        distinct columns they need.
+        """
+        specs = set()
+        for metric_name, mapping in mappings.items():
+            plan = self._plans[metric_name] = self._compile(metric_name, mapping)
+            specs.update(spec for _, spec, _ in plan if spec is not None)
+        return len(specs)
+
+    def _compile(self, metric_name: str, mapping: Dict[str, Any]) -> List:
+        """(placeholder, column spec or None, default value) per eval dataset column."""
+        plan = []
+        # Add default prompt/response for ALL LLM metrics
+        # The SDK expects these standard columns to be present
+        if "prompt" not in mapping:
+            plan.append(("prompt", ("prompt",), ""))
+        if "response" not in mapping:
+            plan.append(("response", ("response",), ""))
+
+        for placeholder, details in mapping.items():
+            if "source_column" in details:
+                col_path = details["source_column"]
+                transform = details.get("transform")  # e.g., "last_item"
+                if self._locate(col_path) is not None:
+                    if requires_events(metric_name) and placeholder in EVENT_PLACEHOLDERS:
+                        form = "events"
+                    elif placeholder in SDK_LIST_FIELDS:
+                        form = "list"
+                    elif placeholder == "context":
+                        # For grounding context, SDK expects valid JSON - use array format
+                        form = "grounding"
+                    else:
+                        form = "text"
+                    plan.append((placeholder, ("source", col_path, transform, form), None))
+                elif placeholder in ("conversation_history", "history"):
+                    # Column not found: build conversation_history on-the-fly
+                    plan.append((placeholder, ("history",), None))
+                else:
+                    default_value = details.get("default", "")
+                    logger.debug(
+                        f"Column '{col_path}' not found for placeholder '{placeholder}', using default: '{default_value}'"
+                    )
+                    plan.append((placeholder, None, default_value))
+            elif "template" in details:
+                spec = ("template", details["template"], tuple(details.get("source_columns", [])))
+                plan.append((placeholder, spec, None))
+        return plan
+
+    def dataset(self, metric_name: str, mapping: Dict[str, Any]) -> pd.DataFrame:
+        """The eval dataset of one metric, as map_dataset_columns would build it."""
+        plan = self._plans.get(metric_name)
+        if plan is None:
+            plan = self._plans[metric_name] = self._compile(metric_name, mapping)
+
+        eval_dataset = pd.DataFrame(index=self.agent_df.index)
+        for placeholder, spec, default_value in plan:
+            if spec is None:
+                eval_dataset[placeholder] = default_value
+                continue
+            if spec == ("history",):
+                logger.info(f"Building {placeholder} on-the-fly (column not found in processed data)")
+            if spec not in self._columns:
+                self._columns[spec] = self._materialize(spec)
+            eval_dataset[placeholder] = self._columns[spec]
+        return eval_dataset
+
+    def _materialize(self, spec: tuple) -> Any:
+        agent_df = self.agent_df
+        kind = spec[0]
+        if kind == "prompt":
+            if "user_inputs" in agent_df.columns:
+                return agent_df["user_inputs"].apply(_prompt_text)
+            return ""
+        if kind == "response":
+            for column in ("final_response", "response", "trace_summary"):
+                if column in agent_df.columns:
+                    return agent_df[column].apply(_response_text)
+            return ""
+        if kind == "history":
+            return self._conversation_history()
+        if kind == "template":
+            return self._template(spec[1], spec[2])
+
+        _, col_path, transform, form = spec
+        val_series = self._source(col_path, transform)
+        if form == "events":
+            trace = self._sub_agent_trace()
+            if trace is None:
+                return val_series.apply(convert_interactions_to_events)
+            # Pass both tool_interactions and sub_agent_trace
+            frame = pd.DataFrame({"tools": val_series, "trace": trace})
+            return pd.Series(
+                [convert_interactions_to_events(t, tr) for t, tr in zip(frame["tools"], frame["trace"])],
+                index=frame.index,
+                dtype=object,
+            )
+        if form == "list":
+            return val_series.apply(_sdk_list)
+        return val_series.apply(_template_text, grounding_context=form == "grounding")
+
+    def _locate(self, col_path: str) -> Optional[tuple]:
+        """Where a source_column is read from: a flattened column, or a nested lookup in a dict column."""
+        source_col = next((c for c in _column_candidates(col_path) if c in self.agent_df.columns), None)
+        if source_col:
+            return ("column", source_col)
+        root_key = col_path.split(":")[0] if ":" in col_path else None
+        # First check agent_df for the root key (supports dict columns), then fall back to original_df
+        if root_key and root_key in self.agent_df.columns:
+            return ("agent", root_key)
+        if root_key and root_key in self.original_df.columns:
+            return ("original", root_key)
+        return None
+
+    def _source(self, col_path: str, transform: Optional[str]) -> pd.Series:
+        key = (col_path, transform)
+        if key in self._sources:
+            return self._sources[key]
+        if transform:
+            val_series = self._source(col_path, None)
+            if transform == "last_item":
+                val_series = val_series.apply(_last_item)
+        else:
+            where, column = self._locate(col_path)
+            if where == "column":
+                val_series = self.agent_df[column]
+                if column in BLOB_FIELDS:
+                    val_series = val_series.map(load_blob)
+            elif where == "agent":
+                val_series = self.agent_df[column].apply(
+                    lambda x: get_nested_value(x if isinstance(x, dict) else robust_json_loads(x), col_path)
+                )
+            else:
+                val_series = self.original_df[column].apply(
+                    lambda x: get_nested_value(robust_json_loads(x), col_path)
+                )
+        self._sources[key] = val_series
+        return val_series
+
+    def _sub_agent_trace(self) -> Optional[pd.Series]:
+        key = ("sub_agent_trace", None)
+        if key not in self._sources:
+            trace = None
+            if "extracted_data.sub_agent_trace" in self.agent_df.columns:
+                trace = self.agent_df["extracted_data.sub_agent_trace"]
+            elif "extracted_data" in self.original_df.columns:
+                trace = self.original_df["extracted_data"].apply(
+                    lambda x: get_nested_value(robust_json_loads(x), "extracted_data:sub_agent_trace")
+                )
+            self._sources[key] = trace
+        return self._sources[key]
+
+    def _conversation_history(self) -> Any:
+        agent_df = self.agent_df
+        trace = self._sub_agent_trace()
+        if trace is None:
+            # No sub_agent_trace available, use empty history
+            return [[] for _ in range(len(agent_df))]
+        user_inputs = agent_df.get("user_inputs", pd.Series([""] * len(agent_df)))
+        frame = pd.DataFrame({"inputs": user_inputs, "trace": trace})
+        return pd.Series(
+            [build_conversation_history(i, tr) for i, tr in zip(frame["inputs"], frame["trace"])],
+            index=frame.index,
+            dtype=object,
+        )
+
+    def _template(self, template: str, source_columns: tuple) -> pd.Series:
+        agent_df = self.agent_df
+        if not source_columns:
+            return pd.Series(template, index=agent_df.index)
+        # Per source, the values of its candidate columns (the first non-None one is used)
+        candidates = []
+        for sc in source_columns:
+            present = [c for c in _column_candidates(sc) if c in agent_df.columns]
+            candidates.append((sc.replace(":", "_"), [agent_df[c].tolist() for c in present]))
+
+        values = []
+        for row in range(len(agent_df)):
+            template_vars = {}
+            for name, columns in candidates:
+                template_vars[name] = next((col[row] for col in columns if col[row] is not None), "")
+            values.append(template.format(**template_vars))
+        return pd.Series(values, index=agent_df.index)
+
+
 def map_dataset_columns(
     agent_df: pd.DataFrame,
     original_df: pd.DataFrame,
@@ -168,6 +466,7 @@ def map_dataset_columns(
     metric_name: str,
     metric_tool_use_name: str = "TOOL_USE_QUALITY",
     is_managed_metric: bool = False,
+    planner: Optional[MappingPlanner] = None,
 ) -> pd.DataFrame:
     """
     Maps columns from the raw agent DataFrame to the evaluation dataset based on the metric config.
@@ -175,231 +474,10 @@ def map_dataset_columns(
 
     Always adds default prompt/response columns if not explicitly mapped (SDK requires these).
     Additional columns from dataset_mapping are added for custom placeholders.
-    """
-    eval_dataset = pd.DataFrame(index=agent_df.index)
-
-    # Add default prompt/response for ALL LLM metrics
-    # The SDK expects these standard columns to be present
-    # Add 'prompt' if not explicitly mapped
-    if "prompt" not in mapping:
-        if "user_inputs" in agent_df.columns:
-            inputs = agent_df["user_inputs"]
-            # Normalize multi-turn lists into a single context string.
-            eval_dataset["prompt"] = inputs.apply(
-                lambda x: "\n".join(x)
-                if isinstance(x, list)
-                else str(x)
-                if x is not None
-                else ""
-            )
-        else:
-            eval_dataset["prompt"] = ""
-
-    # Add 'response' if not explicitly mapped
-    if "response" not in mapping:
-        response_col = None
-        if "final_response" in agent_df.columns:
-            response_col = agent_df["final_response"]
-        elif "response" in agent_df.columns:
-            response_col = agent_df["response"]
-        elif "trace_summary" in agent_df.columns:
-            response_col = agent_df["trace_summary"]
-
-        if response_col is not None:
-            # Convert dicts/lists to JSON strings for SDK compatibility
-            def to_string(x):
-                if isinstance(x, (dict, list)):
-                    return json.dumps(x)
-                return str(x) if x is not None else ""
-            eval_dataset["response"] = response_col.apply(to_string)
-        else:
-            eval_dataset["response"] = ""
-
-    for placeholder, details in mapping.items():
-        if "source_column" in details:
-            col_path = details["source_column"]
-            transform = details.get("transform")  # e.g., "last_item"
-
-            # 1. Try exact flattened name
-            cands = [
-                col_path.replace(":", "."),
-                f"extracted_data.{col_path}",
-                f"reference_data.{col_path}",
-                col_path,
-            ]
-            source_col = next((c for c in cands if c in agent_df.columns), None)
-
-            val_series = None
-            if source_col:
-                val_series = agent_df[source_col]
-            else:
-                # 2. Try nested lookup in dict columns
-                root_key = col_path.split(":")[0] if ":" in col_path else None
-
-                # First check agent_df for the root key (supports dict columns)
-                if root_key and root_key in agent_df.columns:
-                    val_series = agent_df[root_key].apply(
-                        lambda x: get_nested_value(x if isinstance(x, dict) else robust_json_loads(x), col_path)
-                    )
-                # Then fall back to original_df
-                elif root_key and root_key in original_df.columns:
-                    val_series = original_df[root_key].apply(
-                        lambda x: get_nested_value(robust_json_loads(x), col_path)
-                    )
 
-            # Apply transform if specified
-            if val_series is not None and transform:
-                if transform == "last_item":
-                    # Extract last item from list (for multi-turn prompt extraction)
-                    def get_last_item(x):
-                        if isinstance(x, list) and len(x) > 0:
-                            return x[-1]
-                        elif isinstance(x, str):
-                            # Try parsing as JSON list
-                            parsed = robust_json_loads(x)
-                            if isinstance(parsed, list) and len(parsed) > 0:
-                                return parsed[-1]
-                        return x if x is not None else ""
-                    val_series = val_series.apply(get_last_item)
-
-            # Get default value if column not found
-            default_value = details.get("default", "")
-
-            if val_series is not None:
-                # Special Case: Tool Interactions to Events
-                # Agent metrics that require intermediate_events in Event format
-                AGENT_METRICS_REQUIRING_EVENTS = {
-                    "TOOL_USE_QUALITY", "FINAL_RESPONSE_QUALITY", "HALLUCINATION",
-                    "tool_use_quality", "final_response_quality", "hallucination",
-                    "agent_tool_use_quality", "agent_hallucination"
-                }
-                is_agent_metric = metric_name.upper().replace("AGENT_", "") in {
-                    m.upper().replace("AGENT_", "") for m in AGENT_METRICS_REQUIRING_EVENTS
-                }
-                is_event_col = placeholder in ["intermediate_events", "tool_usage"]
-
-                if is_agent_metric and is_event_col:
-                    # Get sub_agent_trace for text response events
-                    sub_agent_trace_series = None
-                    if "extracted_data.sub_agent_trace" in agent_df.columns:
-                        sub_agent_trace_series = agent_df["extracted_data.sub_agent_trace"]
-                    elif "extracted_data" in original_df.columns:
-                        sub_agent_trace_series = original_df["extracted_data"].apply(
-                            lambda x: get_nested_value(robust_json_loads(x), "extracted_data:sub_agent_trace")
-                        )
-
-                    if sub_agent_trace_series is not None:
-                        # Pass both tool_interactions and sub_agent_trace
-                        eval_dataset[placeholder] = pd.DataFrame({
-                            "tools": val_series,
-                            "trace": sub_agent_trace_series
-                        }).apply(
-                            lambda row: convert_interactions_to_events(row["tools"], row["trace"]),
-                            axis=1
-                        )
-                    else:
-                        eval_dataset[placeholder] = val_series.apply(
-                            convert_interactions_to_events
-                        )
-                else:
-                    # Special handling for fields that need to stay as lists/objects
-                    # These are passed directly to the SDK without string conversion
-                    # Note: "history" is NOT included here - it needs to be converted to string
-                    # for MULTI_TURN_CHAT_QUALITY template substitution ({history} placeholder)
-                    SDK_LIST_FIELDS = {"tool_declarations", "conversation_history", "intermediate_events"}
-
-                    if placeholder in SDK_LIST_FIELDS:
-                        # Keep as list/object - SDK expects these as proper structures
-                        def parse_if_needed(x):
-                            if isinstance(x, str):
-                                parsed = robust_json_loads(x)
-                                return parsed if parsed is not None else []
-                            return x if x is not None else []
-                        eval_dataset[placeholder] = val_series.apply(parse_if_needed)
-                    else:
-                        # Robust Flattening for custom placeholders (Templates need strings)
-                        # For grounding context, SDK expects valid JSON - use array format
-                        is_grounding_context = placeholder == "context"
-
-                        def normalize_input(x):
-                            if isinstance(x, list):
-                                # For grounding context, convert to JSON array (not newline-separated)
-                                # SDK's grounding API fails with "Extra data" on multiple JSON objects
-                                if is_grounding_context:
-                                    return json.dumps(x)
-                                # For other list fields, convert each item to JSON string
-                                try:
-                                    json_items = []
-                                    for item in x:
-                                        if isinstance(item, dict):
-                                            json_items.append(json.dumps(item))
-                                        else:
-                                            json_items.append(str(item))
-                                    return "\n".join(json_items) if json_items else ""
-                                except (TypeError, ValueError):
-                                    return json.dumps(x)
-                            elif isinstance(x, dict):
-                                return json.dumps(x)
-                            return str(x) if x is not None else ""
-
-                        eval_dataset[placeholder] = val_series.apply(normalize_input)
-            else:
-                # Column not found - check for special fallback cases
-                if placeholder in ("conversation_history", "history"):
-                    # Build conversation_history on-the-fly from user_inputs and sub_agent_trace
-                    logger.info(f"Building {placeholder} on-the-fly (column not found in processed data)")
-                    user_inputs_series = agent_df.get("user_inputs", pd.Series([""] * len(agent_df)))
-
-                    # Get sub_agent_trace
-                    sub_agent_trace_series = None
-                    if "extracted_data.sub_agent_trace" in agent_df.columns:
-                        sub_agent_trace_series = agent_df["extracted_data.sub_agent_trace"]
-                    elif "extracted_data" in original_df.columns:
-                        sub_agent_trace_series = original_df["extracted_data"].apply(
-                            lambda x: get_nested_value(robust_json_loads(x), "extracted_data:sub_agent_trace")
-                        )
-
-                    if sub_agent_trace_series is not None:
-                        eval_dataset[placeholder] = pd.DataFrame({
-                            "inputs": user_inputs_series,
-                            "trace": sub_agent_trace_series
-                        }).apply(
-                            lambda row: build_conversation_history(row["inputs"], row["trace"]),
-                            axis=1
-                        )
-                    else:
-                        # No sub_agent_trace available, use empty history
-                        eval_dataset[placeholder] = [[] for _ in range(len(agent_df))]
-                else:
-                    # Use default value for other columns
-                    logger.debug(f"Column '{col_path}' not found for placeholder '{placeholder}', using default: '{default_value}'")
-                    eval_dataset[placeholder] = default_value
-
-        elif "template" in details:
-
-            def format_template(row):
-                template_vars = {}
-                source_cols = details.get("source_columns", [])
-                for sc in source_cols:
-                    cands = [
-                        sc.replace(":", "."),
-                        f"extracted_data.{sc}",
-                        f"reference_data.{sc}",
-                        sc,
-                    ]
-                    found_sc = next(
-                        (c for c in cands if c in row.index and row[c] is not None),
-                        None,
-                    )
-                    template_vars[sc.replace(":", "_")] = (
-                        row[found_sc] if found_sc else ""
-                    )
-                return (
-                    details["template"].format(**template_vars)
-                    if template_vars
-                    else details["template"]
-                )
-
-            eval_dataset[placeholder] = agent_df.apply(format_template, axis=1)
-
-    return eval_dataset
+    Pass a MappingPlanner built on the same agent_df to share the materialized
+    columns between metrics.
+    """
+    if planner is None:
+        planner = MappingPlanner(agent_df, original_df)
+    return planner.dataset(metric_name, mapping)
@@ -6,7 +6,10 @@ and session state, without requiring LLM-as-judge evaluation.
 """
 
 import json
-from typing import Any, Dict, List, Tuple
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from evaluation.core.span_index import SpanIndex, SpanView
 
 # Pricing per 1K tokens (approximate list prices for prompts <= 200k tokens)
 # Format: {model_name: (prompt_price, completion_price)}
@@ -33,25 +36,86 @@ MODEL_PRICING = {
 }
 
 
-def calculate_token_usage(
-    session_trace: List[Dict[str, Any]],
-) -> Tuple[float, str, Dict[str, Any]]:
+class MetricAccumulator(ABC):
     """
-    Informational metric: Track token usage and estimated cost based on the specific model used.
+    One deterministic metric, computed incrementally by the fused engine.
+
+    add() is called once per span, in trace order; result() returns the
+    (score, explanation, details) tuple. Raising from either marks the metric
+    as failed, exactly as if the standalone calculate_* function had raised.
     """
-    total_prompt_tokens = 0
-    total_completion_tokens = 0
-    total_cached_tokens = 0
-    total_tokens = 0
-    llm_calls = 0
-    total_cost = 0.0
-    models_used = set()
 
+    empty_explanation = "No trace data available"
+
+    @abstractmethod
+    def add(self, span: SpanView) -> None:
+        """Folds one span into the running state."""
+
+    @abstractmethod
+    def result(self) -> Tuple[float, str, Dict[str, Any]]:
+        """The (score, explanation, details) tuple of the spans added so far."""
+
+
+def run_trace_metrics(
+    session_trace: Union[List[Dict[str, Any]], SpanIndex],
+    accumulators: Dict[str, MetricAccumulator],
+) -> Dict[str, Any]:
+    """
+    Fused engine: walks the trace once and feeds every span to every accumulator.
+
+    Accepts the raw trace or its SpanIndex (whose decoded payloads are then shared
+    with any other consumer of the index). Returns {metric_name: (score,
+    explanation, details)} or, for metrics that raised, {metric_name: exception}.
+    """
     if not session_trace:
-        return 0.0, "No trace data available for token usage calculation", {}
+        return {name: (0.0, acc.empty_explanation, {}) for name, acc in accumulators.items()}
 
-    for span in session_trace:
-        attributes = span.get("attributes", {})
+    index = session_trace if isinstance(session_trace, SpanIndex) else SpanIndex(session_trace)
+    active = dict(accumulators)
+    errors: Dict[str, Exception] = {}
+    for view in index.views():
+        for name, accumulator in list(active.items()):
+            try:
+                accumulator.add(view)
+            except Exception as e:
+                errors[name] = e
+                del active[name]
+
+    outcomes: Dict[str, Any] = {}
+    for name, accumulator in accumulators.items():
+        if name in errors:
+            outcomes[name] = errors[name]
+            continue
+        try:
+            outcomes[name] = accumulator.result()
+        except Exception as e:
+            outcomes[name] = e
+    return outcomes
+
+
+def _run_single(
+    name: str, accumulator: MetricAccumulator, session_trace: List[Dict[str, Any]]
+) -> Tuple[float, str, Dict[str, Any]]:
+    outcome = run_trace_metrics(session_trace, {name: accumulator})[name]
+    if isinstance(outcome, Exception):
+        raise outcome
+    return outcome
+
+
+class TokenUsageAccumulator(MetricAccumulator):
+    empty_explanation = "No trace data available for token usage calculation"
+
+    def __init__(self):
+        self.total_prompt_tokens = 0
+        self.total_completion_tokens = 0
+        self.total_cached_tokens = 0
+        self.total_tokens = 0
+        self.llm_calls = 0
+        self.total_cost = 0.0
+        self.models_used = set()
+
+    def add(self, span: SpanView) -> None:
+        attributes = span.span.get("attributes", {})
 
         # Identify model (handle None values)
         model_name = attributes.get("gen_ai.request.model") or "default"
@@ -61,26 +125,22 @@ def calculate_token_usage(
         llm_response = attributes.get("gcp.vertex.agent.llm_response")
         if llm_response:
             try:
-                response_data = (
-                    json.loads(llm_response)
-                    if isinstance(llm_response, str)
-                    else llm_response
-                )
+                response_data = span.llm_response()
                 usage = response_data.get("usage_metadata", {})
 
                 if usage:
-                    llm_calls += 1
-                    models_used.add(model_name)
+                    self.llm_calls += 1
+                    self.models_used.add(model_name)
 
                     p_tokens = usage.get("prompt_token_count", 0)
                     c_tokens = usage.get("candidates_token_count", 0)
                     ch_tokens = usage.get("cached_content_token_count", 0)
                     t_tokens = usage.get("total_token_count", 0)
 
-                    total_prompt_tokens += p_tokens
-                    total_completion_tokens += c_tokens
-                    total_cached_tokens += ch_tokens
-                    total_tokens += t_tokens
+                    self.total_prompt_tokens += p_tokens
+                    self.total_completion_tokens += c_tokens
+                    self.total_cached_tokens += ch_tokens
+                    self.total_tokens += t_tokens
 
                     # Match model pricing
                     pricing = MODEL_PRICING["default"]
@@ -97,28 +157,128 @@ def calculate_token_usage(
                     # Note: Cached tokens usually have a separate (lower) pricing tier.
                     # For this metric, we currently only sum cost for active prompt/completion tokens.
 
-                    total_cost += call_cost
+                    self.total_cost += call_cost
 
             except (json.JSONDecodeError, TypeError, AttributeError):
-                continue
+                return
 
-    explanation = (
-        f"Usage: {llm_calls} LLM calls using {list(models_used)}. "
-        f"Tokens: {total_tokens} ({total_prompt_tokens}p + {total_completion_tokens}c + {total_cached_tokens}ch). "
-        f"Cost: ${total_cost:.6f}"
-    )
+    def result(self) -> Tuple[float, str, Dict[str, Any]]:
+        explanation = (
+            f"Usage: {self.llm_calls} LLM calls using {list(self.models_used)}. "
+            f"Tokens: {self.total_tokens} ({self.total_prompt_tokens}p + {self.total_completion_tokens}c + {self.total_cached_tokens}ch). "
+            f"Cost: ${self.total_cost:.6f}"
+        )
 
-    details = {
-        "llm_calls": llm_calls,
-        "models_used": list(models_used),
-        "total_tokens": total_tokens,
-        "prompt_tokens": total_prompt_tokens,
-        "completion_tokens": total_completion_tokens,
-        "cached_tokens": total_cached_tokens,
-        "estimated_cost_usd": total_cost,
-    }
+        details = {
+            "llm_calls": self.llm_calls,
+            "models_used": list(self.models_used),
+            "total_tokens": self.total_tokens,
+            "prompt_tokens": self.total_prompt_tokens,
+            "completion_tokens": self.total_completion_tokens,
+            "cached_tokens": self.total_cached_tokens,
+            "estimated_cost_usd": self.total_cost,
+        }
+
+        return self.total_cost, explanation, details
 
-    return total_cost, explanation, details
+
+def calculate_token_usage(
+    session_trace: List[Dict[str, Any]],
+) -> Tuple[float, str, Dict[str, Any]]:
+    """
+    Informational metric: Track token usage and estimated cost based on the specific model used.
+    """
+    return _run_single("token_usage", TokenUsageAccumulator(), session_trace)
+
+
+class LatencyAccumulator(MetricAccumulator):
+    empty_explanation = "No trace data available for latency calculation"
+
+    def __init__(self, latency_data: List[Dict[str, Any]] = None):
+        self.latency_data = latency_data
+        self.root_start = None
+        self.llm_latency = 0.0
+        self.tool_latency = 0.0
+        self.first_llm_end = None
+        self.max_end = 0
+        # Errors from the per-span pass only surface if the trace has timestamps,
+        # matching the standalone function, which checks timestamps first.
+        self.loop_error = None
+
+    def add(self, span: SpanView) -> None:
+        span = span.span
+        start_time = span.get("start_time")
+        if start_time and (self.root_start is None or start_time < self.root_start):
+            self.root_start = start_time
+
+        if self.loop_error is not None:
+            return
+        try:
+            start = span.get("start_time", 0)
+            end = span.get("end_time", 0)
+            self.max_end = max(self.max_end, end)
+            duration = (end - start) / 1e9
+            name = span.get("name", "")
+
+            if name == "call_llm":
+                self.llm_latency += duration
+                # Proxy for Time to First Token: end of first LLM call
+                if self.first_llm_end is None:
+                    self.first_llm_end = end
+
+            elif "tool_call" in name or "execute_tool" in name:
+                self.tool_latency += duration
+        except Exception as e:
+            self.loop_error = e
+
+    def result(self) -> Tuple[float, str, Dict[str, Any]]:
+        if self.root_start is None:
+            return 0.0, "Trace data has no timestamps", {}
+        if self.loop_error is not None:
+            raise self.loop_error
+
+        root_start = self.root_start
+        llm_latency = self.llm_latency
+        tool_latency = self.tool_latency
+        max_end = self.max_end
+        total_latency = 0.0
+        average_turn_latency = 0.0
+        first_response_latency = None
+        if self.first_llm_end is not None:
+            first_response_latency = (self.first_llm_end - root_start) / 1e9
+
+        # Calculate Total & Average Latency from high-level summary (latency_data)
+        # This is preferred as it excludes user think time in multi-turn sessions.
+        if self.latency_data:
+            turn_latencies = []
+            for item in self.latency_data:
+                if item.get("name") == "invocation":
+                    turn_latencies.append(item.get("duration_seconds", 0))
+
+            if turn_latencies:
+                average_turn_latency = sum(turn_latencies) / len(turn_latencies)
+                total_latency = sum(turn_latencies)
+
+        # Fallback: Wall-clock duration from trace if latency_data is missing
+        if total_latency == 0.0 and max_end > root_start:
+            total_latency = (max_end - root_start) / 1e9  # nanoseconds to seconds
+
+        explanation = (
+            f"Total: {total_latency:.4f}s. "
+            f"Avg Turn: {average_turn_latency:.4f}s. "
+            f"LLM: {llm_latency:.4f}s, Tools: {tool_latency:.4f}s. "
+            f"First Response: {first_response_latency if first_response_latency else 0:.4f}s"
+        )
+
+        details = {
+            "total_latency_seconds": total_latency,
+            "average_turn_latency_seconds": average_turn_latency,
+            "llm_latency_seconds": llm_latency,
+            "tool_latency_seconds": tool_latency,
+            "time_to_first_response_seconds": first_response_latency,
+        }
+
+        return total_latency, explanation, details
 
 
 def calculate_latency_metrics(
@@ -128,157 +288,131 @@ def calculate_latency_metrics(
     Calculate latency metrics from the session trace.
     Returns the total latency score (seconds), but details contains granular breakdown.
     """
-    total_latency = 0.0
-    llm_latency = 0.0
-    tool_latency = 0.0
-    first_response_latency = None
-    average_turn_latency = 0.0
+    return _run_single("latency_metrics", LatencyAccumulator(latency_data), session_trace)
 
-    if not session_trace:
-        return 0.0, "No trace data available for latency calculation", {}
-
-    # Sort spans by start time to find the true beginning
-    sorted_spans = sorted(
-        [s for s in session_trace if s.get("start_time")], key=lambda x: x["start_time"]
-    )
-
-    if not sorted_spans:
-        return 0.0, "Trace data has no timestamps", {}
-
-    root_start = sorted_spans[0]["start_time"]
-
-    # Calculate Component Latencies from full trace
-    max_end = 0
-    for span in session_trace:
-        start = span.get("start_time", 0)
-        end = span.get("end_time", 0)
-        max_end = max(max_end, end)
-        duration = (end - start) / 1e9
-        name = span.get("name", "")
 
-        if name == "call_llm":
-            llm_latency += duration
-            # Proxy for Time to First Token: end of first LLM call
-            if first_response_latency is None:
-                first_response_latency = (end - root_start) / 1e9
-
-        elif "tool_call" in name or "execute_tool" in name:
-            tool_latency += duration
-
-    # Calculate Total & Average Latency from high-level summary (latency_data)
-    # This is preferred as it excludes user think time in multi-turn sessions.
-    if latency_data:
-        turn_latencies = []
-        for item in latency_data:
-            if item.get("name") == "invocation":
-                turn_latencies.append(item.get("duration_seconds", 0))
+def calculate_user_perceived_latency(
+    session_trace: List[Dict[str, Any]], streaming_latency: List[Dict[str, Any]] = None
+) -> Tuple[Optional[float], str, Dict[str, Any]]:
+    """
+    Calculate user-perceived latency from per-turn streaming (/run_sse) measurements.
+    Returns the average time-to-first-text-token across turns (seconds) as the score,
+    or None (not scored, so left out of averages) without streaming data.
+    """
+    if not isinstance(streaming_latency, list) or not streaming_latency:
+        return None, "No streaming latency data available (run interact with --streaming)", {}
 
-        if turn_latencies:
-            average_turn_latency = sum(turn_latencies) / len(turn_latencies)
-            total_latency = sum(turn_latencies)
+    first_event = [
+        t["time_to_first_event_seconds"]
+        for t in streaming_latency
+        if t.get("time_to_first_event_seconds") is not None
+    ]
+    first_text = [
+        t["time_to_first_text_seconds"]
+        for t in streaming_latency
+        if t.get("time_to_first_text_seconds") is not None
+    ]
+    gaps = sorted(g for t in streaming_latency for g in t.get("inter_event_gaps_seconds") or [])
 
-    # Fallback: Wall-clock duration from trace if latency_data is missing
-    if total_latency == 0.0 and max_end > root_start:
-        total_latency = (max_end - root_start) / 1e9  # nanoseconds to seconds
+    avg_first_event = sum(first_event) / len(first_event) if first_event else 0.0
+    avg_first_text = sum(first_text) / len(first_text) if first_text else 0.0
+    max_first_text = max(first_text) if first_text else 0.0
+    median_gap = gaps[len(gaps) // 2] if gaps else 0.0
+    max_gap = gaps[-1] if gaps else 0.0
 
     explanation = (
-        f"Total: {total_latency:.4f}s. "
-        f"Avg Turn: {average_turn_latency:.4f}s. "
-        f"LLM: {llm_latency:.4f}s, Tools: {tool_latency:.4f}s. "
-        f"First Response: {first_response_latency if first_response_latency else 0:.4f}s"
+        f"Avg Time to First Text: {avg_first_text:.4f}s (max {max_first_text:.4f}s). "
+        f"Avg Time to First Event: {avg_first_event:.4f}s. "
+        f"Inter-Event Gap: median {median_gap:.4f}s, max {max_gap:.4f}s "
+        f"across {len(streaming_latency)} turns."
     )
 
     details = {
-        "total_latency_seconds": total_latency,
-        "average_turn_latency_seconds": average_turn_latency,
-        "llm_latency_seconds": llm_latency,
-        "tool_latency_seconds": tool_latency,
-        "time_to_first_response_seconds": first_response_latency,
+        "average_time_to_first_event_seconds": avg_first_event,
+        "average_time_to_first_text_seconds": avg_first_text,
+        "max_time_to_first_text_seconds": max_first_text,
+        "median_inter_event_gap_seconds": median_gap,
+        "max_inter_event_gap_seconds": max_gap,
+        "streamed_turns": len(streaming_latency),
     }
 
-    return total_latency, explanation, details
+    return avg_first_text, explanation, details
 
 
-def calculate_cache_efficiency(
-    session_trace: List[Dict[str, Any]],
-) -> Tuple[float, str, Dict[str, Any]]:
-    """
-    Calculate the efficiency of context caching.
-    Returns the cache hit rate (percentage of potential prompt tokens that were cached).
-    """
-    total_prompt_tokens = 0
-    total_cached_tokens = 0
+class CacheEfficiencyAccumulator(MetricAccumulator):
+    empty_explanation = "No trace data available for cache efficiency"
 
-    if not session_trace:
-        return 0.0, "No trace data available for cache efficiency", {}
+    def __init__(self):
+        self.total_prompt_tokens = 0
+        self.total_cached_tokens = 0
 
-    for span in session_trace:
-        attributes = span.get("attributes", {})
+    def add(self, span: SpanView) -> None:
+        attributes = span.span.get("attributes", {})
         llm_response = attributes.get("gcp.vertex.agent.llm_response")
         if llm_response:
             try:
-                response_data = (
-                    json.loads(llm_response)
-                    if isinstance(llm_response, str)
-                    else llm_response
-                )
+                response_data = span.llm_response()
                 usage = response_data.get("usage_metadata", {})
                 if usage:
-                    total_prompt_tokens += usage.get("prompt_token_count", 0)
-                    total_cached_tokens += usage.get("cached_content_token_count", 0)
+                    self.total_prompt_tokens += usage.get("prompt_token_count", 0)
+                    self.total_cached_tokens += usage.get("cached_content_token_count", 0)
             except (json.JSONDecodeError, TypeError, AttributeError):
-                continue
+                return
 
-    # Calculate hit rate
-    # Note: 'prompt_token_count' in Gemini API usage metadata usually EXCLUDES cached tokens.
-    # So total potential input = prompt_token_count + cached_content_token_count
-    total_input_tokens = total_prompt_tokens + total_cached_tokens
+    def result(self) -> Tuple[float, str, Dict[str, Any]]:
+        total_prompt_tokens = self.total_prompt_tokens
+        total_cached_tokens = self.total_cached_tokens
 
-    if total_input_tokens > 0:
-        cache_hit_rate = total_cached_tokens / total_input_tokens
-    else:
-        cache_hit_rate = 0.0
+        # Calculate hit rate
+        # Note: 'prompt_token_count' in Gemini API usage metadata usually EXCLUDES cached tokens.
+        # So total potential input = prompt_token_count + cached_content_token_count
+        total_input_tokens = total_prompt_tokens + total_cached_tokens
 
-    explanation = (
-        f"Cache Hit Rate: {cache_hit_rate:.2%}. "
-        f"Cached Tokens: {total_cached_tokens}. "
-        f"Fresh Prompt Tokens: {total_prompt_tokens}."
-    )
+        if total_input_tokens > 0:
+            cache_hit_rate = total_cached_tokens / total_input_tokens
+        else:
+            cache_hit_rate = 0.0
 
-    details = {
-        "cache_hit_rate": cache_hit_rate,
-        "total_cached_tokens": total_cached_tokens,
-        "total_fresh_prompt_tokens": total_prompt_tokens,
-        "total_input_tokens": total_input_tokens,
-    }
+        explanation = (
+            f"Cache Hit Rate: {cache_hit_rate:.2%}. "
+            f"Cached Tokens: {total_cached_tokens}. "
+            f"Fresh Prompt Tokens: {total_prompt_tokens}."
+        )
 
-    return cache_hit_rate, explanation, details
+        details = {
+            "cache_hit_rate": cache_hit_rate,
+            "total_cached_tokens": total_cached_tokens,
+            "total_fresh_prompt_tokens": total_prompt_tokens,
+            "total_input_tokens": total_input_tokens,
+        }
 
+        return cache_hit_rate, explanation, details
 
-def calculate_thinking_metrics(
+
+def calculate_cache_efficiency(
     session_trace: List[Dict[str, Any]],
 ) -> Tuple[float, str, Dict[str, Any]]:
     """
-    Calculate metrics related to the model's 'thinking' or reasoning process.
-    Returns the reasoning ratio (thinking tokens / total output tokens).
+    Calculate the efficiency of context caching.
+    Returns the cache hit rate (percentage of potential prompt tokens that were cached).
     """
-    total_thinking_tokens = 0
-    total_candidate_tokens = 0
-    turns_with_thinking = 0
+    return _run_single("cache_efficiency", CacheEfficiencyAccumulator(), session_trace)
 
-    if not session_trace:
-        return 0.0, "No trace data available for thinking metrics", {}
 
-    for span in session_trace:
-        attributes = span.get("attributes", {})
+class ThinkingAccumulator(MetricAccumulator):
+    empty_explanation = "No trace data available for thinking metrics"
+
+    def __init__(self):
+        self.total_thinking_tokens = 0
+        self.total_candidate_tokens = 0
+        self.turns_with_thinking = 0
+
+    def add(self, span: SpanView) -> None:
+        attributes = span.span.get("attributes", {})
         llm_response = attributes.get("gcp.vertex.agent.llm_response")
         if llm_response:
             try:
-                response_data = (
-                    json.loads(llm_response)
-                    if isinstance(llm_response, str)
-                    else llm_response
-                )
+                response_data = span.llm_response()
                 usage = response_data.get("usage_metadata", {})
                 if usage:
                     thoughts = usage.get("thoughts_token_count", 0)
@@ -286,53 +420,61 @@ def calculate_thinking_metrics(
                     # We treat them as additive components of the total output.
                     candidates = usage.get("candidates_token_count", 0)
 
-                    total_thinking_tokens += thoughts
-                    total_candidate_tokens += candidates
+                    self.total_thinking_tokens += thoughts
+                    self.total_candidate_tokens += candidates
 
                     if thoughts > 0:
-                        turns_with_thinking += 1
+                        self.turns_with_thinking += 1
             except (json.JSONDecodeError, TypeError, AttributeError):
-                continue
+                return
 
-    total_output_tokens = total_thinking_tokens + total_candidate_tokens
+    def result(self) -> Tuple[float, str, Dict[str, Any]]:
+        total_thinking_tokens = self.total_thinking_tokens
+        total_candidate_tokens = self.total_candidate_tokens
+        total_output_tokens = total_thinking_tokens + total_candidate_tokens
 
-    if total_output_tokens > 0:
-        reasoning_ratio = total_thinking_tokens / total_output_tokens
-    else:
-        reasoning_ratio = 0.0
+        if total_output_tokens > 0:
+            reasoning_ratio = total_thinking_tokens / total_output_tokens
+        else:
+            reasoning_ratio = 0.0
 
-    explanation = (
-        f"Reasoning Ratio: {reasoning_ratio:.2%}. "
-        f"Thinking Tokens: {total_thinking_tokens}. "
-        f"Standard Output Tokens: {total_candidate_tokens}. "
-        f"Turns with Thinking: {turns_with_thinking}."
-    )
+        explanation = (
+            f"Reasoning Ratio: {reasoning_ratio:.2%}. "
+            f"Thinking Tokens: {total_thinking_tokens}. "
+            f"Standard Output Tokens: {total_candidate_tokens}. "
+            f"Turns with Thinking: {self.turns_with_thinking}."
+        )
 
-    details = {
-        "reasoning_ratio": reasoning_ratio,
-        "total_thinking_tokens": total_thinking_tokens,
-        "total_candidate_tokens": total_candidate_tokens,
-        "total_output_tokens": total_output_tokens,
-        "turns_with_thinking": turns_with_thinking,
-    }
+        details = {
+            "reasoning_ratio": reasoning_ratio,
+            "total_thinking_tokens": total_thinking_tokens,
+            "total_candidate_tokens": total_candidate_tokens,
+            "total_output_tokens": total_output_tokens,
+            "turns_with_thinking": self.turns_with_thinking,
+        }
 
-    return reasoning_ratio, explanation, details
+        return reasoning_ratio, explanation, details
 
 
-def calculate_tool_utilization(
+def calculate_thinking_metrics(
     session_trace: List[Dict[str, Any]],
 ) -> Tuple[float, str, Dict[str, Any]]:
     """
-    Calculate statistics on tool usage frequency and diversity.
-    Returns the total number of tool calls.
+    Calculate metrics related to the model's 'thinking' or reasoning process.
+    Returns the reasoning ratio (thinking tokens / total output tokens).
     """
-    total_tool_calls = 0
-    tool_counts = {}
+    return _run_single("thinking_metrics", ThinkingAccumulator(), session_trace)
 
-    if not session_trace:
-        return 0.0, "No trace data available for tool utilization", {}
 
-    for span in session_trace:
+class ToolUtilizationAccumulator(MetricAccumulator):
+    empty_explanation = "No trace data available for tool utilization"
+
+    def __init__(self):
+        self.total_tool_calls = 0
+        self.tool_counts = {}
+
+    def add(self, span: SpanView) -> None:
+        span = span.span
         name = span.get("name", "")
 
         # Check for tool execution spans.
@@ -344,46 +486,53 @@ def calculate_tool_utilization(
             elif "tool.name" in span.get("attributes", {}):
                 tool_name = span["attributes"]["gen_ai.tool.name"]
 
-            total_tool_calls += 1
-            tool_counts[tool_name] = tool_counts.get(tool_name, 0) + 1
+            self.total_tool_calls += 1
+            self.tool_counts[tool_name] = self.tool_counts.get(tool_name, 0) + 1
 
-    unique_tools_used = len(tool_counts)
+    def result(self) -> Tuple[float, str, Dict[str, Any]]:
+        total_tool_calls = self.total_tool_calls
+        tool_counts = self.tool_counts
+        unique_tools_used = len(tool_counts)
 
-    # Create a string representation of the tool breakdown
-    breakdown_str = ", ".join([f"{k}: {v}" for k, v in tool_counts.items()])
+        # Create a string representation of the tool breakdown
+        breakdown_str = ", ".join([f"{k}: {v}" for k, v in tool_counts.items()])
 
-    explanation = (
-        f"Total Tool Calls: {total_tool_calls}. "
-        f"Unique Tools: {unique_tools_used}. "
-        f"Breakdown: [{breakdown_str}]"
-    )
+        explanation = (
+            f"Total Tool Calls: {total_tool_calls}. "
+            f"Unique Tools: {unique_tools_used}. "
+            f"Breakdown: [{breakdown_str}]"
+        )
 
-    details = {
-        "total_tool_calls": total_tool_calls,
-        "unique_tools_used": unique_tools_used,
-        "tool_counts": tool_counts,
-    }
+        details = {
+            "total_tool_calls": total_tool_calls,
+            "unique_tools_used": unique_tools_used,
+            "tool_counts": tool_counts,
+        }
 
-    return float(total_tool_calls), explanation, details
+        return float(total_tool_calls), explanation, details
 
 
-def calculate_tool_success_rate(
+def calculate_tool_utilization(
     session_trace: List[Dict[str, Any]],
 ) -> Tuple[float, str, Dict[str, Any]]:
     """
-    Calculate the success rate of tool executions by inspecting tool responses.
-    Returns success rate (successful / total) as score.
+    Calculate statistics on tool usage frequency and diversity.
+    Returns the total number of tool calls.
     """
-    total_calls = 0
-    failed_calls = 0
-    failed_tools = []
+    return _run_single("tool_utilization", ToolUtilizationAccumulator(), session_trace)
 
-    if not session_trace:
-        return 0.0, "No trace data available for tool success rate", {}
 
-    for span in session_trace:
-        name = span.get("name", "")
-        attributes = span.get("attributes", {})
+class ToolSuccessRateAccumulator(MetricAccumulator):
+    empty_explanation = "No trace data available for tool success rate"
+
+    def __init__(self):
+        self.total_calls = 0
+        self.failed_calls = 0
+        self.failed_tools = []
+
+    def add(self, span: SpanView) -> None:
+        name = span.span.get("name", "")
+        attributes = span.span.get("attributes", {})
 
         # Identify tool execution spans
         is_tool = name.startswith("execute_tool ") or "tool_call" in name
@@ -391,10 +540,10 @@ def calculate_tool_success_rate(
         if is_tool:
             tool_response_str = attributes.get("gcp.vertex.agent.tool_response")
             if tool_response_str:
-                total_calls += 1
+                self.total_calls += 1
                 try:
                     # Parse the JSON response to check status
-                    response = json.loads(tool_response_str)
+                    response = span.tool_response()
 
                     # Common error patterns in ADK/JSON tools
                     is_error = False
@@ -405,66 +554,71 @@ def calculate_tool_success_rate(
                             is_error = True
 
                     if is_error:
-                        failed_calls += 1
+                        self.failed_calls += 1
                         tool_name = name.replace("execute_tool ", "").strip()
-                        failed_tools.append(tool_name)
+                        self.failed_tools.append(tool_name)
 
                 except (json.JSONDecodeError, TypeError):
                     # Malformed JSON in response could be considered a failure or ignored
                     pass
 
-    if total_calls > 0:
-        success_rate = (total_calls - failed_calls) / total_calls
-    else:
-        # If no tools were called, success rate is technically N/A, but 1.0 is a safe "no errors" default
-        # Or 0.0 if we want to imply "no success possible".
-        # For evaluation, 1.0 (no failures) usually makes more sense if no tools were attempted.
-        # But to distinguish from "perfect execution", let's return 1.0 but note it.
-        success_rate = 1.0
-
-    explanation = (
-        f"Success Rate: {success_rate:.2%}. "
-        f"Total Calls: {total_calls}. "
-        f"Failed Calls: {failed_calls}. "
-        f"Failed Tools: {list(set(failed_tools))}"
-    )
-
-    details = {
-        "tool_success_rate": success_rate,
-        "total_tool_calls": total_calls,
-        "failed_tool_calls": failed_calls,
-        "failed_tools_list": failed_tools,
-    }
-
-    return success_rate, explanation, details
+    def result(self) -> Tuple[float, str, Dict[str, Any]]:
+        total_calls = self.total_calls
+        failed_calls = self.failed_calls
+        failed_tools = self.failed_tools
+
+        if total_calls > 0:
+            success_rate = (total_calls - failed_calls) / total_calls
+        else:
+            # If no tools were called, success rate is technically N/A, but 1.0 is a safe "no errors" default
+            # Or 0.0 if we want to imply "no success possible".
+            # For evaluation, 1.0 (no failures) usually makes more sense if no tools were attempted.
+            # But to distinguish from "perfect execution", let's return 1.0 but note it.
+            success_rate = 1.0
+
+        explanation = (
+            f"Success Rate: {success_rate:.2%}. "
+            f"Total Calls: {total_calls}. "
+            f"Failed Calls: {failed_calls}. "
+            f"Failed Tools: {list(set(failed_tools))}"
+        )
+
+        details = {
+            "tool_success_rate": success_rate,
+            "total_tool_calls": total_calls,
+            "failed_tool_calls": failed_calls,
+            "failed_tools_list": failed_tools,
+        }
+
+        return success_rate, explanation, details
 
 
-def calculate_grounding_utilization(
+def calculate_tool_success_rate(
     session_trace: List[Dict[str, Any]],
 ) -> Tuple[float, str, Dict[str, Any]]:
     """
-    Calculate the extent of grounding usage by inspecting LLM responses for groundingMetadata.
-    Returns total grounding chunks (citations) as the score.
+    Calculate the success rate of tool executions by inspecting tool responses.
+    Returns success rate (successful / total) as score.
     """
-    total_grounded_responses = 0
-    total_grounding_chunks = 0
-    total_llm_responses = 0
+    return _run_single("tool_success_rate", ToolSuccessRateAccumulator(), session_trace)
 
-    if not session_trace:
-        return 0.0, "No trace data available for grounding utilization", {}
 
-    for span in session_trace:
-        attributes = span.get("attributes", {})
+class GroundingAccumulator(MetricAccumulator):
+    empty_explanation = "No trace data available for grounding utilization"
+
+    def __init__(self):
+        self.total_grounded_responses = 0
+        self.total_grounding_chunks = 0
+        self.total_llm_responses = 0
+
+    def add(self, span: SpanView) -> None:
+        attributes = span.span.get("attributes", {})
         llm_response = attributes.get("gcp.vertex.agent.llm_response")
 
         if llm_response:
-            total_llm_responses += 1
+            self.total_llm_responses += 1
             try:
-                response_data = (
-                    json.loads(llm_response)
-                    if isinstance(llm_response, str)
-                    else llm_response
-                )
+                response_data = span.llm_response()
                 # Grounding metadata is usually at the top level or inside candidates
                 # Standard Vertex AI response structure check
                 grounding_metadata = response_data.get(
@@ -485,143 +639,150 @@ def calculate_grounding_utilization(
                         "groundingChunks"
                     ) or grounding_metadata.get("grounding_chunks")
                     if chunks and isinstance(chunks, list) and len(chunks) > 0:
-                        total_grounded_responses += 1
-                        total_grounding_chunks += len(chunks)
+                        self.total_grounded_responses += 1
+                        self.total_grounding_chunks += len(chunks)
 
             except (json.JSONDecodeError, TypeError, AttributeError):
-                continue
+                return
 
-    explanation = (
-        f"Total Citations (Chunks): {total_grounding_chunks}. "
-        f"Grounded Responses: {total_grounded_responses} / {total_llm_responses}."
-    )
+    def result(self) -> Tuple[float, str, Dict[str, Any]]:
+        explanation = (
+            f"Total Citations (Chunks): {self.total_grounding_chunks}. "
+            f"Grounded Responses: {self.total_grounded_responses} / {self.total_llm_responses}."
+        )
 
-    details = {
-        "total_grounding_chunks": total_grounding_chunks,
-        "total_grounded_responses": total_grounded_responses,
-        "total_llm_responses": total_llm_responses,
-    }
+        details = {
+            "total_grounding_chunks": self.total_grounding_chunks,
+            "total_grounded_responses": self.total_grounded_responses,
+            "total_llm_responses": self.total_llm_responses,
+        }
 
-    return float(total_grounding_chunks), explanation, details
+        return float(self.total_grounding_chunks), explanation, details
 
 
-def calculate_context_saturation(
+def calculate_grounding_utilization(
     session_trace: List[Dict[str, Any]],
 ) -> Tuple[float, str, Dict[str, Any]]:
     """
-    Calculate the maximum context saturation (max total tokens used in a single turn).
-    Returns max_tokens as the score.
+    Calculate the extent of grounding usage by inspecting LLM responses for groundingMetadata.
+    Returns total grounding chunks (citations) as the score.
     """
-    max_tokens = 0
-    max_token_span = ""
+    return _run_single("grounding_utilization", GroundingAccumulator(), session_trace)
 
-    if not session_trace:
-        return 0.0, "No trace data available for context saturation", {}
 
-    for span in session_trace:
-        attributes = span.get("attributes", {})
+class ContextSaturationAccumulator(MetricAccumulator):
+    empty_explanation = "No trace data available for context saturation"
+
+    def __init__(self):
+        self.max_tokens = 0
+        self.max_token_span = ""
+
+    def add(self, span: SpanView) -> None:
+        attributes = span.span.get("attributes", {})
         llm_response = attributes.get("gcp.vertex.agent.llm_response")
         if llm_response:
             try:
-                response_data = (
-                    json.loads(llm_response)
-                    if isinstance(llm_response, str)
-                    else llm_response
-                )
+                response_data = span.llm_response()
                 usage = response_data.get("usage_metadata", {})
                 if usage:
                     total = usage.get("total_token_count", 0)
-                    if total > max_tokens:
-                        max_tokens = total
-                        max_token_span = span.get("name", "unknown")
+                    if total > self.max_tokens:
+                        self.max_tokens = total
+                        self.max_token_span = span.span.get("name", "unknown")
             except (json.JSONDecodeError, TypeError, AttributeError):
-                continue
+                return
 
-    explanation = (
-        f"Max Context Used: {max_tokens} tokens. Peak occurred in: {max_token_span}."
-    )
+    def result(self) -> Tuple[float, str, Dict[str, Any]]:
+        explanation = (
+            f"Max Context Used: {self.max_tokens} tokens. Peak occurred in: {self.max_token_span}."
+        )
 
-    details = {"max_total_tokens": max_tokens, "peak_usage_span": max_token_span}
+        details = {"max_total_tokens": self.max_tokens, "peak_usage_span": self.max_token_span}
 
-    return float(max_tokens), explanation, details
+        return float(self.max_tokens), explanation, details
 
 
-def calculate_agent_handoffs(
+def calculate_context_saturation(
     session_trace: List[Dict[str, Any]],
 ) -> Tuple[float, str, Dict[str, Any]]:
     """
-    Count the number of agent handoffs/invocations in the session.
-    Returns total handoff events as the score.
-
-    Captures:
-    - Direct agent invocations (invoke_agent, agent_run)
-    - Sub-agents called as tools (execute_tool *Agent, transfer_to_agent)
+    Calculate the maximum context saturation (max total tokens used in a single turn).
+    Returns max_tokens as the score.
     """
-    handoff_count = 0
-    agents_invoked = set()
+    return _run_single("context_saturation", ContextSaturationAccumulator(), session_trace)
 
-    if not session_trace:
-        return 0.0, "No trace data available for agent handoffs", {}
 
-    for span in session_trace:
-        name = span.get("name", "")
+class AgentHandoffsAccumulator(MetricAccumulator):
+    empty_explanation = "No trace data available for agent handoffs"
+
+    def __init__(self):
+        self.handoff_count = 0
+        self.agents_invoked = set()
+
+    def add(self, span: SpanView) -> None:
+        name = span.span.get("name", "")
 
         # Check for direct agent invocations
         if name.startswith("invoke_agent ") or name.startswith("agent_run "):
             agent_name = (
                 name.replace("invoke_agent ", "").replace("agent_run ", "").strip()
             )
-            handoff_count += 1
-            agents_invoked.add(agent_name)
+            self.handoff_count += 1
+            self.agents_invoked.add(agent_name)
 
         # Check for sub-agents called as tools (e.g., "execute_tool IntakeAgent")
         elif name.startswith("execute_tool "):
             tool_name = name.replace("execute_tool ", "").strip()
             # Sub-agents typically end with "Agent" or are transfer_to_agent
             if tool_name.endswith("Agent") or tool_name == "transfer_to_agent":
-                handoff_count += 1
-                agents_invoked.add(tool_name)
+                self.handoff_count += 1
+                self.agents_invoked.add(tool_name)
 
-    explanation = (
-        f"Total Handoffs: {handoff_count}. "
-        f"Unique Agents: {len(agents_invoked)}. "
-        f"Agents: {list(agents_invoked)}"
-    )
+    def result(self) -> Tuple[float, str, Dict[str, Any]]:
+        explanation = (
+            f"Total Handoffs: {self.handoff_count}. "
+            f"Unique Agents: {len(self.agents_invoked)}. "
+            f"Agents: {list(self.agents_invoked)}"
+        )
 
-    details = {
-        "total_handoffs": handoff_count,
-        "unique_agents_count": len(agents_invoked),
-        "agents_invoked_list": list(agents_invoked),
-    }
+        details = {
+            "total_handoffs": self.handoff_count,
+            "unique_agents_count": len(self.agents_invoked),
+            "agents_invoked_list": list(self.agents_invoked),
+        }
 
-    return float(handoff_count), explanation, details
+        return float(self.handoff_count), explanation, details
 
 
-def calculate_output_density(
+def calculate_agent_handoffs(
     session_trace: List[Dict[str, Any]],
 ) -> Tuple[float, str, Dict[str, Any]]:
     """
-    Calculate the average number of output tokens per LLM call.
-    Returns average output tokens as the score.
+    Count the number of agent handoffs/invocations in the session.
+    Returns total handoff events as the score.
+
+    Captures:
+    - Direct agent invocations (invoke_agent, agent_run)
+    - Sub-agents called as tools (execute_tool *Agent, transfer_to_agent)
     """
-    total_output_tokens = 0
-    llm_calls = 0
+    return _run_single("agent_handoffs", AgentHandoffsAccumulator(), session_trace)
 
-    if not session_trace:
-        return 0.0, "No trace data available for output density", {}
 
-    for span in session_trace:
-        attributes = span.get("attributes", {})
+class OutputDensityAccumulator(MetricAccumulator):
+    empty_explanation = "No trace data available for output density"
+
+    def __init__(self):
+        self.total_output_tokens = 0
+        self.llm_calls = 0
+
+    def add(self, span: SpanView) -> None:
+        attributes = span.span.get("attributes", {})
 
         # Check for LLM response with usage metadata
         llm_response = attributes.get("gcp.vertex.agent.llm_response")
         if llm_response:
             try:
-                response_data = (
-                    json.loads(llm_response)
-                    if isinstance(llm_response, str)
-                    else llm_response
-                )
+                response_data = span.llm_response()
                 usage = response_data.get("usage_metadata", {})
 
                 # Check for output tokens in standard fields (candidates_token_count or output_token_count)
@@ -638,41 +799,45 @@ def calculate_output_density(
                 if (
                     output_tokens > 0 or usage
                 ):  # Count the call even if 0 output (edge case)
-                    llm_calls += 1
-                    total_output_tokens += output_tokens
+                    self.llm_calls += 1
+                    self.total_output_tokens += output_tokens
 
             except (json.JSONDecodeError, TypeError, AttributeError):
-                continue
+                return
 
-    if llm_calls > 0:
-        average_output_tokens = total_output_tokens / llm_calls
-    else:
-        average_output_tokens = 0.0
+    def result(self) -> Tuple[float, str, Dict[str, Any]]:
+        if self.llm_calls > 0:
+            average_output_tokens = self.total_output_tokens / self.llm_calls
+        else:
+            average_output_tokens = 0.0
 
-    explanation = (
-        f"Avg Output Tokens: {average_output_tokens:.2f}. "
-        f"Total Output Tokens: {total_output_tokens}. "
-        f"LLM Calls: {llm_calls}."
-    )
+        explanation = (
+            f"Avg Output Tokens: {average_output_tokens:.2f}. "
+            f"Total Output Tokens: {self.total_output_tokens}. "
+            f"LLM Calls: {self.llm_calls}."
+        )
 
-    details = {
-        "average_output_tokens": average_output_tokens,
-        "total_output_tokens": total_output_tokens,
-        "llm_calls_count": llm_calls,
-    }
+        details = {
+            "average_output_tokens": average_output_tokens,
+            "total_output_tokens": self.total_output_tokens,
+            "llm_calls_count": self.llm_calls,
+        }
 
-    return float(average_output_tokens), explanation, details
+        return float(average_output_tokens), explanation, details
 
 
-def calculate_sandbox_usage(
+def calculate_output_density(
     session_trace: List[Dict[str, Any]],
 ) -> Tuple[float, str, Dict[str, Any]]:
     """
-    Count the number of tool calls related to sandbox/file system operations.
-    Returns the total count as the score.
+    Calculate the average number of output tokens per LLM call.
+    Returns average output tokens as the score.
     """
-    sandbox_ops_count = 0
-    sandbox_tools_used = {}
+    return _run_single("output_density", OutputDensityAccumulator(), session_trace)
+
+
+class SandboxUsageAccumulator(MetricAccumulator):
+    empty_explanation = "No trace data available for sandbox usage"
 
     # Common keywords for sandbox/file operations
     sandbox_keywords = [
@@ -686,10 +851,12 @@ def calculate_sandbox_usage(
         "read_from_file",
     ]
 
-    if not session_trace:
-        return 0.0, "No trace data available for sandbox usage", {}
+    def __init__(self):
+        self.sandbox_ops_count = 0
+        self.sandbox_tools_used = {}
 
-    for span in session_trace:
+    def add(self, span: SpanView) -> None:
+        span = span.span
         name = span.get("name", "")
 
         # Check for tool execution spans
@@ -701,33 +868,46 @@ def calculate_sandbox_usage(
                 tool_name = span["attributes"]["gen_ai.tool.name"]
 
             # Check if tool matches sandbox keywords
-            if any(keyword in tool_name.lower() for keyword in sandbox_keywords):
-                sandbox_ops_count += 1
-                sandbox_tools_used[tool_name] = sandbox_tools_used.get(tool_name, 0) + 1
+            if any(keyword in tool_name.lower() for keyword in self.sandbox_keywords):
+                self.sandbox_ops_count += 1
+                self.sandbox_tools_used[tool_name] = self.sandbox_tools_used.get(tool_name, 0) + 1
 
-    unique_ops_used = len(sandbox_tools_used)
+    def result(self) -> Tuple[float, str, Dict[str, Any]]:
+        sandbox_tools_used = self.sandbox_tools_used
+        unique_ops_used = len(sandbox_tools_used)
 
-    breakdown_str = ", ".join([f"{k}: {v}" for k, v in sandbox_tools_used.items()])
+        breakdown_str = ", ".join([f"{k}: {v}" for k, v in sandbox_tools_used.items()])
 
-    explanation = (
-        f"Total Sandbox Ops: {sandbox_ops_count}. "
-        f"Unique Ops: {unique_ops_used}. "
-        f"Breakdown: [{breakdown_str}]"
-    )
+        explanation = (
+            f"Total Sandbox Ops: {self.sandbox_ops_count}. "
+            f"Unique Ops: {unique_ops_used}. "
+            f"Breakdown: [{breakdown_str}]"
+        )
 
-    details = {
-        "total_sandbox_ops": sandbox_ops_count,
-        "unique_ops_used": unique_ops_used,
-        "sandbox_tools_used": sandbox_tools_used,
-    }
+        details = {
+            "total_sandbox_ops": self.sandbox_ops_count,
+            "unique_ops_used": unique_ops_used,
+            "sandbox_tools_used": sandbox_tools_used,
+        }
+
+        return float(self.sandbox_ops_count), explanation, details
 
-    return float(sandbox_ops_count), explanation, details
+
+def calculate_sandbox_usage(
+    session_trace: List[Dict[str, Any]],
+) -> Tuple[float, str, Dict[str, Any]]:
+    """
+    Count the number of tool calls related to sandbox/file system operations.
+    Returns the total count as the score.
+    """
+    return _run_single("sandbox_usage", SandboxUsageAccumulator(), session_trace)
 
 
 # Registry of all deterministic metrics
 DETERMINISTIC_METRICS = {
     "token_usage": calculate_token_usage,
     "latency_metrics": calculate_latency_metrics,
+    "user_perceived_latency": calculate_user_perceived_latency,
     "cache_efficiency": calculate_cache_efficiency,
     "thinking_metrics": calculate_thinking_metrics,
     "tool_utilization": calculate_tool_utilization,
@@ -739,6 +919,22 @@ DETERMINISTIC_METRICS = {
     "sandbox_usage": calculate_sandbox_usage,
 }
 
+# Metrics computed from the session trace alone, evaluated together in one fused pass.
+# Each factory takes the per-interaction latency_data (only latency_metrics uses it).
+TRACE_METRIC_ACCUMULATORS = {
+    "token_usage": lambda latency_data: TokenUsageAccumulator(),
+    "latency_metrics": lambda latency_data: LatencyAccumulator(latency_data),
+    "cache_efficiency": lambda latency_data: CacheEfficiencyAccumulator(),
+    "thinking_metrics": lambda latency_data: ThinkingAccumulator(),
+    "tool_utilization": lambda latency_data: ToolUtilizationAccumulator(),
+    "tool_success_rate": lambda latency_data: ToolSuccessRateAccumulator(),
+    "grounding_utilization": lambda latency_data: GroundingAccumulator(),
+    "context_saturation": lambda latency_data: ContextSaturationAccumulator(),
+    "agent_handoffs": lambda latency_data: AgentHandoffsAccumulator(),
+    "output_density": lambda latency_data: OutputDensityAccumulator(),
+    "sandbox_usage": lambda latency_data: SandboxUsageAccumulator(),
+}
+
 
 def evaluate_deterministic_metrics(
     session_state: Dict[str, Any],
@@ -749,13 +945,26 @@ def evaluate_deterministic_metrics(
     reference_data: Dict[str, Any] = None,
     metric_definitions: Dict[str, Any] = None,
     latency_data: List[Dict[str, Any]] = None,
+    streaming_latency: List[Dict[str, Any]] = None,
 ) -> Dict[str, Dict[str, Any]]:
     """
     Evaluate all specified deterministic metrics.
+
+    Trace-based metrics share a single pass over the session trace (see
+    run_trace_metrics); each span's JSON payloads are decoded at most once.
     """
     if metrics_to_run is None:
         metrics_to_run = list(DETERMINISTIC_METRICS.keys())
 
+    fused = run_trace_metrics(
+        session_trace,
+        {
+            name: TRACE_METRIC_ACCUMULATORS[name](latency_data)
+            for name in metrics_to_run
+            if name in TRACE_METRIC_ACCUMULATORS
+        },
+    )
+
     results = {}
     for metric_name in metrics_to_run:
         if metric_name not in DETERMINISTIC_METRICS:
@@ -764,9 +973,14 @@ def evaluate_deterministic_metrics(
         metric_func = DETERMINISTIC_METRICS[metric_name]
 
         try:
-            if metric_name == "latency_metrics":
+            if metric_name in fused:
+                outcome = fused[metric_name]
+                if isinstance(outcome, Exception):
+                    raise outcome
+                score, explanation, details = outcome
+            elif metric_name == "user_perceived_latency":
                 score, explanation, details = metric_func(
-                    session_trace, latency_data=latency_data
+                    session_trace, streaming_latency=streaming_latency
                 )
             else:
                 score, explanation, details = metric_func(session_trace)
@@ -783,3 +997,37 @@ def evaluate_deterministic_metrics(
             }
 
     return results
+
+
+def evaluate_deterministic_task(
+    task: Tuple[Any, Dict[str, Any]],
+) -> Tuple[Any, Optional[Dict[str, Dict[str, Any]]], Optional[str]]:
+    """
+    Process-pool entry point: evaluates all deterministic metrics for one interaction row.
+
+    task is (row_key, inputs), where inputs holds the evaluate_deterministic_metrics
+    arguments keyed by interaction column. Values passed as bytes are JSON and are
+    decoded here, so large traces cross the process boundary as flat buffers
+    rather than pickled object graphs.
+
+    Returns (row_key, results, None), or (row_key, None, error message) on failure.
+    """
+    key, inputs = task
+    try:
+        inputs = {
+            name: json.loads(value) if isinstance(value, bytes) else value
+            for name, value in inputs.items()
+        }
+        results = evaluate_deterministic_metrics(
+            session_state=inputs.get("final_session_state") or {},
+            session_trace=inputs.get("session_trace") or [],
+            agents_evaluated=inputs.get("agents_evaluated") or [],
+            reference_data=inputs.get("reference_data") or {},
+            question_metadata=inputs.get("question_metadata") or {},
+            metrics_to_run=list(DETERMINISTIC_METRICS.keys()),
+            latency_data=inputs.get("latency_data") or [],
+            streaming_latency=inputs.get("streaming_latency") or [],
+        )
+        return key, results, None
+    except Exception as e:
+        return key, None, str(e)
@@ -1,24 +1,44 @@
 import argparse
 import concurrent.futures
+import hashlib
 import json
 import logging
 import math
 import os
 import sys
-import time
 from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
 from google.cloud import aiplatform
 from vertexai import Client, types
 from vertexai.preview.evaluation import PointwiseMetric
 
+from evaluation.core.blob_store import (
+    BLOB_FIELDS,
+    BLOB_SUFFIX,
+    BlobRef,
+    blob_path,
+    bundle_blob_file,
+    check_blob_file,
+    load_blob,
+    open_blob_ref,
+)
 from evaluation.core.config import CONFIG
-from evaluation.core.deterministic_metrics import DETERMINISTIC_METRICS, evaluate_deterministic_metrics
-from evaluation.core.data_mapper import map_dataset_columns, robust_json_loads
+from evaluation.core.deterministic_metrics import (
+    DETERMINISTIC_METRICS,
+    evaluate_deterministic_metrics,
+    evaluate_deterministic_task,
+)
+from evaluation.core.data_mapper import MappingPlanner, map_dataset_columns, robust_json_loads
+from evaluation.core.journal import InteractionJournal
+from evaluation.core.json_stream import LazyValue, json_default
+from evaluation.core.judge_cache import JudgeCache
+from evaluation.core.judge_scheduler import ConcurrencyController, JudgeScheduler
+from evaluation.core.parquet_store import read_parquet, write_parquet
+from evaluation.core.results_archive import write_results_archive
 
 # Setup Logger
 logging.basicConfig(
@@ -28,6 +48,96 @@ logging.basicConfig(
 )
 logger = logging.getLogger("agent_eval")
 
+# Interaction columns read by the deterministic metrics
+DETERMINISTIC_INPUT_COLUMNS = (
+    "final_session_state", "session_trace", "agents_evaluated", "reference_data",
+    "question_metadata", "latency_data", "streaming_latency",
+)
+
+# Columns of raw/judge_concurrency.csv (ConcurrencyController.timeline)
+JUDGE_TIMELINE_COLUMNS = ["elapsed_seconds", "limit", "in_flight", "event", "seconds_per_row", "error_rate"]
+
+# Long-form scores table built by build_scores_table (submetric is None for the metric score itself)
+SCORE_TABLE_COLUMNS = ["question_id", "run_id", "metric", "submetric", "score"]
+
+# Judge input strings longer than this are truncated in eval_results
+INPUT_TRUNCATE_CHARS = 500
+
+# LLM metric fields copied into the per-question summary
+LLM_SUMMARY_FIELDS = ("score", "explanation", "rubric_verdicts", "error", "input")
+
+# Finished LLM metric tasks of a run (raw/ subfolder), one JSONL record each, for evaluate --resume
+EVAL_CHECKPOINT_FILE = "eval_checkpoint.jsonl"
+
+
+def json_serializer(obj):
+    """Custom serializer that handles NaN, numpy types, and other edge cases."""
+    if isinstance(obj, LazyValue):
+        return obj.load()
+    if isinstance(obj, float) and (math.isnan(obj) or math.isinf(obj)):
+        return None
+    if hasattr(obj, 'tolist'):  # numpy arrays
+        return obj.tolist()
+    if hasattr(obj, 'item'):  # numpy scalars
+        return obj.item()
+    return str(obj)
+
+
+def results_blob_value(value: Any, original: Any, base_dir: Path, bundled: Dict[str, str]) -> Any:
+    """
+    The results-file form of a blob column value: a BlobRef becomes a reference
+    from `base_dir` into the results' own copy of its blob file (`bundled`:
+    source blob file -> bundled file).
+    """
+    if not isinstance(value, BlobRef):
+        return original
+    ref = BlobRef(bundled.get(value.path, value.path), value.offset, value.length).reference(base_dir)
+    return json.dumps(ref) if isinstance(original, str) else ref
+
+
+def _frame_to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    return json.loads(json.dumps(df.to_dict("records"), default=json_serializer))
+
+
+def _hashable_cell(value: Any) -> Any:
+    return json.dumps(value, sort_keys=True, default=str) if isinstance(value, (dict, list)) else value
+
+
+def eval_task_fingerprint(metric_name: str, definition: Dict[str, Any], eval_dataset: pd.DataFrame) -> str:
+    """Hash of a metric task's definition and input rows; a checkpoint is only reused if it matches.
+
+    Rows are digested with pandas' vectorized row hashes; only nested cells are
+    serialized first.
+    """
+    hashable = eval_dataset.apply(lambda column: column.map(_hashable_cell) if column.dtype == object else column)
+    header = json.dumps([metric_name, definition, [str(c) for c in eval_dataset.columns]], sort_keys=True, default=str)
+    digest = hashlib.sha256(header.encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(hashable, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def checkpoint_record(
+    task_id: str, fingerprint: str, result_df: pd.DataFrame, metric_name: str, input_df: pd.DataFrame
+) -> Dict[str, Any]:
+    """One finished metric task as a JSON-serializable checkpoint record."""
+    return {
+        "task_id": task_id,
+        "fingerprint": fingerprint,
+        "metric_name": metric_name,
+        "results": _frame_to_records(result_df),
+        "inputs": _frame_to_records(input_df) if isinstance(input_df, pd.DataFrame) else None,
+    }
+
+
+def restore_checkpoint(record: Dict[str, Any]) -> Tuple[pd.DataFrame, str, Optional[pd.DataFrame]]:
+    """Inverse of checkpoint_record: (parsed_results_df, metric_name, input_dataset_df)."""
+    inputs = record.get("inputs")
+    return (
+        pd.DataFrame(record["results"]),
+        record["metric_name"],
+        pd.DataFrame(inputs) if inputs is not None else None,
+    )
+
 def serialize_rubric_verdicts(rubric_verdicts: Any) -> Optional[List[Dict]]:
     """Serialize rubric verdicts to JSON-compatible format."""
     if not rubric_verdicts:
@@ -118,32 +228,117 @@ def parse_eval_result(
     return pd.DataFrame(rows)
 
 
-def run_single_metric_evaluation(
+def judge_metric_rows(
+    eval_dataset: pd.DataFrame, metric_obj: Any, metric_df: pd.DataFrame, metric_name: str, client: Any
+) -> pd.DataFrame:
+    """One judge call for a metric dataset; errors are raised to the caller."""
+    result = client.evals.evaluate(dataset=eval_dataset, metrics=[metric_obj])
+    return parse_eval_result(result, metric_name, metric_df)
+
+
+def _cacheable_result(row: Dict[str, Any], metric_name: str) -> bool:
+    """Only successful verdicts are cached; failed rows are judged again next run."""
+    score = row.get(f"{metric_name}/score")
+    error = row.get(f"{metric_name}/error")
+    try:
+        return not pd.isna(score) and (error is None or pd.isna(error))
+    except (ValueError, TypeError):
+        return False
+
+
+def run_cached_metric_evaluation(
+    task_args: Tuple,
+    judge_cache: JudgeCache,
+    fingerprint: str,
+    judge: Callable[[Tuple], Optional[pd.DataFrame]],
+) -> Tuple[Optional[pd.DataFrame], str, Optional[pd.DataFrame]]:
+    """Only sends judge-cache misses to Vertex AI.
+
+    Rows whose key is in the cache are answered from it; the remaining rows are
+    evaluated with `judge` (called with the task tuple of the miss rows) and
+    their verdicts stored. Returns the same tuple as run_metric_chunk, covering
+    hit and miss rows in their original order.
+    """
+    eval_dataset, metric_obj, metric_df, metric_name = task_args[:4]
+    if len(eval_dataset) != len(metric_df):
+        # Rows can't be matched back to their inputs (e.g. GEMINI format over all rows)
+        parsed_df = judge(task_args)
+        judge_cache.record(metric_name, hits=0, misses=len(eval_dataset))
+        return parsed_df, metric_name, eval_dataset if parsed_df is not None else None
+
+    keys = [judge_cache.key(fingerprint, row) for row in eval_dataset.to_dict("records")]
+    results: List[Optional[Dict[str, Any]]] = [judge_cache.get(key) for key in keys]
+    misses = [pos for pos, cached in enumerate(results) if cached is None]
+    if misses:
+        logger.info(f"Judge cache: {metric_name} has {len(keys) - len(misses)} hits, {len(misses)} misses")
+        miss_args = (eval_dataset.iloc[misses], metric_obj, metric_df.iloc[misses]) + tuple(task_args[3:])
+        parsed_df = judge(miss_args)
+        if parsed_df is not None:
+            position_of = {label: pos for pos, label in enumerate(metric_df.index)}
+            for row in parsed_df.to_dict("records"):
+                pos = position_of.get(row.pop("original_index", None))
+                if pos is None:
+                    continue
+                results[pos] = row
+                if _cacheable_result(row, metric_name):
+                    judge_cache.put(keys[pos], row)
+    # Counted once the judge call is done, so a raised (and retried) call isn't counted twice
+    judge_cache.record(metric_name, hits=len(keys) - len(misses), misses=len(misses))
+
+    positions = [pos for pos, row in enumerate(results) if row is not None]
+    if not positions:
+        return None, metric_name, None
+    result_df = pd.DataFrame(
+        [{"original_index": metric_df.index[pos], **results[pos]} for pos in positions]
+    )
+    return result_df, metric_name, eval_dataset.iloc[positions]
+
+
+def returned_rows(
+    parsed_df: pd.DataFrame, eval_dataset: pd.DataFrame, metric_df: pd.DataFrame
+) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]:
+    """
+    The parsed results the judge returned for rows of metric_df, and the
+    eval_dataset rows they were judged on, in the same order.
+
+    The judge may answer only some rows of a call; inputs are picked by
+    original_index so they stay attached to their results.
+    """
+    position_of = {label: pos for pos, label in enumerate(metric_df.index)}
+    positions = [position_of.get(label) for label in parsed_df["original_index"]]
+    kept = [row for row, pos in enumerate(positions) if pos is not None]
+    if not kept:
+        return None, None
+    return parsed_df.iloc[kept].reset_index(drop=True), eval_dataset.iloc[[positions[row] for row in kept]]
+
+
+def run_metric_chunk(
     task_args: Tuple,
+    judge_cache: Optional[JudgeCache] = None,
+    fingerprint: Optional[str] = None,
 ) -> Tuple[Optional[pd.DataFrame], str, Optional[pd.DataFrame]]:
-    """Worker function for parallel evaluation.
+    """Worker function for one row chunk of a metric task.
+
+    Makes a single judge call (through the judge cache when given) and lets
+    errors propagate: the scheduler classifies them, backs off and decides which
+    rows to retry, using the retries and delay carried in the task tuple.
 
     Returns:
         Tuple of (parsed_results_df, metric_name, input_dataset_df)
     """
-    eval_dataset, metric_obj, metric_df, metric_name, client, retries, delay = task_args
+    eval_dataset, metric_obj, metric_df, metric_name, client = task_args[:5]
 
-    for attempt in range(retries):
-        try:
-            logger.info(f"Starting evaluation: {metric_name} (Attempt {attempt + 1})")
-            result = client.evals.evaluate(dataset=eval_dataset, metrics=[metric_obj])
-            parsed_df = parse_eval_result(result, metric_name, metric_df)
-            logger.info(f"Finished evaluation: {metric_name}")
-            # Return input dataset along with results for full traceability
-            return parsed_df, metric_name, eval_dataset
-        except Exception as e:
-            logger.error(f"Failed '{metric_name}': {e}")
-            if attempt < retries - 1:
-                time.sleep(delay * (2**attempt))
-            else:
-                logger.critical(f"'{metric_name}' exhausted retries.")
+    def judge(args: Tuple) -> pd.DataFrame:
+        return judge_metric_rows(*args[:5])
 
-    return None, metric_name, None
+    if judge_cache is not None:
+        return run_cached_metric_evaluation(task_args, judge_cache, fingerprint, judge=judge)
+    parsed_df = judge(task_args)
+    if len(eval_dataset) != len(metric_df):
+        # Rows can't be matched back to their inputs (e.g. GEMINI format over all rows)
+        return parsed_df, metric_name, eval_dataset
+    result_df, input_df = returned_rows(parsed_df, eval_dataset, metric_df)
+    return result_df, metric_name, input_df
 
 
 def load_and_consolidate_metrics(metric_files: List[str]) -> Dict[str, Any]:
@@ -202,6 +397,167 @@ def filter_metrics_by_criteria(
     return filtered
 
 
+def _column_values(df: pd.DataFrame, column: str) -> List[Any]:
+    """A column as Python objects with missing values (None/NaN/NaT) as None; all None if absent."""
+    if column not in df.columns:
+        return [None] * len(df)
+    values = df[column]
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def _traceable_inputs(input_df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    The judge input rows as dicts for the per-metric "input" field: missing
+    values are left out and strings longer than INPUT_TRUNCATE_CHARS are cut.
+    """
+    frame = input_df.astype(object)
+    present = input_df.notna().to_numpy()
+    for column in frame.columns:
+        values = frame[column]
+        is_text = values.map(type).eq(str)
+        if not is_text.any():
+            continue
+        text = values[is_text]
+        long_text = text[text.str.len() > INPUT_TRUNCATE_CHARS]
+        if not long_text.empty:
+            frame.loc[long_text.index, column] = long_text.str.slice(0, INPUT_TRUNCATE_CHARS) + "... [truncated]"
+
+    columns = list(frame.columns)
+    return [
+        {c: v for c, v, keep in zip(columns, row, mask) if keep}
+        for row, mask in zip(frame.itertuples(index=False, name=None), present)
+    ]
+
+
+def llm_metric_results(
+    result_df: pd.DataFrame, metric_name: str, input_df: Optional[pd.DataFrame]
+) -> List[Tuple[int, Dict[str, Any]]]:
+    """
+    (original_index, metric result) for every row of one LLM metric's parsed
+    results, as stored in eval_results: score, explanation (JSON-decoded when
+    it is a JSON list), rubric_verdicts and error when present, and the judge
+    input row for traceability.
+
+    Result rows are matched to input rows by position (the result_df index).
+    """
+    inputs = _traceable_inputs(input_df) if isinstance(input_df, pd.DataFrame) else []
+    columns = zip(
+        result_df.index.tolist(),
+        result_df["original_index"].astype(int).tolist(),
+        _column_values(result_df, f"{metric_name}/score"),
+        _column_values(result_df, f"{metric_name}/explanation"),
+        _column_values(result_df, f"{metric_name}/rubric_verdicts"),
+        _column_values(result_df, f"{metric_name}/error"),
+    )
+
+    results = []
+    for position, idx, score, explanation, rubric_verdicts, error in columns:
+        metric_result = {"score": score}
+        # Skip empty explanations (some metrics don't return explanations)
+        if explanation:
+            # Try to parse JSON explanations (HALLUCINATION, GROUNDING return JSON strings)
+            if isinstance(explanation, str) and explanation.startswith("["):
+                try:
+                    explanation = json.loads(explanation)
+                except json.JSONDecodeError:
+                    pass
+            metric_result["explanation"] = explanation
+        # rubric_verdicts of managed rubric-based metrics
+        if rubric_verdicts is not None:
+            metric_result["rubric_verdicts"] = rubric_verdicts
+        if error is not None:
+            metric_result["error"] = str(error)
+        if isinstance(position, int) and 0 <= position < len(inputs) and inputs[position]:
+            metric_result["input"] = inputs[position]
+        results.append((idx, metric_result))
+    return results
+
+
+def _is_deterministic_metric(metric: str) -> bool:
+    return metric in DETERMINISTIC_METRICS or any(
+        metric.endswith(f"_{k}") for k in DETERMINISTIC_METRICS
+    )
+
+
+def build_scores_table(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[Any, Dict[str, Dict]]]:
+    """
+    Flattens every row's eval_results in one pass.
+
+    Returns the long-form scores table (SCORE_TABLE_COLUMNS: one row per numeric
+    metric score, plus one per numeric detail of a scored metric, named
+    "<metric>.<submetric>") and, per question_id, the deterministic and LLM
+    metric payloads of its last run. Rows are visited in question_id order.
+    """
+    records = []
+    payloads: Dict[Any, Dict[str, Dict]] = {}
+    is_det_cache: Dict[str, bool] = {}
+
+    questions = df["question_id"]
+    order = questions[questions.notna()].sort_values(kind="stable").index
+    run_ids = df["run_id"] if "run_id" in df.columns else pd.Series(df.index, index=df.index)
+    for question_id, run_id, raw in zip(
+        questions.loc[order], run_ids.loc[order], df.loc[order, "eval_results"]
+    ):
+        det_metrics, llm_metrics = payloads.setdefault(
+            question_id, {"deterministic_metrics": {}, "llm_metrics": {}}
+        ).values()
+        result_dict = robust_json_loads(raw)
+        if not isinstance(result_dict, dict):
+            continue
+        for metric, val in result_dict.items():
+            if not isinstance(val, dict):
+                continue
+            is_det = is_det_cache.get(metric)
+            if is_det is None:
+                is_det = is_det_cache[metric] = _is_deterministic_metric(metric)
+            if val.get("score") is not None:
+                try:
+                    s = float(val["score"])
+                except (ValueError, TypeError):
+                    s = math.nan
+                if not math.isnan(s):
+                    records.append((question_id, run_id, metric, None, s))
+                    details = val.get("details")
+                    if isinstance(details, dict):
+                        for k, v in details.items():
+                            if isinstance(v, (int, float)) and not isinstance(v, bool):
+                                records.append((question_id, run_id, metric, k, v))
+            if is_det:
+                det_metrics[metric] = val.get("details") or val.get("score")
+            else:
+                # Include all available fields for LLM metrics (full input/output):
+                # score/explanation, rubric_verdicts of managed rubric-based metrics,
+                # error if present and the judge input for traceability
+                llm_metrics[metric] = {key: val[key] for key in LLM_SUMMARY_FIELDS if key in val}
+
+    scores = pd.DataFrame.from_records(records, columns=SCORE_TABLE_COLUMNS)
+    scores["score"] = scores["score"].astype(float)
+    return scores, payloads
+
+
+def score_statistics(scores: pd.DataFrame, by: List[str]) -> pd.DataFrame:
+    """count/mean/std/min/max/p50/p90 of the scores table per `by` (+ metric name)."""
+    names = scores["metric"].where(
+        scores["submetric"].isna(), scores["metric"] + "." + scores["submetric"].astype(str)
+    )
+    grouped = scores.assign(name=names).groupby(by + ["name"], sort=False)["score"]
+    # agg + quantile stay vectorised; groupby.describe() runs once per group
+    stats = grouped.agg(["count", "mean", "std", "min", "max"])
+    stats["p50"] = grouped.quantile(0.5)
+    stats["p90"] = grouped.quantile(0.9)
+    stats["count"] = stats["count"].astype(int)
+    return stats
+
+
+def _statistics_records(stats: pd.DataFrame) -> List[Tuple[Any, Dict[str, Any]]]:
+    """(index key, stats dict) pairs with NaN (e.g. std of a single score) as None."""
+    columns = list(stats.columns)
+    return [
+        (key, {c: None if v != v else v for c, v in zip(columns, values)})
+        for key, values in zip(stats.index, stats.itertuples(index=False, name=None))
+    ]
+
+
 def save_metrics_summary(
     df: pd.DataFrame,
     results_dir: Path,
@@ -209,6 +565,7 @@ def save_metrics_summary(
     run_type: str,
     test_description: str,
     metric_definitions: Dict[str, Any] = None,
+    judge_cache_stats: Optional[Dict[str, Any]] = None,
 ) -> None:
     """Calculate and save a comprehensive summary of metrics including full input/output."""
     logger.info("--- Generating Metrics Summary ---")
@@ -220,76 +577,35 @@ def save_metrics_summary(
             if isinstance(info, dict) and "score_range" in info:
                 score_ranges[name] = info["score_range"]
 
-    grouped = df.groupby("question_id")
+    scores, payloads = build_scores_table(df)
+    overall_stats = _statistics_records(score_statistics(scores, []))
+    per_question_stats = defaultdict(dict)
+    for (question_id, metric), stats in _statistics_records(score_statistics(scores, ["question_id"])):
+        per_question_stats[question_id][metric] = stats
+
+    runs = df["question_id"].value_counts(sort=False)
+    first_rows = df.drop_duplicates("question_id")
+    metadata_column = (
+        first_rows["question_metadata"] if "question_metadata" in df.columns else pd.Series("{}", index=first_rows.index)
+    )
+    first_metadata = dict(zip(first_rows["question_id"], metadata_column))
     all_question_summaries = []
-    per_metric_scores = defaultdict(list)
-
-    for question_id, group in grouped:
-        group["eval_results"] = group["eval_results"].apply(robust_json_loads)
-        det_metrics, llm_metrics = {}, {}
-        for result_dict in group["eval_results"].dropna():
-            if not isinstance(result_dict, dict):
-                continue
-            for metric, val in result_dict.items():
-                if not isinstance(val, dict):
-                    continue
-                is_det = metric in DETERMINISTIC_METRICS or any(
-                    metric.endswith(f"_{k}") for k in DETERMINISTIC_METRICS
-                )
-                if "score" in val and val["score"] is not None:
-                    try:
-                        s = float(val["score"])
-                        if not math.isnan(s):
-                            per_metric_scores[metric].append(s)
-                            if "details" in val and isinstance(val["details"], dict):
-                                for k, v in val["details"].items():
-                                    if isinstance(v, (int, float)) and not isinstance(
-                                        v, bool
-                                    ):
-                                        per_metric_scores[f"{metric}.{k}"].append(v)
-                    except (ValueError, TypeError):
-                        pass
-                if is_det:
-                    det_metrics[metric] = val.get("details") or val.get("score")
-                else:
-                    # Include all available fields for LLM metrics (full input/output)
-                    llm_metric_data = {}
-
-                    # Core output fields
-                    if "score" in val:
-                        llm_metric_data["score"] = val["score"]
-                    if "explanation" in val:
-                        llm_metric_data["explanation"] = val["explanation"]
-
-                    # Rubric verdicts for managed rubric-based metrics
-                    if "rubric_verdicts" in val:
-                        llm_metric_data["rubric_verdicts"] = val["rubric_verdicts"]
-
-                    # Error if present
-                    if "error" in val:
-                        llm_metric_data["error"] = val["error"]
-
-                    # Input data for full traceability
-                    if "input" in val:
-                        llm_metric_data["input"] = val["input"]
-
-                    llm_metrics[metric] = llm_metric_data
-
-        metadata = robust_json_loads(group.iloc[0].get("question_metadata", "{}")) or {}
+    for question_id, payload in payloads.items():
+        metadata = robust_json_loads(first_metadata[question_id]) or {}
         summary = {
             "question_id": question_id,
-            "runs": len(group),
-            "deterministic_metrics": det_metrics,
-            "llm_metrics": llm_metrics,
+            "runs": int(runs[question_id]),
+            **payload,
+            "score_statistics": per_question_stats.get(question_id, {}),
         }
-        summary.update(metadata)
+        if isinstance(metadata, dict):
+            summary.update(metadata)
         all_question_summaries.append(summary)
 
-    det_summary, llm_summary = {}, {}
-    for metric, scores in per_metric_scores.items():
-        if not scores:
-            continue
-        avg = sum(scores) / len(scores)
+    det_summary, llm_summary, score_stats = {}, {}, {}
+    for metric, stats in overall_stats:
+        score_stats[metric] = stats
+        avg = stats["mean"]
         if any(metric.startswith(f"{k}.") for k in DETERMINISTIC_METRICS):
             det_summary[metric] = avg
         elif metric in DETERMINISTIC_METRICS:
@@ -309,9 +625,12 @@ def save_metrics_summary(
         "overall_summary": {
             "deterministic_metrics": det_summary,
             "llm_based_metrics": llm_summary,
+            "score_statistics": score_stats,
         },
         "per_question_summary": all_question_summaries,
     }
+    if judge_cache_stats is not None:
+        output["judge_cache"] = judge_cache_stats
     with open(results_dir / "eval_summary.json", "w") as f:
         json.dump(output, f, indent=4, default=str)
     logger.info(f"Metrics summary saved to {results_dir / 'eval_summary.json'}")
@@ -329,16 +648,134 @@ class Evaluator:
         aiplatform.init(project=self.project_id, location=self.location)
         self.client = Client(project=self.project_id, location=self.location)
 
+    def _run_deterministic_metrics(
+        self, expanded_df: pd.DataFrame, original_df: pd.DataFrame
+    ) -> Dict[Any, Dict[str, Any]]:
+        """
+        Computes deterministic metrics for every row with a final session state.
+
+        With CONFIG.DETERMINISTIC_WORKERS > 1 the rows are sharded across a process
+        pool. Each worker gets the row's JSON columns as raw bytes (the CSV text
+        as read, side-car blob bytes, or re-encoded JSONL values) instead of
+        pickled objects, and results are merged back in row order.
+        """
+        det_results_map = defaultdict(dict)
+        workers = CONFIG.DETERMINISTIC_WORKERS
+
+        if workers <= 1:
+            for index, row in expanded_df.iterrows():
+                try:
+                    if not row.get("final_session_state"):
+                        continue
+
+                    res = evaluate_deterministic_metrics(
+                        session_state=load_blob(row.get("final_session_state")) or {},
+                        session_trace=load_blob(row.get("session_trace")) or [],
+                        agents_evaluated=row.get("agents_evaluated") or [],
+                        reference_data=row.get("reference_data") or {},
+                        question_metadata=row.get("question_metadata") or {}, # Assuming this is dict from load
+                        metrics_to_run=list(DETERMINISTIC_METRICS.keys()),
+                        latency_data=row.get("latency_data") or [],
+                        streaming_latency=row.get("streaming_latency") or []
+                    )
+                    det_results_map[index].update(res)
+                except Exception as e:
+                    logger.error(f"Row {index} deterministic error: {e}")
+            return det_results_map
+
+        tasks = []
+        for index, row in expanded_df.iterrows():
+            if not row.get("final_session_state"):
+                continue
+            inputs = {}
+            for col in DETERMINISTIC_INPUT_COLUMNS:
+                value = row.get(col)
+                if isinstance(value, BlobRef):
+                    value = value.raw()
+                elif isinstance(value, (dict, list)):
+                    raw = original_df.at[index, col] if col in original_df.columns else None
+                    value = raw.encode("utf-8") if isinstance(raw, str) and raw else json.dumps(value, default=json_default).encode("utf-8")
+                inputs[col] = value
+            tasks.append((index, inputs))
+
+        logger.info(f"Computing deterministic metrics for {len(tasks)} rows on {workers} processes")
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            for index, res, error in executor.map(evaluate_deterministic_task, tasks, chunksize=chunksize):
+                if error is not None:
+                    logger.error(f"Row {index} deterministic error: {error}")
+                else:
+                    det_results_map[index].update(res)
+        return det_results_map
+
+    def _run_judge_tasks(
+        self,
+        eval_tasks: List[Tuple],
+        judge_cache: Optional[JudgeCache] = None,
+        timeline_path: Optional[Path] = None,
+    ) -> Iterator[Tuple[int, pd.DataFrame, str, pd.DataFrame]]:
+        """
+        Runs LLM metric tasks as independently scheduled row chunks (see
+        JudgeScheduler), each chunk through run_metric_chunk and the judge cache.
+
+        A ConcurrencyController sets how many chunks are in flight: it starts at
+        CONFIG.MAX_WORKERS, grows while judge latency and errors stay healthy and
+        halves on quota errors, up to CONFIG.JUDGE_MAX_CONCURRENCY. Quota errors
+        are retried up to CONFIG.JUDGE_MAX_QUOTA_RETRIES times.
+
+        Yields (task_index, parsed_results_df, metric_name, input_dataset_df) as
+        each task finishes. The controller timeline is written to
+        `timeline_path` as CSV.
+        """
+        if not eval_tasks:
+            return
+        controller = ConcurrencyController(CONFIG.MAX_WORKERS, CONFIG.JUDGE_MAX_CONCURRENCY)
+        cache_fingerprints = [cache_fingerprint for _, cache_fingerprint in eval_tasks]
+
+        def run_chunk(task_index: int, chunk_task: Tuple) -> Tuple[Optional[pd.DataFrame], str, Optional[pd.DataFrame]]:
+            return run_metric_chunk(chunk_task, judge_cache, cache_fingerprints[task_index])
+
+        scheduler = JudgeScheduler(
+            [task for task, _ in eval_tasks],
+            run_chunk,
+            controller,
+            CONFIG.JUDGE_CHUNK_SIZE,
+            CONFIG.JUDGE_MAX_CHUNK_SIZE,
+            CONFIG.JUDGE_CHUNK_TARGET_SECONDS,
+            CONFIG.JUDGE_MAX_QUOTA_RETRIES,
+        )
+        try:
+            yield from scheduler.run()
+        finally:
+            if len(controller.timeline) > 1 or controller.quota_errors:
+                logger.info(
+                    f"Judge concurrency: final limit {controller.limit}, "
+                    f"peak {max(entry[1] for entry in controller.timeline)}, {controller.quota_errors} quota errors"
+                )
+            if timeline_path is not None:
+                pd.DataFrame(controller.timeline, columns=JUDGE_TIMELINE_COLUMNS).to_csv(timeline_path, index=False)
+
     def evaluate(self, interaction_file: Path, metrics_files: List[str], results_dir: Path):
         logger.info(f"Starting evaluation on {interaction_file}")
 
         # Load Data - support both CSV and JSONL formats
         file_ext = interaction_file.suffix.lower()
-        if file_ext == '.jsonl':
-            # JSONL format: use standard json module to avoid ujson "Value is too big" errors
-            # with large response payloads (e.g., retail AI full analysis)
-            from evaluation.core.converters import read_jsonl
-            records = read_jsonl(str(interaction_file))
+        if file_ext == '.parquet':
+            # Parquet: nested columns come back already decoded
+            interaction_results = read_parquet(interaction_file)
+            if 'question_id' in interaction_results.columns:
+                interaction_results['question_id'] = interaction_results['question_id'].astype(str)
+            is_jsonl = True
+        elif file_ext == '.jsonl':
+            # JSONL format: parsed incrementally with the standard json module (no ujson
+            # "Value is too big" errors on large payloads, e.g. retail AI full analysis);
+            # trace LLM request bodies stay in the file as lazy references
+            from evaluation.core.converters import INTERACTION_FIELDS, read_jsonl
+            records = read_jsonl(
+                str(interaction_file),
+                fields=INTERACTION_FIELDS,
+                on_limit=lambda e: logger.warning(f"Skipping interaction record: {e}"),
+            )
             interaction_results = pd.DataFrame(records)
             # Ensure question_id is string
             if 'question_id' in interaction_results.columns:
@@ -360,17 +797,29 @@ class Evaluator:
                 metric_definitions, self.config["metric_filters"]
             )
 
-        # Preprocess JSON columns (only needed for CSV format)
-        original_df = interaction_results.copy()
+        # Preprocess JSON columns (only needed for CSV format). Parsed columns are
+        # assigned, never mutated, so original_df can share the column data.
+        original_df = interaction_results.copy(deep=False)
         if not is_jsonl:
             json_cols = [
                 "extracted_data", "reference_data", "latency_data",
-                "agents_evaluated", "user_inputs", "session_trace", "final_session_state"
+                "agents_evaluated", "user_inputs", "session_trace", "final_session_state",
+                "streaming_latency", "turn_timings"
             ]
             for col in json_cols:
                 if col in interaction_results.columns:
                     interaction_results[col] = interaction_results[col].apply(robust_json_loads)
 
+        # Traces and session states stored as side-car blob references are loaded on demand
+        blob_dir = Path(interaction_file).resolve().parent
+        blob_files = {}
+        for col in BLOB_FIELDS:
+            if col in interaction_results.columns:
+                interaction_results[col] = interaction_results[col].map(lambda v: open_blob_ref(v, blob_dir))
+                blob_files.update(dict.fromkeys(v.path for v in interaction_results[col] if isinstance(v, BlobRef)))
+        for path in blob_files:
+            check_blob_file(path, referenced_from=interaction_file)
+
         # Expand data for easy mapping
         dfs = [interaction_results]
         for prefix in [CONFIG.EXTRACTED_DATA_PREFIX, CONFIG.REFERENCE_DATA_PREFIX]:
@@ -381,25 +830,7 @@ class Evaluator:
 
         # --- Phase 1: Deterministic Metrics ---
         logger.info("--- Phase 1: Deterministic Metrics ---")
-        det_results_map = defaultdict(dict)
-        
-        for index, row in expanded_df.iterrows():
-            try:
-                if not row.get("final_session_state"):
-                    continue
-                
-                res = evaluate_deterministic_metrics(
-                    session_state=row.get("final_session_state") or {},
-                    session_trace=row.get("session_trace") or [],
-                    agents_evaluated=row.get("agents_evaluated") or [],
-                    reference_data=row.get("reference_data") or {},
-                    question_metadata=row.get("question_metadata") or {}, # Assuming this is dict from load
-                    metrics_to_run=list(DETERMINISTIC_METRICS.keys()),
-                    latency_data=row.get("latency_data") or []
-                )
-                det_results_map[index].update(res)
-            except Exception as e:
-                logger.error(f"Row {index} deterministic error: {e}")
+        det_results_map = self._run_deterministic_metrics(expanded_df, original_df)
 
         # --- Phase 2: Parallel LLM Evaluation ---
         logger.info("--- Phase 2: Parallel LLM Evaluation ---")
@@ -413,8 +844,24 @@ class Evaluator:
             for agent in info.get("agents", ["data_explorer_agent"]):
                 metrics_by_agent[agent].append((name, info))
 
-        eval_tasks = []
-        
+        # Each finished metric task is checkpointed as soon as it completes;
+        # with --resume, tasks whose checkpoint matches their inputs are not re-run
+        raw_dir = results_dir / "raw"
+        raw_dir.mkdir(parents=True, exist_ok=True)
+        checkpoint_path = raw_dir / EVAL_CHECKPOINT_FILE
+        if not self.config.get("resume") and checkpoint_path.exists():
+            checkpoint_path.unlink()
+        checkpoint = InteractionJournal(str(checkpoint_path))
+        completed_tasks = {record["task_id"]: record for record in checkpoint.records()}
+        if completed_tasks:
+            logger.info(f"Resuming: {len(completed_tasks)} metric tasks checkpointed in {checkpoint_path}")
+
+        eval_tasks, task_keys = [], []
+        judge_cache = None
+        if self.config.get("judge_cache_dir"):
+            judge_cache = JudgeCache(self.config["judge_cache_dir"])
+            logger.info(f"Using judge cache at {judge_cache.directory}")
+
         for agent, metrics in metrics_by_agent.items():
             # Filter rows relevant to this agent
             mask = expanded_df["agents_evaluated"].apply(
@@ -428,6 +875,19 @@ class Evaluator:
             if agent_df.empty:
                 continue
 
+            # Compile every metric's dataset_mapping up front, so columns several
+            # metrics map the same way are materialized once for this agent
+            planner = MappingPlanner(agent_df, original_df)
+            mapped = {
+                name: info.get("dataset_mapping", {})
+                for name, info in metrics
+                if info.get("metric_type") != "deterministic"
+                and not (info.get("is_managed", False) and info.get("use_gemini_format", False))
+            }
+            if mapped:
+                distinct = planner.compile(mapped)
+                logger.info(f"Mapping {len(mapped)} metrics for {agent} onto {distinct} distinct columns")
+
             for metric_name, info in metrics:
                 if info.get("metric_type") == "deterministic":
                     continue
@@ -449,11 +909,20 @@ class Evaluator:
                         metric_name,
                         CONFIG.METRIC_TOOL_USE_QUALITY,
                         is_managed_metric=is_managed,
+                        planner=planner,
                     )
 
                 if eval_dataset.empty or len(eval_dataset.columns) == 0:
                     continue
 
+                task_id = f"{agent}:{metric_name}"
+                task_fingerprint = eval_task_fingerprint(metric_name, info, eval_dataset)
+                completed = completed_tasks.get(task_id)
+                if completed is not None and completed.get("fingerprint") == task_fingerprint:
+                    logger.info(f"Reusing checkpointed results for {metric_name} ({agent})")
+                    all_llm_results.append(restore_checkpoint(completed))
+                    continue
+
                 # Create Metric Object
                 if is_managed:
                     m_name = info.get("managed_metric_name", "").upper()
@@ -472,24 +941,31 @@ class Evaluator:
                         prompt_template=template,
                     )
 
-                eval_tasks.append((
+                task = (
                     eval_dataset, metric_obj, agent_df, metric_name, self.client,
                     CONFIG.MAX_RETRIES, CONFIG.RETRY_DELAY_SECONDS
-                ))
-
-        # Run Parallel Execution
-        with concurrent.futures.ThreadPoolExecutor(max_workers=CONFIG.MAX_WORKERS) as executor:
-            future_to_metric = {
-                executor.submit(run_single_metric_evaluation, t): t[3]
-                for t in eval_tasks
-            }
-            for future in concurrent.futures.as_completed(future_to_metric):
-                res, m_name, input_df = future.result()
-                if res is not None:
-                    all_llm_results.append((res, m_name, input_df))
+                )
+                cache_fingerprint = (
+                    judge_cache.metric_fingerprint(metric_name, info) if judge_cache is not None else None
+                )
+                eval_tasks.append((task, cache_fingerprint))
+                task_keys.append((task_id, task_fingerprint))
+
+        # Run Parallel Execution (row chunks of every metric share the executor)
+        timeline_path = raw_dir / "judge_concurrency.csv" if eval_tasks else None
+        for task_index, res, m_name, input_df in self._run_judge_tasks(eval_tasks, judge_cache, timeline_path):
+            all_llm_results.append((res, m_name, input_df))
+            task_id, task_fingerprint = task_keys[task_index]
+            checkpoint.append(checkpoint_record(task_id, task_fingerprint, res, m_name, input_df))
+
+        judge_cache_stats = judge_cache.stats() if judge_cache is not None else None
+        if judge_cache_stats:
+            logger.info(
+                f"Judge cache: {judge_cache_stats['hits']} hits, {judge_cache_stats['misses']} misses"
+            )
 
         # --- Consolidate Results ---
-        final_df = original_df.copy()
+        final_df = original_df.copy(deep=False)
         eval_results_list = [{} for _ in range(len(final_df))]
 
         # Add Pre-calculated ADK scores from simulation (if present)
@@ -515,99 +991,48 @@ class Evaluator:
 
         # Add LLM with full input/output traceability
         for result_df, metric_name, input_df in all_llm_results:
-            for result_idx, row in result_df.iterrows():
-                idx = int(row["original_index"])
+            for idx, metric_result in llm_metric_results(result_df, metric_name, input_df):
                 if idx < len(eval_results_list):
-                    # Get score, handling NaN
-                    score = row.get(f"{metric_name}/score")
-                    try:
-                        if pd.isna(score):
-                            score = None
-                    except (ValueError, TypeError):
-                        pass
-
-                    # Build comprehensive metric result with full output
-                    metric_result = {"score": score}
-
-                    # Only include explanation if it has actual content
-                    explanation = row.get(f"{metric_name}/explanation")
-                    if explanation is not None:
-                        try:
-                            if pd.isna(explanation):
-                                explanation = None
-                        except (ValueError, TypeError):
-                            pass
-                    # Skip empty string explanations (some metrics don't return explanations)
-                    if explanation and explanation != "":
-                        # Try to parse JSON explanations (HALLUCINATION, GROUNDING return JSON strings)
-                        if isinstance(explanation, str) and explanation.startswith("["):
-                            try:
-                                explanation = json.loads(explanation)
-                            except (json.JSONDecodeError, TypeError):
-                                pass
-                        metric_result["explanation"] = explanation
-
-                    # Include rubric_verdicts if present (managed rubric metrics)
-                    rubric_verdicts_key = f"{metric_name}/rubric_verdicts"
-                    if rubric_verdicts_key in row and row[rubric_verdicts_key] is not None:
-                        metric_result["rubric_verdicts"] = row[rubric_verdicts_key]
-
-                    # Include error if present (check for NaN)
-                    error_key = f"{metric_name}/error"
-                    if error_key in row:
-                        error_val = row[error_key]
-                        try:
-                            if error_val is not None and not pd.isna(error_val):
-                                metric_result["error"] = str(error_val)
-                        except (ValueError, TypeError):
-                            if error_val is not None:
-                                metric_result["error"] = str(error_val)
-
-                    # Include input data for full traceability
-                    if isinstance(input_df, pd.DataFrame) and result_idx < len(input_df):
-                        input_row = input_df.iloc[result_idx]
-                        input_data = {}
-                        for col in input_df.columns:
-                            val = input_row[col]
-                            # Truncate long strings for summary (keep first 500 chars)
-                            if isinstance(val, str) and len(val) > 500:
-                                input_data[col] = val[:500] + "... [truncated]"
-                            elif isinstance(val, (list, dict)):
-                                # Handle lists and dicts directly
-                                input_data[col] = val
-                            elif val is not None:
-                                # Use try/except for pd.isna since it can fail on complex types
-                                try:
-                                    if not pd.isna(val):
-                                        input_data[col] = val
-                                except (ValueError, TypeError):
-                                    input_data[col] = val
-                        if input_data:
-                            metric_result["input"] = input_data
-
                     eval_results_list[idx][metric_name] = metric_result
 
-        def json_serializer(obj):
-            """Custom serializer that handles NaN, numpy types, and other edge cases."""
-            if isinstance(obj, float) and (math.isnan(obj) or math.isinf(obj)):
-                return None
-            if hasattr(obj, 'tolist'):  # numpy arrays
-                return obj.tolist()
-            if hasattr(obj, 'item'):  # numpy scalars
-                return obj.item()
-            return str(obj)
-
         final_df["eval_results"] = [json.dumps(r, default=json_serializer) for r in eval_results_list]
 
         # Use the provided results_dir directly (folder was created by run/convert)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        raw_dir = results_dir / "raw"
-        raw_dir.mkdir(parents=True, exist_ok=True)
+        if self.config.get("output_format") == "parquet":
+            out_path = raw_dir / f"evaluation_results_{timestamp}.parquet"
+        else:
+            out_path = raw_dir / f"evaluation_results_{timestamp}.csv"
+
+        # Blob references are rewritten relative to the results file, into a link (or copy)
+        # of the blob file kept in raw/, so the results don't depend on the interaction run
+        bundled = {}
+        for number, path in enumerate(blob_files):
+            name = os.path.basename(blob_path(out_path)) if number == 0 else f"{out_path.stem}_{number}{BLOB_SUFFIX}"
+            bundled[path] = bundle_blob_file(path, raw_dir, name)
+        for col in BLOB_FIELDS:
+            if col in final_df.columns:
+                final_df[col] = [
+                    results_blob_value(value, original, raw_dir, bundled)
+                    for value, original in zip(interaction_results[col], final_df[col])
+                ]
 
         # Save raw evaluation results to raw/ subfolder
-        out_path = raw_dir / f"evaluation_results_{timestamp}.csv"
-        final_df.to_csv(out_path, index=False)
+        if self.config.get("output_format") == "parquet":
+            write_parquet(final_df, out_path)
+        else:
+            # Inline traces may hold lazy LLM requests (see INTERACTION_FIELDS), whose
+            # repr is only the file reference, so they are written as decoded JSON
+            csv_df = final_df
+            if "session_trace" in final_df.columns:
+                csv_df = final_df.assign(session_trace=[
+                    json.dumps(v, default=json_serializer) if isinstance(v, list) else v
+                    for v in final_df["session_trace"]
+                ])
+            csv_df.to_csv(out_path, index=False)
         logger.info(f"Evaluation complete. Results saved to {out_path}")
+        archive_index = write_results_archive(final_df, eval_results_list, out_path, default=json_serializer)
+        logger.info(f"Indexed results archive saved to {archive_index}")
 
         # Summary goes to main run folder
         save_metrics_summary(
@@ -617,6 +1042,7 @@ class Evaluator:
             self.config.get("input_label", "manual"),
             self.config.get("test_description", "Automated run"),
             metric_definitions=metric_definitions,
+            judge_cache_stats=judge_cache_stats,
         )
 
         logger.info(f"Run folder: {results_dir}")
@@ -1,11 +1,16 @@
 import json
 import os
-import asyncio
 import pandas as pd
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Optional, Set
 
-from evaluation.core.agent_client import AgentClient
+from evaluation.core.agent_client import DEFAULT_POOL_SIZE, AsyncAgentClient
+from evaluation.core.journal import InteractionJournal, JournalKey
+from evaluation.core.rate_limiter import TokenBucket
+from evaluation.core.trace_fetcher import DEFAULT_TRACE_DEADLINE, build_in_process_transport
+from evaluation.core.turn_scheduler import TurnScheduler
+
+DEFAULT_MAX_CONCURRENCY = 10
 
 def get_golden_questions(filepath: str) -> List[Dict[str, Any]]:
     """Loads questions from a JSON file."""
@@ -66,86 +71,163 @@ def parse_state_variables(state_var_strings: Optional[List[str]]) -> Dict[str, A
         state_vars[key.strip()] = value.strip()
     return state_vars
 
+class QuestionRun:
+    """
+    One (question, run) conversation, executed step by step.
+
+    Step 0 creates the session and step i (i >= 1) sends user turn i - 1, so the
+    TurnScheduler can interleave the turns of many runs while keeping each
+    session's turns in order. record() builds the interaction log row.
+    """
+
+    def __init__(
+        self,
+        question_data: Dict[str, Any],
+        agent_client: AsyncAgentClient,
+        run_id: int,
+        user_ldap: str,
+        state_vars: Dict[str, Any],
+        streaming: bool = False
+    ):
+        self.question_data = question_data
+        self.agent_client = agent_client
+        self.run_id = run_id
+        self.user_ldap = user_ldap
+        self.state_vars = state_vars
+        self.streaming = streaming
+        self.user_inputs = question_data["user_inputs"]
+        self.question_id = question_data["id"]
+
+        self.session_id = None
+        self.interaction_datetime = None
+        self.streaming_latency = []
+        self.timings = []
+        self.error = None
+
+    @property
+    def num_steps(self) -> int:
+        return 1 + len(self.user_inputs)
+
+    async def step(self, index: int) -> None:
+        if index == 0:
+            print(f"Running question ID: {self.question_id} (Run {self.run_id})...")
+            self.interaction_datetime = datetime.now().isoformat()
+            self.session_id = await self.agent_client.create_session(**self.state_vars)
+            return
+
+        turn_index = index - 1
+        turn = self.user_inputs[turn_index]
+        if self.streaming:
+            streamed = await self.agent_client.stream_interaction(self.session_id, turn)
+            self.streaming_latency.append({"turn": turn_index, **streamed["latency"]})
+        else:
+            await self.agent_client.run_interaction(self.session_id, turn)
+
+    def fail(self, error: Exception) -> None:
+        self.error = error
+        print(f"Error in question {self.question_id}: {error}")
+
+    def record(self) -> Dict[str, Any]:
+        """Builds the interaction log row for this run."""
+        succeeded = self.error is None
+        if succeeded:
+            status = {"boolean": "success"}
+        else:
+            status = {"boolean": "failed", "error_message": str(self.error)}
+        record = {
+            "status": json.dumps(status),
+            "run_id": self.run_id,
+            "question_id": self.question_id,
+            "agents_evaluated": json.dumps(self.question_data.get("agents_evaluated", [])),
+            "user_inputs": json.dumps(self.user_inputs),
+            "question_metadata": json.dumps(self.question_data.get("metadata", {})),
+            "interaction_datetime": self.interaction_datetime if succeeded else None,
+            "session_id": self.session_id if succeeded else None,
+            "base_url": self.agent_client.base_url,
+            "app_name": self.agent_client.app_name,
+            "ADK_USER_ID": self.agent_client.user_id,
+            "USER": self.user_ldap,
+            "reference_data": json.dumps(self.question_data.get("reference_data", {})),
+        }
+        if not succeeded:
+            return record
+        if self.streaming:
+            record["streaming_latency"] = json.dumps(self.streaming_latency)
+        if self.timings:
+            # Scheduler step 0 is session creation; step i is user turn i - 1
+            record["turn_timings"] = json.dumps([
+                {
+                    "turn": t["step"] - 1 if t["step"] else "create_session",
+                    "queue_wait_seconds": t["queue_wait_seconds"],
+                    "service_seconds": t["service_seconds"],
+                }
+                for t in self.timings
+            ])
+        return record
+
+
 async def process_single_question(
     question_data: Dict[str, Any],
-    agent_client: AgentClient,
+    agent_client: AsyncAgentClient,
     run_id: int,
     user_ldap: str,
-    state_vars: Dict[str, Any]
+    state_vars: Dict[str, Any],
+    streaming: bool = False
 ) -> Dict[str, Any]:
     """
-    Runs a single question against the agent.
-    """
-    user_inputs = question_data["user_inputs"]
-    agents_evaluated = question_data.get("agents_evaluated", [])
-    question_id = question_data["id"]
-    question_metadata = question_data.get("metadata", {})
-    reference_data = question_data.get("reference_data", {})
-
-    print(f"Running question ID: {question_id} (Run {run_id})...")
+    Runs a single question against the agent, one turn after another.
 
+    With streaming=True each turn goes through /run_sse and the per-turn
+    user-perceived latencies are stored in the record's 'streaming_latency'.
+    """
+    run = QuestionRun(question_data, agent_client, run_id, user_ldap, state_vars, streaming)
     try:
-        interaction_datetime = datetime.now().isoformat()
-        
-        # Create session
-        session_id = await asyncio.to_thread(agent_client.create_session, **state_vars)
-
-        # Send all turns
-        for turn in user_inputs:
-            await asyncio.to_thread(agent_client.run_interaction, session_id, turn)
-
-        return {
-            "status": json.dumps({"boolean": "success"}),
-            "run_id": run_id,
-            "question_id": question_id,
-            "agents_evaluated": json.dumps(agents_evaluated),
-            "user_inputs": json.dumps(user_inputs),
-            "question_metadata": json.dumps(question_metadata),
-            "interaction_datetime": interaction_datetime,
-            "session_id": session_id,
-            "base_url": agent_client.base_url,
-            "app_name": agent_client.app_name,
-            "ADK_USER_ID": agent_client.user_id,
-            "USER": user_ldap,
-            "reference_data": json.dumps(reference_data),
-        }
-
+        for index in range(run.num_steps):
+            await run.step(index)
     except Exception as e:
-        error_message = str(e)
-        print(f"Error in question {question_id}: {error_message}")
-        return {
-            "status": json.dumps({"boolean": "failed", "error_message": error_message}),
-            "run_id": run_id,
-            "question_id": question_id,
-            "agents_evaluated": json.dumps(agents_evaluated),
-            "user_inputs": json.dumps(user_inputs),
-            "question_metadata": json.dumps(question_metadata),
-            "interaction_datetime": None,
-            "session_id": None,
-            "base_url": agent_client.base_url,
-            "app_name": agent_client.app_name,
-            "ADK_USER_ID": agent_client.user_id,
-            "USER": user_ldap,
-            "reference_data": json.dumps(reference_data),
-        }
+        run.fail(e)
+    return run.record()
 
 class InteractionRunner:
     """
     Orchestrates the running of interactions for a set of questions.
+
+    Turns from all question runs are interleaved through a TurnScheduler with
+    `max_concurrency` workers, so at most that many agent calls are in flight
+    while each session's turns still run in order. Every request the client
+    makes is also paced by an optional shared token bucket (`requests_per_second`).
+
+    With `agents_dir` set, the ADK app is served in this process instead of at
+    `base_url`, and its spans are captured directly rather than fetched over HTTP.
     """
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.user_ldap = config.get("user") or os.environ.get("USER") or "unknown"
-        self.agent_client = AgentClient(
-            base_url=config["base_url"],
+        self.max_concurrency = config.get("max_concurrency") or DEFAULT_MAX_CONCURRENCY
+        self.streaming = config.get("streaming", False)
+        self.turn_stats: Dict[str, Any] = {}
+        requests_per_second = config.get("requests_per_second")
+        base_url, transport, span_collector = config["base_url"], None, None
+        if config.get("agents_dir"):
+            transport, span_collector = build_in_process_transport(config["agents_dir"])
+            base_url = "http://localhost"
+        self.agent_client = AsyncAgentClient(
+            base_url=base_url,
             app_name=config["app_name"],
-            user_id=config.get("user_id", "eval_user")
+            user_id=config.get("user_id", "eval_user"),
+            # An explicit None leaves the connection pool uncapped (open-loop load tests)
+            pool_size=config.get("pool_size", DEFAULT_POOL_SIZE),
+            transport=transport,
+            rate_limiter=TokenBucket(requests_per_second) if requests_per_second else None,
+            trace_deadline=config.get("trace_deadline") or DEFAULT_TRACE_DEADLINE,
+            span_collector=span_collector,
         )
 
-    async def run(self) -> pd.DataFrame:
+    def select_questions(self) -> List[Dict[str, Any]]:
+        """Loads the golden questions and applies the metadata filters and question limit."""
         questions_file = self.config["questions_file"]
         all_questions = get_golden_questions(questions_file)
-        
+
         # Filter
         filters = parse_metadata_filters(self.config.get("metadata_filters"))
         filtered_questions = filter_questions_by_metadata(all_questions, filters)
@@ -154,18 +236,59 @@ class InteractionRunner:
         num_questions = self.config.get("num_questions", -1)
         if num_questions != -1:
             filtered_questions = filtered_questions[:num_questions]
+        return filtered_questions
+
+    async def run(
+        self,
+        journal: Optional[InteractionJournal] = None,
+        skip: Optional[Set[JournalKey]] = None,
+        on_record: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Runs every selected (question, run) pair.
 
+        Returns one row per pair, or None when a journal or on_record is given:
+        rows are then handed off as they finish and not kept in memory.
+
+        Args:
+            journal: If given, each row is appended to it as soon as its run finishes.
+            skip: (question_id, run_id) pairs to leave out, e.g. ones already journaled.
+            on_record: Called with each row as soon as its run finishes (after journaling),
+                e.g. to hand it to the enrichment phase.
+        """
+        filtered_questions = self.select_questions()
         state_vars = parse_state_variables(self.config.get("state_variables"))
         runs = self.config.get("runs", 1)
 
-        print(f"Starting execution for {len(filtered_questions)} questions, {runs} runs each.")
-        
-        tasks = []
-        for q in filtered_questions:
-            for r in range(1, runs + 1):
-                tasks.append(
-                    process_single_question(q, self.agent_client, r, self.user_ldap, state_vars)
-                )
-
-        results = await asyncio.gather(*tasks)
-        return pd.DataFrame(results)
+        print(f"Starting execution for {len(filtered_questions)} questions, {runs} runs each "
+              f"(max {self.max_concurrency} agent calls in flight).")
+
+        skip = skip or set()
+        question_runs = [
+            QuestionRun(q, self.agent_client, r, self.user_ldap, state_vars, streaming=self.streaming)
+            for q in filtered_questions
+            for r in range(1, runs + 1)
+            if (str(q["id"]), r) not in skip
+        ]
+        if skip:
+            print(f"Resuming: {len(filtered_questions) * runs - len(question_runs)} runs already journaled, "
+                  f"{len(question_runs)} remaining.")
+
+        def on_finished(run: QuestionRun) -> None:
+            record = run.record()
+            if journal is not None:
+                journal.append(record)
+            if on_record is not None:
+                on_record(record)
+
+        scheduler = TurnScheduler(self.max_concurrency)
+        await scheduler.run(question_runs, on_finished=on_finished)
+        self.turn_stats = scheduler.summary()
+        if self.turn_stats["steps"]:
+            print(f"Turn scheduling: {self.turn_stats['steps']} steps, "
+                  f"mean queue wait {self.turn_stats['mean_queue_wait_seconds']:.2f}s, "
+                  f"mean service {self.turn_stats['mean_service_seconds']:.2f}s.")
+
+        if journal is not None or on_record is not None:
+            return None
+        return pd.DataFrame([run.record() for run in question_runs])
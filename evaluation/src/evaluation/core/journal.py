@@ -0,0 +1,145 @@
+import json
+import os
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from evaluation.core.blob_store import BlobWriter, blob_path
+
+JournalKey = Tuple[str, int]
+
+
+def journal_key(record: Dict[str, Any]) -> JournalKey:
+    """Identifies an interaction by (question_id, run_id)."""
+    return (str(record["question_id"]), int(record["run_id"]))
+
+
+def is_failed(record: Dict[str, Any]) -> bool:
+    """Whether a journaled interaction failed (status as a JSON string or, in processed journals, an object)."""
+    status = record.get("status")
+    if isinstance(status, str):
+        try:
+            status = json.loads(status)
+        except json.JSONDecodeError:
+            return False
+    return isinstance(status, dict) and status.get("boolean") == "failed"
+
+
+def to_jsonl_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Parses JSON-string fields back into dicts/lists for clean JSONL output."""
+    record = dict(record)
+    for key, value in record.items():
+        if isinstance(value, str):
+            try:
+                parsed = json.loads(value)
+                if isinstance(parsed, (dict, list)):
+                    record[key] = parsed
+            except (json.JSONDecodeError, TypeError):
+                pass
+    return record
+
+
+class InteractionJournal:
+    """
+    Append-only JSONL file of finished interactions.
+
+    Each record is written and fsynced as soon as it is appended, so a run that
+    dies part-way keeps everything it finished. A line cut short by a crash is
+    dropped when the journal is reopened.
+    """
+
+    def __init__(self, path: str, parse_json_strings: bool = False, blob_fields: Iterable[str] = ()):
+        """
+        Args:
+            path: JSONL file to append to (created if missing).
+            parse_json_strings: If True, JSON-string fields are written as nested
+                objects (see to_jsonl_record); otherwise records are written as-is.
+            blob_fields: Fields moved to the side-car blob file (blob_path(path))
+                and written as references (see blob_store).
+        """
+        self.path = path
+        self.parse_json_strings = parse_json_strings
+        self.blob_fields = tuple(blob_fields)
+        self._repair_tail()
+
+    def _repair_tail(self) -> None:
+        """Truncates a trailing partial line left behind by an interrupted write."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            chunk_size = 64 * 1024
+            while position > 0:
+                start = max(0, position - chunk_size)
+                f.seek(start)
+                chunk = f.read(position - start)
+                newline = chunk.rfind(b"\n")
+                if newline != -1:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position != end:
+                print(f"Warning: Dropping incomplete trailing record in {self.path}")
+                f.truncate(position)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Returns every journaled record."""
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    records.append(json.loads(line))
+        return records
+
+    def latest_records(self) -> Dict[JournalKey, Dict[str, Any]]:
+        """Returns the last journaled record of each (question_id, run_id) pair."""
+        return {journal_key(record): record for record in self.records()}
+
+    def completed_keys(self) -> Set[JournalKey]:
+        """Returns the (question_id, run_id) pairs whose last journaled run did not fail."""
+        return {key for key, record in self.latest_records().items() if not is_failed(record)}
+
+    def compact(self) -> int:
+        """
+        Rewrites the journal keeping only the last record of each (question_id, run_id)
+        pair, e.g. after failed runs were run again. Returns the number of records dropped.
+        """
+        if not os.path.exists(self.path):
+            return 0
+        last_line: Dict[JournalKey, int] = {}
+        lines = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f):
+                if line.strip():
+                    last_line[journal_key(json.loads(line))] = number
+                    lines += 1
+        dropped = lines - len(last_line)
+        if not dropped:
+            return 0
+        keep = set(last_line.values())
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(self.path, "r", encoding="utf-8") as src, open(tmp_path, "w", encoding="utf-8") as dst:
+            for number, line in enumerate(src):
+                if number in keep:
+                    dst.write(line)
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(tmp_path, self.path)
+        return dropped
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Appends one record and flushes it to disk."""
+        if self.parse_json_strings:
+            record = to_jsonl_record(record)
+        if self.blob_fields:
+            # Blobs are synced first: an interrupted append leaves unreferenced bytes, never dangling references
+            with BlobWriter(blob_path(self.path)) as blobs:
+                record = blobs.externalize(record, os.path.dirname(os.path.abspath(self.path)), self.blob_fields)
+                blobs.flush(sync=True)
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
@@ -0,0 +1,352 @@
+import json
+import re
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Optional, Union
+
+# Field spec value: leave the value in the file and return a LazyValue reference
+LAZY = "lazy"
+
+# Bytes read from the file per step
+CHUNK_SIZE = 1 << 20
+
+# Selected containers up to this many bytes are decoded in one json call and pruned
+# afterwards (LAZY members inside them come back decoded); larger ones are walked
+INLINE_BYTES = 64 << 10
+
+# First window tried when decoding a container in one call
+_WINDOW = 4 << 10
+
+_DECODER = json.JSONDecoder()
+_NO_VALUE = object()
+
+_WHITESPACE = re.compile(rb"[ \t\r\n]*")
+# String body up to the closing quote (or the end of the buffer)
+_STRING_BODY = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+# Anything up to the next bracket, whole strings included (stops at a string cut by the buffer end)
+_STRUCTURE = re.compile(rb'(?:[^"{}\[\]]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+# Number / true / false / null up to the next delimiter
+_SCALAR = re.compile(rb"[^,}\]\s]*")
+
+_QUOTE, _COMMA, _COLON = ord('"'), ord(","), ord(":")
+_OPEN = (ord("{"), ord("["))
+_OBJECT_START, _OBJECT_END, _ARRAY_START, _ARRAY_END = ord("{"), ord("}"), ord("["), ord("]")
+
+FieldSpec = Union[bool, str, Dict[str, Any], list]
+
+
+class JsonMemoryLimitError(MemoryError):
+    """A document needs more memory to parse than the configured ceiling."""
+
+
+class LazyValue:
+    """
+    A JSON value left in the file, referenced by byte offset and length.
+
+    load() reads and decodes it on demand. str() renders the decoded value, so a
+    row holding lazy values serializes (JSON, CSV, Parquet) the same as one
+    holding the value itself; repr() only shows the reference.
+    """
+
+    __slots__ = ("path", "offset", "length")
+
+    def __init__(self, path: str, offset: int, length: int):
+        self.path = path
+        self.offset = offset
+        self.length = length
+
+    def load(self) -> Any:
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            return json.loads(f.read(self.length))
+
+    def __str__(self) -> str:
+        value = self.load()
+        return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+    def __repr__(self) -> str:
+        return f"LazyValue({self.path!r}, {self.offset}, {self.length})"
+
+
+def json_default(obj: Any) -> Any:
+    """json.dumps default= hook: lazy values are written as their decoded value, others as str()."""
+    if isinstance(obj, LazyValue):
+        return obj.load()
+    return str(obj)
+
+
+class _Reader:
+    """Incremental scanner over a binary JSON file; only the bytes of kept values are buffered."""
+
+    def __init__(self, fp: BinaryIO, path: str, max_bytes: Optional[int], chunk_size: int, inline_bytes: int):
+        self.fp = fp
+        self.path = path
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.inline_bytes = inline_bytes
+        self.buf = bytearray()
+        self.pos = 0
+        self.offset = 0  # file offset of buf[0]
+        self.mark: Optional[int] = None  # buffer index a raw capture started at
+        self.keep_capture = False  # whether the capture is a kept value (charged as it grows)
+        self.used = 0  # bytes materialized for the current document
+        self.eof = False
+        self.window = _WINDOW  # sized after the last container decoded in one call
+
+    def fill(self) -> bool:
+        data = self.fp.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        drop = self.pos if self.mark is None else self.mark
+        if drop:
+            del self.buf[:drop]
+            self.offset += drop
+            self.pos -= drop
+            if self.mark is not None:
+                self.mark -= drop
+        self.buf += data
+        if self.mark is not None and self.keep_capture:
+            self.charge(0, pending=len(self.buf) - self.mark)
+        return True
+
+    def charge(self, size: int, pending: int = 0) -> None:
+        self.used += size
+        if self.max_bytes is not None and self.used + pending > self.max_bytes:
+            raise JsonMemoryLimitError(
+                f"{self.path}: document needs more than {self.max_bytes / (1 << 20):g} MB to parse"
+            )
+
+    def peek(self) -> int:
+        """Next non-whitespace byte (not consumed), or -1 at the end of the file."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return -1
+
+    def expect(self, *allowed: int) -> int:
+        c = self.peek()
+        if c not in allowed:
+            found = "end of file" if c < 0 else repr(chr(c))
+            raise ValueError(f"{self.path}: unexpected {found} at byte {self.offset + self.pos}")
+        self.pos += 1
+        return c
+
+    def skip_string(self) -> None:
+        self.pos += 1  # opening quote
+        while True:
+            self.pos = _STRING_BODY.match(self.buf, self.pos).end()
+            # Stopped at the closing quote, or before a backslash split from its escaped byte
+            if self.pos < len(self.buf) and self.buf[self.pos] == _QUOTE:
+                self.pos += 1
+                return
+            if not self.fill():
+                raise ValueError(f"{self.path}: unterminated string")
+
+    def skip_value(self) -> None:
+        c = self.peek()
+        if c == _QUOTE:
+            self.skip_string()
+        elif c in _OPEN:
+            depth = 0
+            while True:
+                self.pos = _STRUCTURE.match(self.buf, self.pos).end()
+                if self.pos >= len(self.buf):
+                    if not self.fill():
+                        raise ValueError(f"{self.path}: unterminated container")
+                    continue
+                c = self.buf[self.pos]
+                if c == _QUOTE:
+                    self.skip_string()
+                    continue
+                self.pos += 1
+                depth += 1 if c in _OPEN else -1
+                if depth == 0:
+                    return
+        elif c < 0:
+            raise ValueError(f"{self.path}: unexpected end of file")
+        else:
+            while True:
+                self.pos = _SCALAR.match(self.buf, self.pos).end()
+                if self.pos < len(self.buf) or not self.fill():
+                    return
+
+    def read_raw(self) -> bytes:
+        self.peek()
+        self.mark = self.pos
+        self.keep_capture = True
+        try:
+            self.skip_value()
+            raw = bytes(self.buf[self.mark:self.pos])
+        finally:
+            self.mark = None
+            self.keep_capture = False
+        return raw
+
+    def decode_container(self, limit: Optional[int]) -> Any:
+        """
+        Decodes the object or array at the current position with one raw_decode
+        call over a growing window. Returns _NO_VALUE, leaving the position
+        unchanged, if it is longer than `limit` bytes or does not decode.
+        Without a limit the value is kept whole and charged as it is buffered.
+        """
+        self.mark = self.pos
+        self.keep_capture = limit is None
+        try:
+            size = self.window if limit is None else min(self.window, limit)
+            while True:
+                while len(self.buf) - self.mark < size and self.fill():
+                    pass
+                end = min(len(self.buf), self.mark + size)
+                while end < len(self.buf) and (self.buf[end] & 0xC0) == 0x80:
+                    end -= 1  # keep UTF-8 characters whole
+                try:
+                    text = self.buf[self.mark:end].decode("utf-8")
+                    value, stop = _DECODER.raw_decode(text)
+                except ValueError:
+                    # Cut short by the window, unless the whole rest of the file was in it
+                    if (self.eof and end == len(self.buf)) or (limit is not None and size >= limit):
+                        return _NO_VALUE
+                    size = size * 2 if limit is None else min(size * 2, limit)
+                    continue
+                length = stop if len(text) == end - self.mark else len(text[:stop].encode("utf-8"))
+                if limit is not None and length > limit:
+                    return _NO_VALUE
+                self.charge(length)
+                self.pos = self.mark + length
+                self.window = max(_WINDOW, 2 * length)
+                return value
+        finally:
+            self.mark = None
+            self.keep_capture = False
+
+    def parse(self, spec: FieldSpec) -> Any:
+        c = self.peek()
+        if spec == LAZY:
+            start = self.offset + self.pos
+            self.skip_value()
+            return LazyValue(self.path, start, self.offset + self.pos - start)
+        if c in _OPEN:
+            if not isinstance(spec, dict if c == _OBJECT_START else list):
+                value = self.decode_container(None)
+            else:
+                # Decoded whole only if that fits in the inline size and the remaining memory budget
+                limit = self.inline_bytes if self.max_bytes is None else min(self.inline_bytes, self.max_bytes - self.used)
+                value = self.decode_container(limit) if limit > 0 else _NO_VALUE
+                if value is not _NO_VALUE:
+                    return _select(value, spec)
+                if c == _OBJECT_START:
+                    return self._parse_object(spec)
+                return self._parse_array(spec[0] if spec else True)
+            if value is not _NO_VALUE:
+                return value
+        # Keep the whole value (also when its type does not match the spec)
+        raw = self.read_raw()
+        self.charge(len(raw))
+        return json.loads(raw)
+
+    def _parse_object(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        self.expect(_OBJECT_START)
+        result = {}
+        if self.peek() == _OBJECT_END:
+            self.pos += 1
+            return result
+        while True:
+            key = json.loads(self.read_raw())
+            self.expect(_COLON)
+            field = spec.get(key, spec.get("*", False))
+            if field is False:
+                self.skip_value()
+            else:
+                result[key] = self.parse(field)
+            if self.expect(_COMMA, _OBJECT_END) == _OBJECT_END:
+                return result
+
+    def _parse_array(self, spec: FieldSpec) -> list:
+        self.expect(_ARRAY_START)
+        result = []
+        if self.peek() == _ARRAY_END:
+            self.pos += 1
+            return result
+        while True:
+            result.append(self.parse(spec))
+            if self.expect(_COMMA, _ARRAY_END) == _ARRAY_END:
+                return result
+
+
+def _select(value: Any, spec: FieldSpec) -> Any:
+    """Applies a field spec to an already decoded value (LAZY keeps the value)."""
+    if isinstance(spec, dict) and isinstance(value, dict):
+        default = spec.get("*", False)
+        result = {}
+        for key, item in value.items():
+            field = spec.get(key, default)
+            if field is not False:
+                result[key] = item if field is True or field == LAZY else _select(item, field)
+        return result
+    if isinstance(spec, list) and isinstance(value, list):
+        item_spec = spec[0] if spec else True
+        if item_spec is True:
+            return value
+        return [_select(item, item_spec) for item in value]
+    return value
+
+
+def iter_json_values(
+    path: Union[str, Path],
+    fields: FieldSpec = True,
+    max_bytes: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    inline_bytes: int = INLINE_BYTES,
+    on_limit: Optional[Callable[[JsonMemoryLimitError], None]] = None,
+) -> Iterator[Any]:
+    """
+    Streams the JSON values of a file (one document, JSON lines, or concatenated
+    values), building only the parts selected by `fields`.
+
+    `fields` is a spec mirroring the document: True keeps a value as is, a dict
+    selects object members by key ("*" for the other keys; unlisted keys are
+    skipped without being decoded), a one-element list applies its spec to every
+    array item, and LAZY returns a LazyValue instead of decoding the value.
+
+    Values that are not selected are scanned but never buffered, so memory use
+    follows what is kept rather than the file size. Selected objects and arrays
+    of up to `inline_bytes` are decoded whole and pruned afterwards, which is
+    much faster than walking them; LAZY members inside them come back decoded.
+    With `max_bytes`, a document whose kept values exceed that many bytes raises
+    JsonMemoryLimitError; with `on_limit`, the document is instead skipped and
+    the error passed to on_limit.
+    """
+    path = str(path)
+    with open(path, "rb") as f:
+        reader = _Reader(f, path, max_bytes, chunk_size, inline_bytes)
+        while reader.peek() >= 0:
+            reader.used = 0
+            start = reader.offset + reader.pos
+            try:
+                value = reader.parse(fields)
+            except JsonMemoryLimitError as e:
+                if on_limit is None:
+                    raise
+                # Rescan the document from its start without keeping anything
+                f.seek(start)
+                reader = _Reader(f, path, max_bytes, chunk_size, inline_bytes)
+                reader.offset = start
+                reader.skip_value()
+                on_limit(e)
+                continue
+            yield value
+
+
+def load_json(
+    path: Union[str, Path],
+    fields: FieldSpec = True,
+    max_bytes: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    inline_bytes: int = INLINE_BYTES,
+) -> Any:
+    """The first JSON value of a file, parsed with iter_json_values."""
+    for value in iter_json_values(path, fields, max_bytes, chunk_size, inline_bytes):
+        return value
+    raise ValueError(f"{path}: no JSON value")
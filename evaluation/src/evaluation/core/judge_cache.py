@@ -0,0 +1,104 @@
+import hashlib
+import json
+import math
+import os
+import threading
+from collections import defaultdict
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+# Bump when the cached value layout changes, so old entries stop matching
+JUDGE_CACHE_VERSION = 1
+
+# Metric definition keys that do not change what the judge is asked
+_UNSCORED_KEYS = ("agents",)
+
+
+def _judge_sdk_version() -> str:
+    # The judge model defaults come from the SDK, so an upgrade must not reuse old verdicts
+    try:
+        return metadata.version("google-cloud-aiplatform")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+class JudgeCache:
+    """
+    Content-addressed on-disk cache of LLM-judge results.
+
+    An entry is keyed by the sha256 of the metric definition (template, dataset
+    mapping, managed metric name, ...), the judge SDK version and the mapped
+    input row, so a row is only re-judged when something the judge sees changes.
+    Each entry is one small JSON file under <directory>/<key[:2]>/, written
+    atomically, so concurrent runs can share a cache directory.
+
+    Only successful verdicts are stored: rows that failed or came back without a
+    score are judged again on the next run. Hit/miss counts are kept per metric
+    and are safe to update from the evaluation worker threads.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self._sdk_version = _judge_sdk_version()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+    def metric_fingerprint(self, metric_name: str, definition: Dict[str, Any]) -> str:
+        """Hash of everything about a metric that affects its verdicts."""
+        scored = {k: v for k, v in definition.items() if k not in _UNSCORED_KEYS}
+        payload = [JUDGE_CACHE_VERSION, self._sdk_version, metric_name, scored]
+        return hashlib.sha256(_canonical(payload).encode("utf-8")).hexdigest()
+
+    def key(self, fingerprint: str, row: Dict[str, Any]) -> str:
+        """Cache key of one mapped input row for a metric fingerprint."""
+        row = {k: None if _is_missing(v) else v for k, v in row.items()}
+        return hashlib.sha256((fingerprint + _canonical(row)).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns the cached result row for a key, or None (unreadable entries count as missing)."""
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        return value if isinstance(value, dict) else None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Stores a result row, replacing the entry atomically."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+
+    def record(self, metric_name: str, hits: int, misses: int) -> None:
+        with self._lock:
+            self._stats[metric_name]["hits"] += hits
+            self._stats[metric_name]["misses"] += misses
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss totals and per-metric counts, as written to eval_summary.json."""
+        with self._lock:
+            per_metric = {name: dict(counts) for name, counts in sorted(self._stats.items())}
+        hits = sum(c["hits"] for c in per_metric.values())
+        misses = sum(c["misses"] for c in per_metric.values())
+        return {
+            "directory": str(self.directory),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else None,
+            "per_metric": per_metric,
+        }
@@ -0,0 +1,365 @@
+import concurrent.futures
+import logging
+import random
+import re
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger("agent_eval")
+
+_QUOTA_MESSAGE = re.compile(r"\b429\b|RESOURCE_EXHAUSTED|Resource exhausted|Quota exceeded", re.IGNORECASE)
+
+
+class ChunkSizer:
+    """
+    Chooses how many rows go into the next judge call of one metric task.
+
+    Chunks grow toward `target_seconds` of judge time per call, using a moving
+    average of the observed seconds per row (at most doubling per chunk), and
+    shrink in proportion to the recent error rate. A failed chunk halves the
+    size straight away, so retries go out in smaller pieces.
+    """
+
+    # Weight of the newest observation in the moving averages
+    SMOOTHING = 0.3
+
+    def __init__(self, initial: int, maximum: int, target_seconds: float, minimum: int = 1):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.target_seconds = target_seconds
+        self.size = min(max(initial, self.minimum), self.maximum)
+        self.row_seconds: Optional[float] = None
+        self.error_rate = 0.0
+
+    def next_size(self) -> int:
+        return self.size
+
+    def observe(self, rows: int, seconds: float, failed: bool) -> None:
+        """Records one finished chunk of `rows` rows that took `seconds`."""
+        self.error_rate += self.SMOOTHING * ((1.0 if failed else 0.0) - self.error_rate)
+        if failed:
+            self.size = max(self.minimum, self.size // 2)
+            return
+        if rows <= 0 or seconds <= 0:
+            return
+
+        per_row = seconds / rows
+        if self.row_seconds is None:
+            self.row_seconds = per_row
+        else:
+            self.row_seconds += self.SMOOTHING * (per_row - self.row_seconds)
+
+        target = self.target_seconds / self.row_seconds * (1.0 - self.error_rate)
+        self.size = int(min(max(target, self.minimum), self.maximum, self.size * 2))
+
+
+def is_quota_error(error: BaseException) -> bool:
+    """True for Vertex AI quota / rate-limit errors (HTTP 429, RESOURCE_EXHAUSTED)."""
+    for attribute in ("code", "status_code"):
+        code = getattr(error, attribute, None)
+        if code == 429 or getattr(code, "value", None) == 429:
+            return True
+    return bool(_QUOTA_MESSAGE.search(str(error)))
+
+
+class ConcurrencyController:
+    """
+    AIMD limit on the number of judge calls in flight.
+
+    The limit grows by one after each window of `limit` successful calls, as long
+    as latency stays healthy (per-row latency within `latency_tolerance` times the
+    best seen) and the recent error rate is low. A quota error halves it; quota
+    errors from calls started before the last decrease are ignored, so one burst
+    of 429s backs off once. Other errors stop growth but don't shrink the limit.
+
+    Every change is appended to `timeline` as (seconds since start, limit,
+    in-flight calls, event, smoothed seconds per row, error rate).
+    """
+
+    SMOOTHING = 0.3
+    # Error rate above which the limit stops growing
+    MAX_HEALTHY_ERROR_RATE = 0.1
+
+    def __init__(
+        self,
+        initial: int,
+        maximum: int,
+        minimum: int = 1,
+        latency_tolerance: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self.latency_tolerance = latency_tolerance
+        self.clock = clock
+        self.start = clock()
+        self.last_decrease = float("-inf")
+        self.row_seconds: Optional[float] = None
+        self.best_row_seconds: Optional[float] = None
+        self.error_rate = 0.0
+        self.quota_errors = 0
+        self._window_successes = 0
+        self.timeline: List[Tuple[float, int, int, str, Optional[float], float]] = []
+        self._record("start", 0)
+
+    def _record(self, event: str, in_flight: int) -> None:
+        self.timeline.append(
+            (round(self.clock() - self.start, 3), self.limit, in_flight, event, self.row_seconds, round(self.error_rate, 4))
+        )
+
+    def healthy(self) -> bool:
+        if self.error_rate > self.MAX_HEALTHY_ERROR_RATE:
+            return False
+        if self.row_seconds is None or self.best_row_seconds is None:
+            return True
+        return self.row_seconds <= self.latency_tolerance * self.best_row_seconds
+
+    def on_success(self, rows: int, seconds: float, in_flight: int) -> None:
+        self.error_rate -= self.SMOOTHING * self.error_rate
+        if rows > 0 and seconds > 0:
+            per_row = seconds / rows
+            self.row_seconds = per_row if self.row_seconds is None else self.row_seconds + self.SMOOTHING * (per_row - self.row_seconds)
+            self.best_row_seconds = per_row if self.best_row_seconds is None else min(self.best_row_seconds, per_row)
+
+        self._window_successes += 1
+        if self._window_successes >= self.limit:
+            self._window_successes = 0
+            if self.healthy() and self.limit < self.maximum:
+                self.limit += 1
+                self._record("increase", in_flight)
+
+    def on_error(self, started: float, quota: bool, in_flight: int) -> None:
+        """Records a failed call that was submitted at `started` (controller clock)."""
+        self.error_rate += self.SMOOTHING * (1.0 - self.error_rate)
+        self._window_successes = 0
+        if not quota:
+            return
+        self.quota_errors += 1
+        if started < self.last_decrease:
+            return
+        self.last_decrease = self.clock()
+        if self.limit > self.minimum:
+            self.limit = max(self.minimum, self.limit // 2)
+            self._record("decrease", in_flight)
+
+
+class _Chunk:
+    """Row positions of one judge call, with its retry counters and the time it may be sent."""
+
+    __slots__ = ("positions", "attempt", "quota_attempt", "ready_at")
+
+    def __init__(self, positions: List[int], attempt: int = 0, quota_attempt: int = 0, ready_at: float = 0.0):
+        self.positions = positions
+        self.attempt = attempt
+        self.quota_attempt = quota_attempt
+        self.ready_at = ready_at
+
+
+class _TaskState:
+    """Scheduling state of one metric task: rows not yet sent, pending retries and finished parts."""
+
+    def __init__(self, task: Tuple, sizer: "ChunkSizer", chunkable: bool):
+        self.task = task
+        self.sizer = sizer
+        self.chunkable = chunkable
+        self.position_of: Dict[Any, int] = {label: pos for pos, label in enumerate(task[2].index)}
+        self.remaining = deque(range(len(task[0])))
+        self.retries: List[_Chunk] = []
+        self.outstanding = 0
+        self.parts: List[Tuple[pd.DataFrame, Optional[pd.DataFrame]]] = []
+
+    def finished(self) -> bool:
+        return not (self.remaining or self.retries or self.outstanding)
+
+    def chunk_task(self, positions: List[int]) -> Tuple:
+        if not self.chunkable:
+            return self.task
+        eval_dataset, metric_obj, metric_df = self.task[:3]
+        return (eval_dataset.iloc[positions], metric_obj, metric_df.iloc[positions]) + self.task[3:]
+
+    def returned_positions(self, result_df: Optional[pd.DataFrame]) -> set:
+        if result_df is None:
+            return set()
+        return {self.position_of.get(label) for label in result_df["original_index"]}
+
+    def result(self) -> Tuple[pd.DataFrame, Optional[pd.DataFrame]]:
+        """The finished parts joined, in row order (each part's inputs are aligned with its results)."""
+        result_df = pd.concat([part[0] for part in self.parts], ignore_index=True)
+        inputs = [part[1] for part in self.parts]
+        input_df = (
+            pd.concat(inputs, ignore_index=True)
+            if all(isinstance(i, pd.DataFrame) for i in inputs) else None
+        )
+        if self.chunkable:
+            order = result_df["original_index"].map(self.position_of).argsort(kind="stable").tolist()
+            result_df = result_df.iloc[order].reset_index(drop=True)
+            if input_df is not None and len(input_df) == len(order):
+                input_df = input_df.iloc[order].reset_index(drop=True)
+        return result_df, input_df
+
+
+class JudgeScheduler:
+    """
+    Runs LLM metric tasks as independently scheduled row chunks.
+
+    Each task (eval_dataset, metric_obj, metric_df, metric_name, client,
+    retries, delay) is cut into chunks sized by its own ChunkSizer; a task is
+    only split when its eval_dataset rows map one to one onto metric_df rows.
+    Chunks of all tasks share one thread pool, and `controller` sets how many
+    are in flight.
+
+    `run_chunk(task_index, chunk_task)` makes one judge call and returns
+    (parsed_results_df, metric_name, input_dataset_df) with the input rows
+    aligned to the result rows. Rows a chunk did not return are re-queued
+    without holding a worker during the backoff: quota errors with a jittered
+    exponential backoff up to `max_quota_retries` times, other failures in
+    smaller chunks after `delay * 2**attempt` seconds, up to `retries` attempts.
+    """
+
+    def __init__(
+        self,
+        tasks: List[Tuple],
+        run_chunk: Callable[[int, Tuple], Tuple[Optional[pd.DataFrame], str, Optional[pd.DataFrame]]],
+        controller: "ConcurrencyController",
+        chunk_size: int,
+        max_chunk_size: int,
+        target_seconds: float,
+        max_quota_retries: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.run_chunk = run_chunk
+        self.controller = controller
+        self.max_quota_retries = max_quota_retries
+        self.clock = clock
+        self.sleep = sleep
+        self.states = []
+        for task in tasks:
+            rows = len(task[0])
+            # Rows can only be split when results map back to input rows one to one
+            chunkable = rows == len(task[2])
+            sizer = ChunkSizer(
+                chunk_size if chunkable else rows,
+                max_chunk_size if chunkable else rows,
+                target_seconds,
+            )
+            self.states.append(_TaskState(task, sizer, chunkable))
+
+    def _next_chunk(self) -> Optional[Tuple[int, _Chunk]]:
+        # Retries that are due first, then fresh rows, task by task
+        now = self.clock()
+        for index, state in enumerate(self.states):
+            for i, retry in enumerate(state.retries):
+                if retry.ready_at <= now:
+                    return index, state.retries.pop(i)
+        for index, state in enumerate(self.states):
+            if state.remaining:
+                size = state.sizer.next_size() if state.chunkable else len(state.remaining)
+                positions = [state.remaining.popleft() for _ in range(min(size, len(state.remaining)))]
+                return index, _Chunk(positions)
+        return None
+
+    def _next_retry_at(self) -> Optional[float]:
+        due = [retry.ready_at for state in self.states for retry in state.retries]
+        return min(due) if due else None
+
+    def _requeue(self, state: _TaskState, chunk: _Chunk, missing: List[int], error: Optional[BaseException], quota: bool) -> None:
+        metric_name, retries, delay = state.task[3], state.task[5], state.task[6]
+        reason = error if error is not None else f"{len(missing)} rows missing from results"
+        if quota and chunk.quota_attempt < self.max_quota_retries:
+            backoff = delay * (2 ** chunk.quota_attempt) * random.uniform(0.5, 1.0)
+            logger.warning(f"Quota error on '{metric_name}', retrying {len(missing)} rows in {backoff:.1f}s")
+            state.retries.append(_Chunk(missing, chunk.attempt, chunk.quota_attempt + 1, self.clock() + backoff))
+        elif not quota and chunk.attempt + 1 < retries:
+            size = state.sizer.next_size() if state.chunkable else len(missing)
+            logger.error(f"Failed '{metric_name}': {reason}; retrying {len(missing)} rows in chunks of {size}")
+            ready_at = self.clock() + delay * (2 ** chunk.attempt)
+            for start in range(0, len(missing), size):
+                state.retries.append(_Chunk(missing[start:start + size], chunk.attempt + 1, chunk.quota_attempt, ready_at))
+        else:
+            logger.critical(f"'{metric_name}' exhausted retries for {len(missing)} rows: {reason}")
+
+    def _record(self, state: _TaskState, chunk: _Chunk, started: float, outcome: Tuple, in_flight: int) -> None:
+        """Books one finished chunk: keeps its rows, updates the controllers and re-queues missing rows."""
+        result_df, input_df, error = outcome
+        positions = chunk.positions
+        elapsed = self.controller.clock() - started
+        limit_before = self.controller.limit
+
+        if not state.chunkable:
+            missing = positions if result_df is None else []
+        else:
+            returned = state.returned_positions(result_df)
+            missing = [pos for pos in positions if pos not in returned]
+        if result_df is not None and len(result_df):
+            state.parts.append((result_df, input_df))
+
+        quota = error is not None and is_quota_error(error)
+        if missing:
+            self.controller.on_error(started, quota=quota, in_flight=in_flight)
+            if not quota:
+                state.sizer.observe(len(positions), elapsed, failed=True)
+            self._requeue(state, chunk, missing, error, quota)
+        else:
+            self.controller.on_success(len(positions), elapsed, in_flight=in_flight)
+            state.sizer.observe(len(positions), elapsed, failed=False)
+        if self.controller.limit != limit_before:
+            logger.info(
+                f"Judge concurrency {limit_before} -> {self.controller.limit} "
+                f"({'quota error' if self.controller.limit < limit_before else 'healthy'})"
+            )
+
+    def run(self) -> Iterator[Tuple[int, pd.DataFrame, str, Optional[pd.DataFrame]]]:
+        """
+        Yields (task_index, parsed_results_df, metric_name, input_dataset_df) as
+        each task finishes, with its rows in task row order. Tasks with no
+        successful rows are not yielded.
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.controller.maximum) as executor:
+            in_flight: Dict[concurrent.futures.Future, Tuple[int, _Chunk, float]] = {}
+
+            def fill() -> None:
+                while len(in_flight) < self.controller.limit:
+                    picked = self._next_chunk()
+                    if picked is None:
+                        return
+                    index, chunk = picked
+                    state = self.states[index]
+                    future = executor.submit(self.run_chunk, index, state.chunk_task(chunk.positions))
+                    in_flight[future] = (index, chunk, self.controller.clock())
+                    state.outstanding += 1
+
+            while True:
+                fill()
+                retry_at = self._next_retry_at()
+                if not in_flight:
+                    if retry_at is None:
+                        return
+                    self.sleep(max(0.0, retry_at - self.clock()))
+                    continue
+
+                timeout = None if retry_at is None else max(0.0, retry_at - self.clock())
+                try:
+                    for future in concurrent.futures.as_completed(list(in_flight), timeout=timeout):
+                        break
+                except concurrent.futures.TimeoutError:
+                    continue
+
+                index, chunk, started = in_flight.pop(future)
+                state = self.states[index]
+                state.outstanding -= 1
+                try:
+                    result_df, _, input_df = future.result()
+                    outcome = (result_df, input_df, None)
+                except Exception as e:
+                    outcome = (None, None, e)
+                self._record(state, chunk, started, outcome, len(in_flight))
+
+                fill()
+                if state.finished() and state.parts:
+                    result_df, input_df = state.result()
+                    yield index, result_df, state.task[3], input_df
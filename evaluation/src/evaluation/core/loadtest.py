@@ -0,0 +1,212 @@
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+import pandas as pd
+
+from evaluation.core.interactions import InteractionRunner, QuestionRun, parse_state_variables
+
+DEFAULT_DURATION_SECONDS = 60.0
+PERCENTILES = (0.5, 0.9, 0.99)
+
+
+def error_status(error: Optional[BaseException]) -> str:
+    """Classifies a step outcome: 'ok', the HTTP status code, or the exception type."""
+    if error is None:
+        return "ok"
+    if isinstance(error, httpx.HTTPStatusError):
+        return str(error.response.status_code)
+    return type(error).__name__
+
+
+def summarize_stage(samples: pd.DataFrame, duration: float) -> Dict[str, Any]:
+    """
+    Aggregates the step samples of one load stage.
+
+    Latency percentiles are over successful user turns (session creation is
+    excluded); error rates cover every request.
+    """
+    summary: Dict[str, Any] = {"duration_seconds": duration, "requests": len(samples)}
+    if samples.empty:
+        return summary
+
+    ok = samples["status"] == "ok"
+    turns = samples[ok & (samples["step"] != "create_session")]
+    latencies = turns["latency_seconds"]
+
+    summary.update({
+        "sessions_started": int((samples["step"] == "create_session").sum()),
+        "turns_completed": len(turns),
+        "throughput_turns_per_second": len(turns) / duration,
+        "mean_concurrency": float(samples["concurrency"].mean()),
+        "error_rate": float((~ok).mean()),
+        "errors_by_status": samples.loc[~ok, "status"].value_counts().to_dict(),
+    })
+    if not latencies.empty:
+        summary["latency_mean_seconds"] = float(latencies.mean())
+        for q in PERCENTILES:
+            summary[f"latency_p{int(q * 100)}_seconds"] = float(latencies.quantile(q))
+    return summary
+
+
+class LoadTester:
+    """
+    Drives sustained load against an agent, using the golden questions as the workload mix.
+
+    Two modes, each run as a series of fixed-duration stages:
+      - closed loop (`concurrency`): N virtual users each run one conversation
+        after another, starting the next as soon as the previous one ends.
+      - open loop (`arrival_rate`): new conversations arrive as a Poisson process
+        at the given rate per second, regardless of how many are still running.
+
+    Conversations are QuestionRuns on the InteractionRunner's shared client, so
+    pooling, rate limiting, credentials and streaming behave as in `interact`.
+    Every request is recorded with its latency, outcome and the number of
+    conversations in flight when it started.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.duration = config.get("duration") or DEFAULT_DURATION_SECONDS
+        self.concurrency_levels: List[int] = config.get("concurrency") or []
+        self.arrival_rates: List[float] = config.get("arrival_rate") or []
+        if bool(self.concurrency_levels) == bool(self.arrival_rates):
+            raise ValueError("Specify exactly one of 'concurrency' or 'arrival_rate'.")
+        # Closed loop needs one connection per virtual user. Open loop leaves the pool
+        # uncapped: an arrival waiting in the client for a free connection would be
+        # reported as service latency
+        pool_size = config.get("pool_size") or (max(self.concurrency_levels) if self.concurrency_levels else None)
+        self.runner = InteractionRunner({**config, "pool_size": pool_size})
+        self.rng = random.Random(config.get("seed"))
+        self.samples: List[Dict[str, Any]] = []
+        self._in_flight = 0
+        self._session_counter = 0
+
+    def _workload(self, questions: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Cycles through the questions, reshuffled on every pass."""
+        while True:
+            order = list(questions)
+            self.rng.shuffle(order)
+            yield from order
+
+    async def _run_conversation(
+        self, question: Dict[str, Any], state_vars: Dict[str, Any], stage: Dict[str, Any], stage_end: float
+    ) -> None:
+        self._session_counter += 1
+        run = QuestionRun(
+            question, self.runner.agent_client, self._session_counter, self.runner.user_ldap,
+            state_vars, streaming=self.runner.streaming,
+        )
+        self._in_flight += 1
+        try:
+            for index in range(run.num_steps):
+                started = time.monotonic()
+                if started >= stage_end:
+                    break
+                concurrency = self._in_flight
+                error = None
+                try:
+                    await run.step(index)
+                except Exception as e:
+                    error = e
+                self.samples.append({
+                    "mode": stage["mode"],
+                    "target": stage["target"],
+                    "question_id": run.question_id,
+                    "step": "create_session" if index == 0 else f"turn_{index - 1}",
+                    "start_offset_seconds": started - stage["_started"],
+                    "latency_seconds": time.monotonic() - started,
+                    "concurrency": concurrency,
+                    "status": error_status(error),
+                })
+                if error is not None:
+                    break
+        finally:
+            self._in_flight -= 1
+
+    async def _closed_loop(self, concurrency: int, questions, state_vars, stage: Dict[str, Any]) -> None:
+        workload = self._workload(questions)
+        stage_end = stage["_started"] + self.duration
+
+        async def virtual_user() -> None:
+            while time.monotonic() < stage_end:
+                await self._run_conversation(next(workload), state_vars, stage, stage_end)
+
+        await asyncio.gather(*(virtual_user() for _ in range(concurrency)))
+
+    async def _open_loop(self, rate: float, questions, state_vars, stage: Dict[str, Any]) -> None:
+        workload = self._workload(questions)
+        stage_end = stage["_started"] + self.duration
+        tasks = []
+        next_arrival = stage["_started"]
+        while True:
+            next_arrival += self.rng.expovariate(rate)
+            if next_arrival >= stage_end:
+                break
+            await asyncio.sleep(max(0.0, next_arrival - time.monotonic()))
+            tasks.append(asyncio.create_task(
+                self._run_conversation(next(workload), state_vars, stage, stage_end)
+            ))
+        await asyncio.gather(*tasks)
+
+    async def run(self) -> Dict[str, Any]:
+        """Runs every stage and returns the report (one summary per stage)."""
+        questions = self.runner.select_questions()
+        if not questions:
+            raise ValueError("No questions selected for the load test.")
+        state_vars = parse_state_variables(self.config.get("state_variables"))
+
+        if self.concurrency_levels:
+            mode, targets = "concurrency", self.concurrency_levels
+        else:
+            mode, targets = "arrival_rate", self.arrival_rates
+
+        stages = []
+        try:
+            for target in targets:
+                print(f"\n=== Load stage: {mode}={target} for {self.duration:.0f}s "
+                      f"({len(questions)} questions in the mix) ===")
+                stage = {"mode": mode, "target": target, "_started": time.monotonic()}
+                first_sample = len(self.samples)
+                if mode == "concurrency":
+                    await self._closed_loop(int(target), questions, state_vars, stage)
+                else:
+                    await self._open_loop(float(target), questions, state_vars, stage)
+
+                stage_samples = pd.DataFrame(self.samples[first_sample:])
+                summary = {"mode": mode, "target": target, **summarize_stage(stage_samples, self.duration)}
+                stages.append(summary)
+                print(f"Throughput {summary.get('throughput_turns_per_second', 0):.2f} turns/s, "
+                      f"p50 {summary.get('latency_p50_seconds', float('nan')):.2f}s, "
+                      f"p99 {summary.get('latency_p99_seconds', float('nan')):.2f}s, "
+                      f"errors {summary.get('error_rate', 0):.1%}")
+        finally:
+            await self.runner.agent_client.aclose()
+
+        return {
+            "app_name": self.config["app_name"],
+            "base_url": self.runner.agent_client.base_url,
+            "duration_seconds": self.duration,
+            "stages": stages,
+        }
+
+    def write_report(self, report: Dict[str, Any], run_dir: str) -> None:
+        """Writes the summary, the latency-vs-load curve and the raw request samples."""
+        raw_dir = os.path.join(run_dir, "raw")
+        os.makedirs(raw_dir, exist_ok=True)
+
+        with open(os.path.join(run_dir, "loadtest_summary.json"), "w") as f:
+            json.dump(report, f, indent=4, default=str)
+
+        curve_columns = [
+            "mode", "target", "mean_concurrency", "throughput_turns_per_second",
+            "latency_p50_seconds", "latency_p90_seconds", "latency_p99_seconds", "error_rate",
+        ]
+        pd.DataFrame(report["stages"]).reindex(columns=curve_columns).to_csv(
+            os.path.join(run_dir, "loadtest_curve.csv"), index=False
+        )
+        pd.DataFrame(self.samples).to_csv(os.path.join(raw_dir, "loadtest_requests.csv"), index=False)
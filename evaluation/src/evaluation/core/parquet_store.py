@@ -0,0 +1,276 @@
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from evaluation.core.json_stream import json_default
+
+# Columns written as opaque JSON blobs: large and only read by the deterministic metrics
+BLOB_COLUMNS = ("session_trace",)
+
+# Rows per Parquet row group; small enough that predicate pushdown on question_id
+# or status can skip groups of multi-megabyte rows
+DEFAULT_ROW_GROUP_SIZE = 64
+
+# Schema metadata keys recording how non-native columns were encoded
+_JSON_COLUMNS_KEY = b"evaluation.json_columns"
+_BLOB_COLUMNS_KEY = b"evaluation.blob_columns"
+
+ColumnSelector = Union[Sequence[str], Callable[[str], bool], None]
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def _encode_column(name: str, values: List[Any]):
+    """
+    Returns (arrow_array, encoding) for one column.
+
+    Nested values become Arrow lists/structs when that round-trips exactly; columns
+    Arrow cannot represent faithfully (mixed types, dicts with varying keys, empty
+    structs) are stored as JSON text instead. Blob columns are always JSON bytes.
+    """
+    if name in BLOB_COLUMNS:
+        blobs = [None if _is_missing(v) else json.dumps(v, ensure_ascii=False, default=json_default).encode("utf-8") for v in values]
+        return pa.array(blobs, type=pa.large_binary()), "blob"
+
+    values = [None if _is_missing(v) else v for v in values]
+    try:
+        array = pa.array(values)
+        if array.to_pylist() == values and not _has_empty_struct(array.type):
+            return array, "native"
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, OverflowError, TypeError):
+        pass
+    text = [None if v is None else json.dumps(v, ensure_ascii=False, default=json_default) for v in values]
+    return pa.array(text, type=pa.large_string()), "json"
+
+
+def _has_empty_struct(arrow_type: pa.DataType) -> bool:
+    """Parquet cannot store structs without fields (e.g. a column of empty dicts)."""
+    if pa.types.is_struct(arrow_type):
+        return arrow_type.num_fields == 0 or any(
+            _has_empty_struct(arrow_type.field(i).type) for i in range(arrow_type.num_fields)
+        )
+    if pa.types.is_list(arrow_type) or pa.types.is_large_list(arrow_type):
+        return _has_empty_struct(arrow_type.value_type)
+    return pa.types.is_null(arrow_type)
+
+
+def records_to_table(
+    records: Union[List[Dict[str, Any]], pd.DataFrame],
+    metadata: Optional[Dict[str, str]] = None,
+) -> pa.Table:
+    """Converts interaction/result records (or a DataFrame of them) to an Arrow table.
+
+    `metadata` is stored alongside the encoding keys in the schema metadata.
+    """
+    if isinstance(records, pd.DataFrame):
+        columns = {name: records[name].tolist() for name in records.columns}
+    else:
+        names: Dict[str, None] = {}
+        for record in records:
+            names.update(dict.fromkeys(record))
+        columns = {name: [record.get(name) for record in records] for name in names}
+
+    arrays, json_columns, blob_columns = [], [], []
+    for name, values in columns.items():
+        array, encoding = _encode_column(name, values)
+        arrays.append(array)
+        if encoding == "json":
+            json_columns.append(name)
+        elif encoding == "blob":
+            blob_columns.append(name)
+
+    table = pa.Table.from_arrays(arrays, names=list(columns))
+    return table.replace_schema_metadata({
+        **{key.encode(): value.encode() for key, value in (metadata or {}).items()},
+        _JSON_COLUMNS_KEY: json.dumps(json_columns).encode(),
+        _BLOB_COLUMNS_KEY: json.dumps(blob_columns).encode(),
+    })
+
+
+def write_parquet(
+    records: Union[List[Dict[str, Any]], pd.DataFrame],
+    output_path: Union[str, Path],
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    metadata: Optional[Dict[str, str]] = None,
+) -> None:
+    """Writes records to a Parquet file (see records_to_table for the column encoding).
+
+    Args:
+        records: List of dictionaries (or a DataFrame) to write.
+        output_path: Path to output .parquet file.
+        row_group_size: Rows per row group.
+        metadata: Optional key/value pairs stored in the schema metadata.
+    """
+    table = records_to_table(records, metadata)
+    pq.write_table(table, str(output_path), row_group_size=row_group_size, compression="zstd")
+
+
+def _jsonl_batches(input_path: Union[str, Path], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                batch.append(json.loads(line))
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def _batch_columns(batch: List[Dict[str, Any]], names: Iterable[str]) -> Dict[str, List[Any]]:
+    return {name: [record.get(name) for record in batch] for name in names}
+
+
+def write_parquet_from_jsonl(
+    input_path: Union[str, Path],
+    output_path: Union[str, Path],
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+) -> int:
+    """Streams a JSONL file into a Parquet file, one row group in memory at a time.
+
+    A first pass settles each column's encoding across all row groups: a column
+    stays native only while every row group has the same Arrow type for it, and
+    falls back to JSON text otherwise. The second pass writes the row groups.
+
+    Args:
+        input_path: Path to the .jsonl file.
+        output_path: Path to output .parquet file.
+        row_group_size: Rows per row group.
+
+    Returns:
+        Number of rows written.
+    """
+    names: Dict[str, None] = {}
+    encodings: Dict[str, str] = {}
+    native_types: Dict[str, pa.DataType] = {}
+    for batch in _jsonl_batches(input_path, row_group_size):
+        for record in batch:
+            names.update(dict.fromkeys(record))
+        for name, values in _batch_columns(batch, names).items():
+            if encodings.get(name) in ("json", "blob"):
+                continue
+            if name in BLOB_COLUMNS:
+                encodings[name] = "blob"
+                continue
+            if all(_is_missing(v) for v in values):
+                # All-null row groups fit any type
+                continue
+            array, encoding = _encode_column(name, values)
+            if encoding != "native" or native_types.setdefault(name, array.type) != array.type:
+                encodings[name] = "json"
+            else:
+                encodings[name] = "native"
+    # Columns that are null everywhere are stored as JSON, as write_parquet does
+    for name in names:
+        encodings.setdefault(name, "json")
+
+    fields = []
+    for name in names:
+        if encodings[name] == "native":
+            fields.append(pa.field(name, native_types[name]))
+        else:
+            fields.append(pa.field(name, pa.large_binary() if encodings[name] == "blob" else pa.large_string()))
+    schema = pa.schema(fields, metadata={
+        _JSON_COLUMNS_KEY: json.dumps([n for n in names if encodings[n] == "json"]).encode(),
+        _BLOB_COLUMNS_KEY: json.dumps([n for n in names if encodings[n] == "blob"]).encode(),
+    })
+
+    rows = 0
+    with pq.ParquetWriter(str(output_path), schema, compression="zstd") as writer:
+        for batch in _jsonl_batches(input_path, row_group_size):
+            arrays = []
+            for name, values in _batch_columns(batch, names).items():
+                if encodings[name] == "native":
+                    arrays.append(pa.array([None if _is_missing(v) else v for v in values], type=native_types[name]))
+                elif encodings[name] == "blob":
+                    arrays.append(_encode_column(name, values)[0])
+                else:
+                    arrays.append(pa.array(
+                        [None if _is_missing(v) else json.dumps(v, ensure_ascii=False, default=json_default) for v in values],
+                        type=pa.large_string(),
+                    ))
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema), row_group_size=row_group_size)
+            rows += len(batch)
+    return rows
+
+
+def parquet_columns(input_path: Union[str, Path]) -> List[str]:
+    """Returns the column names of a Parquet file without reading any data."""
+    return pq.read_schema(str(input_path)).names
+
+
+def parquet_metadata(input_path: Union[str, Path]) -> Dict[str, str]:
+    """Returns the key/value schema metadata of a Parquet file without reading any data."""
+    metadata = pq.read_schema(str(input_path)).metadata or {}
+    return {key.decode(): value.decode() for key, value in metadata.items()}
+
+
+def _select(names: Iterable[str], columns: ColumnSelector) -> Optional[List[str]]:
+    if columns is None:
+        return None
+    if callable(columns):
+        return [name for name in names if columns(name)]
+    available = set(names)
+    return [name for name in columns if name in available]
+
+
+def read_parquet(
+    input_path: Union[str, Path],
+    columns: ColumnSelector = None,
+    filters: Optional[List[Any]] = None,
+) -> pd.DataFrame:
+    """Reads a Parquet file written by write_parquet back into a DataFrame.
+
+    Only the selected columns are read from disk, and `filters` (pyarrow DNF
+    filters, e.g. [("question_id", "in", ["q1", "q2"])]) skip non-matching row
+    groups before decoding. Nested, JSON and blob columns come back as Python
+    lists/dicts, exactly as they were written.
+
+    Args:
+        input_path: Path to .parquet file.
+        columns: Column names, or a predicate on the column name; None reads all.
+        filters: Optional row filters pushed down to the reader.
+    """
+    parquet_file = pq.ParquetFile(str(input_path))
+    schema = parquet_file.schema_arrow
+    metadata = schema.metadata or {}
+    json_columns = set(json.loads(metadata.get(_JSON_COLUMNS_KEY, b"[]")))
+    blob_columns = set(json.loads(metadata.get(_BLOB_COLUMNS_KEY, b"[]")))
+
+    selected = _select(schema.names, columns)
+    if filters is None:
+        table = parquet_file.read(columns=selected)
+    else:
+        table = pq.read_table(str(input_path), columns=selected, filters=filters)
+    data = {}
+    for name in table.column_names:
+        column = table.column(name)
+        if name in json_columns or name in blob_columns:
+            data[name] = [None if v is None else json.loads(v) for v in column.to_pylist()]
+        elif pa.types.is_nested(column.type):
+            data[name] = column.to_pylist()
+        else:
+            data[name] = column.to_pandas()
+    return pd.DataFrame(data, index=pd.RangeIndex(table.num_rows))
+
+
+def read_frame(input_path: Union[str, Path], columns: ColumnSelector = None) -> pd.DataFrame:
+    """Reads interaction or evaluation results from .parquet or .csv, projecting `columns`.
+
+    CSV columns are returned as stored (nested values are JSON strings).
+    """
+    input_path = Path(input_path)
+    if input_path.suffix.lower() == ".parquet":
+        return read_parquet(input_path, columns=columns)
+    if columns is None:
+        return pd.read_csv(input_path)
+    wanted = columns if callable(columns) else set(columns).__contains__
+    return pd.read_csv(input_path, usecols=wanted)
@@ -1,17 +1,24 @@
 import json
 import asyncio
 import pandas as pd
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
-from evaluation.core.agent_client import AgentClient
+from evaluation.core.agent_client import DEFAULT_POOL_SIZE, AgentClient, AsyncAgentClient
+from evaluation.core.journal import InteractionJournal
+from evaluation.core.rate_limiter import TokenBucket
+from evaluation.core.span_index import SpanIndex
+from evaluation.core.trace_fetcher import DEFAULT_TRACE_DEADLINE
 
 async def enrich_single_interaction(
     row: pd.Series,
     results_dir: Optional[str] = None,
-    skip_traces: bool = False
+    skip_traces: bool = False,
+    agent_client: Optional[AsyncAgentClient] = None
 ) -> pd.Series:
     """
     Enriches a single interaction row with session state and trace data.
+
+    If agent_client is not provided, a short-lived client is created for this row.
     """
     # Create a copy to avoid SettingWithCopy warnings if row is part of a dataframe slice
     row = row.copy()
@@ -42,19 +49,25 @@ async def enrich_single_interaction(
             row["missing_information"] = json.dumps({"boolean": True, "details": "Interaction marked as failed"})
             return row
 
-        agent_client = AgentClient(base_url=base_url, app_name=app_name, user_id=user_id)
+        owns_client = agent_client is None
+        if owns_client:
+            agent_client = AsyncAgentClient(base_url=base_url, app_name=app_name, user_id=user_id)
 
-        # 1. Get Final Session State
-        final_session_state = await asyncio.to_thread(agent_client.get_session_state, session_id)
-        row["final_session_state"] = json.dumps(final_session_state)
+        try:
+            # 1. Get Final Session State
+            final_session_state = await agent_client.get_session_state(session_id)
+            row["final_session_state"] = json.dumps(final_session_state)
 
-        # 2. Get Session Trace (optional)
-        session_trace = None
-        if not skip_traces:
-            try:
-                session_trace = await asyncio.to_thread(agent_client.get_session_trace, session_id)
-            except RuntimeError as e:
-                print(f"Warning: Could not retrieve trace for {session_id}: {e}")
+            # 2. Get Session Trace (optional)
+            session_trace = None
+            if not skip_traces:
+                try:
+                    session_trace = await agent_client.get_session_trace(session_id)
+                except RuntimeError as e:
+                    print(f"Warning: Could not retrieve trace for {session_id}: {e}")
+        finally:
+            if owns_client:
+                await agent_client.aclose()
 
         # 3. Process Trace Data
         if not session_trace:
@@ -64,9 +77,9 @@ async def enrich_single_interaction(
             row["trace_summary"] = None
             row["session_trace"] = None
         else:
-            analyzed_trace = AgentClient.analyze_trace_and_extract_spans(session_trace)
-            row["latency_data"] = json.dumps(AgentClient.get_latency_from_spans(analyzed_trace))
-            row["trace_summary"] = json.dumps(AgentClient.get_agent_trajectory(analyzed_trace))
+            span_index = SpanIndex(session_trace)
+            row["latency_data"] = json.dumps(AgentClient.get_latency_from_spans(span_index))
+            row["trace_summary"] = json.dumps(AgentClient.get_agent_trajectory(span_index))
             row["session_trace"] = json.dumps(session_trace)
 
         # 4. Extract Derived Data
@@ -167,20 +180,123 @@ class InteractionProcessor:
     """
     Orchestrates the enrichment of interaction logs with traces and state.
     """
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], agent_client: Optional[AsyncAgentClient] = None):
         self.config = config
         self.results_dir = config.get("results_dir")
         self.skip_traces = config.get("skip_traces", False)
+        self.pool_size = config.get("pool_size") or DEFAULT_POOL_SIZE
+        # Enrichments in flight at once; they share the runner's connection pool
+        self.max_concurrency = config.get("max_concurrency") or self.pool_size
+        self.trace_deadline = config.get("trace_deadline") or DEFAULT_TRACE_DEADLINE
+        # Share the runner's rate limiter so enrichment calls count against the same budget
+        if agent_client is not None:
+            self.rate_limiter = agent_client.rate_limiter
+        elif config.get("requests_per_second"):
+            self.rate_limiter = TokenBucket(config["requests_per_second"])
+        else:
+            self.rate_limiter = None
+        # Clients keyed by (base_url, app_name, user_id) so every row hitting the
+        # same agent shares one connection pool.
+        self._clients: Dict[Tuple[str, str, str], AsyncAgentClient] = {}
+        if agent_client is not None:
+            self._clients[self._client_key(agent_client.base_url, agent_client.app_name, agent_client.user_id)] = agent_client
+
+    @staticmethod
+    def _client_key(base_url: str, app_name: str, user_id: str) -> Tuple[str, str, str]:
+        return (str(base_url).rstrip("/"), str(app_name), str(user_id))
 
-    async def process(self, interaction_df: pd.DataFrame) -> pd.DataFrame:
+    def _get_client(self, row: pd.Series) -> AsyncAgentClient:
+        """Returns the shared AgentClient for the agent this row was run against."""
+        key = self._client_key(row.get("base_url"), row.get("app_name"), row.get("ADK_USER_ID"))
+        if key not in self._clients:
+            self._clients[key] = AsyncAgentClient(
+                base_url=key[0], app_name=key[1], user_id=key[2],
+                pool_size=self.pool_size, rate_limiter=self.rate_limiter,
+                trace_deadline=self.trace_deadline,
+            )
+        return self._clients[key]
+
+    async def _enrich_and_journal(
+        self, row: pd.Series, journal: Optional[InteractionJournal] = None
+    ) -> pd.Series:
+        enriched = await enrich_single_interaction(
+            row, self.results_dir, self.skip_traces, self._get_client(row)
+        )
+        if journal is not None:
+            journal.append(enriched.to_dict())
+        return enriched
+
+    async def process(
+        self, interaction_df: pd.DataFrame, journal: Optional[InteractionJournal] = None
+    ) -> pd.DataFrame:
+        """
+        Enriches every row concurrently. If a journal is given, each enriched row
+        is appended to it as soon as it is ready.
+        """
         print(f"Processing {len(interaction_df)} interactions...")
         if self.skip_traces:
             print("Skipping trace retrieval.")
 
-        tasks = [
-            enrich_single_interaction(row, self.results_dir, self.skip_traces)
-            for _, row in interaction_df.iterrows()
-        ]
-        
+        tasks = [self._enrich_and_journal(row, journal) for _, row in interaction_df.iterrows()]
+
         enriched_rows = await asyncio.gather(*tasks)
         return pd.DataFrame(enriched_rows)
+
+    async def consume(
+        self, queue: asyncio.Queue, journal: Optional[InteractionJournal] = None
+    ) -> int:
+        """
+        Enriches interaction records from `queue` as they arrive, until a None sentinel.
+
+        Each record is enriched in its own task, so one session's trace wait overlaps
+        with the others and with the interaction phase that is still producing
+        records. At most `max_concurrency` records are enriched at once; the rest
+        wait on the queue. Enriched rows go to the journal and are not kept in memory.
+
+        A record that fails (e.g. the journal write) is reported as soon as its
+        task ends; the others still run to completion, and the first failure is
+        then raised. Failed records stay in the raw journal, so a resumed run
+        enriches them again.
+
+        Returns:
+            The number of records enriched.
+        """
+        if self.skip_traces:
+            print("Skipping trace retrieval.")
+
+        pending: Dict[asyncio.Task, Tuple[Any, Any]] = {}
+        failures: List[BaseException] = []
+        slots = asyncio.Semaphore(self.max_concurrency)
+
+        def finished(task: asyncio.Task) -> None:
+            slots.release()
+            question_id, run_id = pending.pop(task)
+            if not task.cancelled() and task.exception() is not None:
+                print(f"Error enriching question {question_id} (run {run_id}): {task.exception()}")
+                failures.append(task.exception())
+
+        count = 0
+        while True:
+            record = await queue.get()
+            if record is None:
+                break
+            await slots.acquire()
+            task = asyncio.create_task(self._enrich_and_journal(pd.Series(record), journal))
+            pending[task] = (record.get("question_id"), record.get("run_id"))
+            task.add_done_callback(finished)
+            count += 1
+
+        if pending:
+            await asyncio.wait(list(pending))
+        if failures:
+            raise RuntimeError(
+                f"{len(failures)} of {count} interactions could not be enriched; resume the run to retry them"
+            ) from failures[0]
+        print(f"Processed {count} interactions.")
+        return count
+
+    async def aclose(self) -> None:
+        """Releases the connection pools of every client this processor holds."""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
@@ -0,0 +1,145 @@
+import math
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from evaluation.core.blob_store import BlobRef, BlobWriter, check_blob_file
+from evaluation.core.json_stream import json_default
+from evaluation.core.parquet_store import parquet_metadata, read_parquet, write_parquet
+
+# Side-car files of a results file <stem>.csv/.parquet: its rows as packed JSON records, and their index
+ARCHIVE_RECORDS_SUFFIX = ".records"
+ARCHIVE_INDEX_SUFFIX = ".index.parquet"
+
+# Index columns ahead of the per-metric score columns (one index row per results row, in order)
+ARCHIVE_INDEX_COLUMNS = ["question_id", "run_id", "offset", "length"]
+
+# Prefix of the per-metric score columns of the index
+SCORE_COLUMN_PREFIX = "score."
+
+# Rows per row group of the index (it only holds scalars)
+ARCHIVE_INDEX_ROW_GROUP_SIZE = 4096
+
+# Index metadata key holding the size and mtime of the results file the archive was written for
+RESULTS_SIGNATURE_KEY = "evaluation.results_signature"
+
+
+def archive_paths(results_path: Union[str, Path]) -> Tuple[Path, Path]:
+    """(records file, index file) of a results file's archive."""
+    stem = os.path.splitext(str(results_path))[0]
+    return Path(stem + ARCHIVE_RECORDS_SUFFIX), Path(stem + ARCHIVE_INDEX_SUFFIX)
+
+
+def results_signature(results_path: Union[str, Path]) -> str:
+    """Size and mtime of a results file, as stored in its archive index."""
+    stat = os.stat(results_path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def metric_scores(eval_results: Any) -> Dict[str, float]:
+    """Numeric score of each metric in a row's eval_results (unscored and non-numeric scores left out)."""
+    scores = {}
+    if not isinstance(eval_results, dict):
+        return scores
+    for metric, val in eval_results.items():
+        if not isinstance(val, dict) or val.get("score") is None:
+            continue
+        try:
+            score = float(val["score"])
+        except (ValueError, TypeError):
+            continue
+        if not math.isnan(score):
+            scores[metric] = score
+    return scores
+
+
+def write_results_archive(
+    df: pd.DataFrame,
+    eval_results: List[Dict[str, Any]],
+    results_path: Union[str, Path],
+    default: Callable[[Any], Any] = json_default,
+) -> Path:
+    """
+    Writes the archive of an already written results file and returns its index path.
+
+    Every row of `df`, with its eval_results as an object, becomes one JSON
+    record in the packed records file. The index holds each row's question_id,
+    run_id, record offset and length, plus a score.<metric> column per metric,
+    and records the results file's size and mtime so a stale archive is ignored.
+    """
+    records_path, index_path = archive_paths(results_path)
+    columns = list(df.columns)
+    entries = []
+    with BlobWriter(str(records_path), truncate=True) as writer:
+        for values, results in zip(df.itertuples(index=False, name=None), eval_results):
+            record = dict(zip(columns, values))
+            record["eval_results"] = results
+            ref = writer.put(record, records_path.parent, default=default)
+            entry = {
+                "question_id": record.get("question_id"),
+                "run_id": record.get("run_id"),
+                "offset": ref["offset"],
+                "length": ref["length"],
+            }
+            for metric, score in metric_scores(results).items():
+                entry[SCORE_COLUMN_PREFIX + metric] = score
+            entries.append(entry)
+
+    index = pd.DataFrame(entries)
+    if index.empty:
+        index = pd.DataFrame(columns=ARCHIVE_INDEX_COLUMNS)
+    write_parquet(
+        index,
+        index_path,
+        row_group_size=ARCHIVE_INDEX_ROW_GROUP_SIZE,
+        metadata={RESULTS_SIGNATURE_KEY: results_signature(results_path)},
+    )
+    return index_path
+
+
+class ResultsArchive:
+    """
+    Random access to the rows of an evaluation results file through its archive.
+
+    The index (ids, record offsets, per-metric scores) is small and read once;
+    filters run on it, and only the selected rows are decoded, one at a time,
+    from a read-only mmap of the records file.
+    """
+
+    def __init__(self, results_path: Union[str, Path]):
+        records_path, index_path = archive_paths(results_path)
+        self.results_path = Path(results_path)
+        self.records_path = str(records_path)
+        self.index = read_parquet(index_path)
+        check_blob_file(self.records_path, referenced_from=index_path)
+
+    @classmethod
+    def find(cls, results_path: Union[str, Path]) -> Optional["ResultsArchive"]:
+        """
+        The archive of a results file, or None if it has none (e.g. written by an
+        older version) or the results file changed after the archive was written.
+        """
+        records_path, index_path = archive_paths(results_path)
+        if not (records_path.exists() and index_path.exists()):
+            return None
+        if parquet_metadata(index_path).get(RESULTS_SIGNATURE_KEY) != results_signature(results_path):
+            return None
+        return cls(results_path)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def select(self, metric: str) -> pd.DataFrame:
+        """Index entries of the rows scored on `metric`, in results-file order."""
+        column = SCORE_COLUMN_PREFIX + metric
+        if column not in self.index.columns:
+            return self.index.iloc[0:0]
+        return self.index[self.index[column].notna()]
+
+    def records(self, entries: Optional[pd.DataFrame] = None) -> Iterator[Dict[str, Any]]:
+        """Decoded rows of `entries` (index entries, e.g. from select(); default: all rows), in order."""
+        entries = self.index if entries is None else entries
+        for offset, length in zip(entries["offset"], entries["length"]):
+            yield BlobRef(self.records_path, int(offset), int(length)).load()
@@ -0,0 +1,313 @@
+import json
+import re
+from array import array
+from typing import Any, Dict, Iterator, List, Optional
+
+# Span kinds, in the order of SPAN_KINDS (the "type" field of analyzed traces)
+OTHER, AGENT_RUN, TOOL_CALL, TOOL_RESPONSE, LLM_CALL, HTTP_REQUEST = range(6)
+SPAN_KINDS = ("OTHER", "AGENT_RUN", "TOOL_CALL", "TOOL_RESPONSE", "LLM_CALL", "HTTP_REQUEST")
+
+# Classification flags; a span can match several (e.g. an execute_tool span carrying its response)
+F_AGENT_RUN = 1
+F_TOOL_CALL = 2
+F_TOOL_RESPONSE = 4
+F_LLM_CALL = 8
+F_HTTP_REQUEST = 16
+F_TIMED = 32  # both start_time and end_time are set
+F_USAGE = 64  # the LLM response carries usage_metadata
+
+LLM_RESPONSE_ATTR = "gcp.vertex.agent.llm_response"
+TOOL_RESPONSE_ATTR = "gcp.vertex.agent.tool_response"
+
+USAGE_FIELDS = (
+    "prompt_token_count",
+    "candidates_token_count",
+    "cached_content_token_count",
+    "thoughts_token_count",
+    "total_token_count",
+)
+
+# Parent offset of rows that are not part of the tree (superseded by a later span with the same id)
+DETACHED = -2
+
+_UNSET = object()
+
+
+def _classify(span: Dict[str, Any]):
+    """Returns (flags, agent_name, tool_name) for one span, using the trace analysis naming rules."""
+    name = span.get("name", "")
+    attributes = span.get("attributes", {})
+    flags = 0
+    agent_name = None
+    tool_name = None
+
+    if "agent_run" in name or "invoke_agent" in name:
+        flags |= F_AGENT_RUN
+        try:
+            # Support "agent_run [name]", "agent_run[name]", "invoke_agent name"
+            if "[" in name and "]" in name:
+                agent_name = re.search(r"\[(.*)\]", name).group(1)
+            else:
+                # Assume "invoke_agent name" or similar
+                parts = name.split(maxsplit=1)
+                agent_name = parts[1].strip() if len(parts) > 1 else "unknown"
+        except (IndexError, AttributeError):
+            agent_name = "unknown"
+    elif "tool_call" in name or "execute_tool" in name:
+        flags |= F_TOOL_CALL
+        tool_name = attributes.get("gen_ai.tool.name")
+        if not tool_name:
+            try:
+                tool_name = re.search(r"\[(.*)\]", name).group(1)
+            except (IndexError, AttributeError):
+                # Fallback for "execute_tool name"
+                tool_name = name.split(" ")[-1] if " " in name else "unknown"
+
+    # Check if it's a tool response (sometimes unified in execute_tool span)
+    if "tool_response" in name or (
+        "execute_tool" in name and TOOL_RESPONSE_ATTR in attributes
+    ):
+        flags |= F_TOOL_RESPONSE
+    elif name == "call_llm":
+        flags |= F_LLM_CALL
+
+    if "http.method" in attributes:
+        flags |= F_HTTP_REQUEST
+
+    return flags, agent_name, tool_name
+
+
+def _kind(flags: int) -> int:
+    if flags & F_HTTP_REQUEST:
+        return HTTP_REQUEST
+    if flags & F_AGENT_RUN:
+        return AGENT_RUN
+    if flags & F_TOOL_CALL:
+        return TOOL_CALL
+    if flags & F_TOOL_RESPONSE:
+        return TOOL_RESPONSE
+    if flags & F_LLM_CALL:
+        return LLM_CALL
+    return OTHER
+
+
+class SpanIndex:
+    """
+    Compact index over one session trace, built once and shared by every consumer
+    (trace analysis, latency and trajectory summaries, deterministic metrics).
+
+    Rows keep the order of the raw trace. JSON-string attributes are decoded on
+    first use and cached per row, so each payload is parsed at most once however
+    many consumers read it.
+
+    The span table is built on the first structural lookup and is array-backed:
+    parent / first-child / next-sibling offsets, span kind and flags, duration and
+    the usage_metadata token counts of LLM responses. The tree resolves span ids
+    the way the trace analysis always has: a span whose parent is missing is a
+    root, and a repeated span id keeps its first position but its last data (the
+    earlier rows are DETACHED and left out of the table).
+    """
+
+    __slots__ = (
+        "spans",
+        "_payloads",
+        "_built",
+        "roots",
+        "parent",
+        "first_child",
+        "next_sibling",
+        "kind",
+        "flags",
+        "duration_ms",
+        "usage",
+        "agent_name",
+        "tool_name",
+        "_by_kind",
+        "_by_agent",
+        "_by_tool",
+    )
+
+    def __init__(self, session_trace: Optional[List[Dict[str, Any]]]):
+        self.spans: List[Dict[str, Any]] = list(session_trace or [])
+        # attribute key -> per-row decoded value (or decode error)
+        self._payloads: Dict[str, List[Any]] = {}
+        self._built = False
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    # --- Decoded attributes ---
+
+    def payload(self, row: int, key: str) -> Any:
+        """json.loads of attribute `key` of a row, cached; a decode error is re-raised on every call."""
+        decoded = self._payloads.get(key)
+        if decoded is None:
+            decoded = self._payloads[key] = [_UNSET] * len(self.spans)
+        value = decoded[row]
+        if value is _UNSET:
+            try:
+                value = json.loads(self.spans[row].get("attributes", {}).get(key))
+            except (json.JSONDecodeError, TypeError) as e:
+                value = e
+            decoded[row] = value
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    def llm_response(self, row: int) -> Any:
+        """Decoded LLM response of a row (a non-string attribute value is returned as-is)."""
+        raw = self.spans[row].get("attributes", {}).get(LLM_RESPONSE_ATTR)
+        return self.payload(row, LLM_RESPONSE_ATTR) if isinstance(raw, str) else raw
+
+    def tool_response(self, row: int) -> Any:
+        """Decoded tool response of a row (raises TypeError if the attribute is not a string)."""
+        return self.payload(row, TOOL_RESPONSE_ATTR)
+
+    def views(self) -> Iterator["SpanView"]:
+        """Yields a SpanView for every row, in trace order."""
+        for row, span in enumerate(self.spans):
+            yield SpanView(self, row, span)
+
+    # --- Span table ---
+
+    def _build(self) -> None:
+        if self._built:
+            return
+        n = len(self.spans)
+        self.parent = array("i", [DETACHED]) * n
+        self.first_child = array("i", [-1]) * n
+        self.next_sibling = array("i", [-1]) * n
+        self.kind = array("b", [OTHER]) * n
+        self.flags = array("B", [0]) * n
+        self.duration_ms = array("d", [0.0]) * n
+        self.usage = {field: array("q", [0]) * n for field in USAGE_FIELDS}
+        self.agent_name: List[Optional[str]] = [None] * n
+        self.tool_name: List[Optional[str]] = [None] * n
+        self._by_kind: Dict[int, List[int]] = {}
+        self._by_agent: Dict[str, List[int]] = {}
+        self._by_tool: Dict[str, List[int]] = {}
+
+        # span_id -> row, ordered by first appearance, holding the last row with that id
+        rows_by_id: Dict[Any, int] = {}
+        for row, span in enumerate(self.spans):
+            rows_by_id[span["span_id"]] = row
+
+        self.roots = array("i")
+        last_child = array("i", [-1]) * n
+        for row in rows_by_id.values():
+            parent_id = self.spans[row].get("parent_span_id")
+            parent = rows_by_id.get(parent_id, -1) if parent_id else -1
+            self.parent[row] = parent
+            if parent == -1:
+                self.roots.append(row)
+            elif last_child[parent] == -1:
+                self.first_child[parent] = row
+                last_child[parent] = row
+            else:
+                self.next_sibling[last_child[parent]] = row
+                last_child[parent] = row
+
+        for row in rows_by_id.values():
+            self._index_row(row)
+        self._built = True
+
+    def _index_row(self, row: int) -> None:
+        span = self.spans[row]
+        flags, agent_name, tool_name = _classify(span)
+
+        start_time = span.get("start_time", 0)
+        end_time = span.get("end_time", 0)
+        if start_time and end_time:
+            flags |= F_TIMED
+            self.duration_ms[row] = (end_time - start_time) / 1_000_000
+
+        if span.get("attributes", {}).get(LLM_RESPONSE_ATTR):
+            try:
+                usage = self.llm_response(row).get("usage_metadata")
+            except (json.JSONDecodeError, TypeError, AttributeError):
+                usage = None
+            if isinstance(usage, dict) and usage:
+                flags |= F_USAGE
+                for field in USAGE_FIELDS:
+                    value = usage.get(field)
+                    if isinstance(value, int):
+                        self.usage[field][row] = value
+
+        kind = _kind(flags)
+        self.flags[row] = flags
+        self.kind[row] = kind
+        self.agent_name[row] = agent_name
+        self.tool_name[row] = tool_name
+        self._by_kind.setdefault(kind, []).append(row)
+        if agent_name is not None:
+            self._by_agent.setdefault(agent_name, []).append(row)
+        if tool_name is not None:
+            self._by_tool.setdefault(tool_name, []).append(row)
+
+    def children(self, row: int) -> Iterator[int]:
+        """Yields the child rows of a row, in trace order."""
+        self._build()
+        child = self.first_child[row]
+        while child != -1:
+            yield child
+            child = self.next_sibling[child]
+
+    def tree_roots(self) -> List[int]:
+        """Returns the root rows of the span tree."""
+        self._build()
+        return list(self.roots)
+
+    # --- Lookups ---
+
+    def rows_of_kind(self, kind: int) -> List[int]:
+        """Rows classified as `kind` (one of AGENT_RUN, TOOL_CALL, ...), in tree order."""
+        self._build()
+        return list(self._by_kind.get(kind, ()))
+
+    def agent_rows(self, agent_name: str) -> List[int]:
+        """Agent-run rows of the named agent."""
+        self._build()
+        return list(self._by_agent.get(agent_name, ()))
+
+    def tool_rows(self, tool_name: str) -> List[int]:
+        """Tool-call rows of the named tool."""
+        self._build()
+        return list(self._by_tool.get(tool_name, ()))
+
+    def agents(self) -> List[str]:
+        """Names of the agents with agent-run spans, in order of first appearance."""
+        self._build()
+        return list(self._by_agent)
+
+    def tools(self) -> List[str]:
+        """Names of the tools with tool-call spans, in order of first appearance."""
+        self._build()
+        return list(self._by_tool)
+
+    def token_usage(self, row: int) -> Optional[Dict[str, int]]:
+        """The usage_metadata token counts of a row's LLM response, or None if it has none."""
+        self._build()
+        if not self.flags[row] & F_USAGE:
+            return None
+        return {field: self.usage[field][row] for field in USAGE_FIELDS}
+
+
+class SpanView:
+    """
+    One row of a SpanIndex, as seen by the deterministic metric accumulators.
+
+    `span` is the raw span dict; the decoders share the index's per-row cache.
+    """
+
+    __slots__ = ("index", "row", "span")
+
+    def __init__(self, index: SpanIndex, row: int, span: Dict[str, Any]):
+        self.index = index
+        self.row = row
+        self.span = span
+
+    def llm_response(self) -> Any:
+        return self.index.llm_response(self.row)
+
+    def tool_response(self) -> Any:
+        return self.index.tool_response(self.row)
@@ -0,0 +1,184 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Tuple
+
+import httpx
+from opentelemetry import trace
+from opentelemetry.sdk.trace import SpanProcessor
+
+DEFAULT_TRACE_DEADLINE = 30.0
+DEFAULT_POLL_INTERVAL = 0.25
+DEFAULT_MAX_POLL_INTERVAL = 2.0
+
+# Traces a SessionSpanCollector holds before evicting the least recently updated one
+DEFAULT_MAX_COLLECTED_TRACES = 10000
+
+# Known ADK trace routes, in the order they are probed for an unknown server.
+TRACE_ENDPOINT_TEMPLATES = (
+    "{base_url}/debug/trace/session/{session_id}",
+    "{base_url}/apps/{app_name}/sessions/{session_id}/trace",
+    "{base_url}/dev/apps/{app_name}/debug/trace/session/{session_id}",
+)
+
+
+class TraceFetcher:
+    """
+    Polling schedule and endpoint selection for /debug/trace session lookups.
+
+    Polls start at `poll_interval` with jitter and back off to `max_poll_interval`
+    until `deadline` seconds have passed. The first trace route that answers 200
+    for a base_url is remembered process-wide; later lookups against the same
+    server only hit that route, so a route the server does not expose is never
+    probed again.
+    """
+
+    # base_url -> endpoint template that has served a trace
+    _working_endpoints: Dict[str, str] = {}
+
+    def __init__(
+        self,
+        base_url: str,
+        app_name: str,
+        deadline: float = DEFAULT_TRACE_DEADLINE,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        max_poll_interval: float = DEFAULT_MAX_POLL_INTERVAL,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.app_name = app_name
+        self.deadline = deadline
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+
+    def candidates(self, session_id: str) -> List[Tuple[str, str]]:
+        """Returns (template, url) pairs to try; only the remembered route once one is known."""
+        known = self._working_endpoints.get(self.base_url)
+        templates = (known,) if known else TRACE_ENDPOINT_TEMPLATES
+        return [
+            (t, t.format(base_url=self.base_url, app_name=self.app_name, session_id=session_id))
+            for t in templates
+        ]
+
+    def remember(self, template: str) -> None:
+        """Records that `template` is a live trace route on this server."""
+        self._working_endpoints[self.base_url] = template
+
+    def poll_delays(self) -> Iterator[float]:
+        """
+        Yields the sleep before each poll: 0 for the first, then jittered delays
+        that grow by 1.5x up to max_poll_interval. Stops once the deadline has passed.
+        """
+        start = time.monotonic()
+        interval = self.poll_interval
+        yield 0.0
+        while True:
+            remaining = self.deadline - (time.monotonic() - start)
+            if remaining <= 0:
+                return
+            yield min(remaining, random.uniform(interval / 2, interval))
+            interval = min(interval * 1.5, self.max_poll_interval)
+
+
+class SessionSpanCollector(SpanProcessor):
+    """
+    OpenTelemetry span processor that keeps finished spans grouped by ADK session.
+
+    Used when the agent runs in this process: spans are read straight from the
+    tracer instead of polling the server's trace endpoint. Spans are grouped by
+    trace id, and a trace belongs to a session once any of its spans carries the
+    session id attribute (as ADK's own InMemoryExporter does).
+
+    get_session_trace hands a session's spans over and forgets them. Traces that
+    are never claimed (e.g. of sessions whose trace is not fetched) are evicted,
+    least recently updated first, beyond `max_traces`, so a long run does not
+    keep every span.
+    """
+
+    SESSION_ATTRIBUTES = ("gcp.vertex.agent.session_id", "gen_ai.conversation.id")
+
+    def __init__(self, max_traces: int = DEFAULT_MAX_COLLECTED_TRACES):
+        super().__init__()
+        self.max_traces = max_traces
+        self._lock = threading.Lock()
+        self._spans_by_trace: "OrderedDict[int, List[Any]]" = OrderedDict()
+        self._traces_by_session: Dict[str, List[int]] = {}
+        self._session_of_trace: Dict[int, str] = {}
+
+    def install(self) -> "SessionSpanCollector":
+        """Registers the collector on the global tracer provider."""
+        provider = trace.get_tracer_provider()
+        if not hasattr(provider, "add_span_processor"):
+            raise RuntimeError(
+                "In-process span capture needs an OpenTelemetry SDK TracerProvider."
+            )
+        provider.add_span_processor(self)
+        return self
+
+    # --- SpanProcessor interface ---
+
+    def on_end(self, span) -> None:
+        trace_id = span.context.trace_id
+        attributes = span.attributes or {}
+        session_id = next(
+            (attributes[a] for a in self.SESSION_ATTRIBUTES if attributes.get(a)), None
+        )
+        with self._lock:
+            self._spans_by_trace.setdefault(trace_id, []).append(span)
+            self._spans_by_trace.move_to_end(trace_id)
+            if session_id and trace_id not in self._session_of_trace:
+                self._session_of_trace[trace_id] = session_id
+                self._traces_by_session.setdefault(session_id, []).append(trace_id)
+            while len(self._spans_by_trace) > self.max_traces:
+                evicted, _ = self._spans_by_trace.popitem(last=False)
+                self._forget_trace(evicted)
+
+    def _forget_trace(self, trace_id: int) -> None:
+        session_id = self._session_of_trace.pop(trace_id, None)
+        if session_id is None:
+            return
+        trace_ids = self._traces_by_session.get(session_id, [])
+        if trace_id in trace_ids:
+            trace_ids.remove(trace_id)
+        if not trace_ids:
+            self._traces_by_session.pop(session_id, None)
+
+    # --- Lookup ---
+
+    def get_session_trace(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Returns the session's spans in the same shape as ADK's /debug/trace/session
+        route, and drops them from the collector.
+        """
+        with self._lock:
+            trace_ids = self._traces_by_session.pop(session_id, [])
+            spans = []
+            for trace_id in trace_ids:
+                self._session_of_trace.pop(trace_id, None)
+                spans.extend(self._spans_by_trace.pop(trace_id, []))
+        return [
+            {
+                "name": s.name,
+                "span_id": s.context.span_id,
+                "trace_id": s.context.trace_id,
+                "start_time": s.start_time,
+                "end_time": s.end_time,
+                "attributes": dict(s.attributes or {}),
+                "parent_span_id": s.parent.span_id if s.parent else None,
+            }
+            for s in spans
+        ]
+
+
+def build_in_process_transport(agents_dir: str) -> Tuple[httpx.ASGITransport, SessionSpanCollector]:
+    """
+    Builds the ADK API server for `agents_dir` in this process.
+
+    Returns an httpx transport that routes requests straight into the app, and a
+    span collector installed on the tracer provider the app configured.
+    """
+    from google.adk.cli.fast_api import get_fast_api_app
+
+    app = get_fast_api_app(agents_dir=agents_dir, web=False)
+    collector = SessionSpanCollector().install()
+    return httpx.ASGITransport(app=app), collector
@@ -0,0 +1,120 @@
+import asyncio
+import itertools
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Queue priorities: steps of sessions that are already open go before opening new ones
+_CONTINUING = 0
+_NEW = 1
+
+
+class TurnScheduler:
+    """
+    Interleaves the steps of many conversations through a fixed pool of workers.
+
+    Each conversation object exposes:
+        num_steps       -- number of steps (e.g. create session + one per turn)
+        async step(i)   -- runs step i
+        fail(error)     -- called once if a step raises; remaining steps are dropped
+        timings         -- list that receives one timing dict per executed step
+
+    A conversation's step i+1 is only queued once step i has finished, so turns
+    within a session stay ordered, while a free worker always picks up whichever
+    session is ready next. Ready steps of open sessions are served before new
+    sessions are opened. For every step the scheduler records the queue wait
+    (ready -> picked up) and the service time (picked up -> finished): long waits
+    mean the harness is the bottleneck, long service times mean the agent is.
+    """
+
+    def __init__(self, workers: int):
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        self.workers = workers
+        self._timings: List[Dict[str, Any]] = []
+
+    async def run(
+        self,
+        conversations: List[Any],
+        on_finished: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        """
+        Runs every step of every conversation, returning when all are finished.
+
+        on_finished, if given, is called with each conversation as soon as its
+        last step completes (or a step fails). If it raises, the run stops and
+        the error is re-raised.
+        """
+        queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        order = itertools.count()
+        remaining = 0
+        done = asyncio.Event()
+        callback_errors: List[BaseException] = []
+
+        for conversation in conversations:
+            if conversation.num_steps > 0:
+                remaining += 1
+                queue.put_nowait((_NEW, next(order), conversation, 0, time.monotonic()))
+        if not remaining:
+            return
+
+        async def worker() -> None:
+            nonlocal remaining
+            while True:
+                _, _, conversation, index, ready_at = await queue.get()
+                started = time.monotonic()
+                failed = False
+                try:
+                    await conversation.step(index)
+                except Exception as e:
+                    conversation.fail(e)
+                    failed = True
+                finished = time.monotonic()
+
+                timing = {
+                    "step": index,
+                    "queue_wait_seconds": started - ready_at,
+                    "service_seconds": finished - started,
+                }
+                conversation.timings.append(timing)
+                self._timings.append(timing)
+
+                if not failed and index + 1 < conversation.num_steps:
+                    queue.put_nowait((_CONTINUING, next(order), conversation, index + 1, finished))
+                else:
+                    remaining -= 1
+                    try:
+                        if on_finished is not None:
+                            on_finished(conversation)
+                    except Exception as e:
+                        callback_errors.append(e)
+                        done.set()
+                        return
+                    if remaining == 0:
+                        done.set()
+
+        tasks = [asyncio.create_task(worker()) for _ in range(self.workers)]
+        try:
+            await done.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if callback_errors:
+            raise callback_errors[0]
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregates queue-wait vs service time over every step run so far."""
+        if not self._timings:
+            return {"steps": 0}
+        waits = [t["queue_wait_seconds"] for t in self._timings]
+        services = [t["service_seconds"] for t in self._timings]
+        return {
+            "steps": len(self._timings),
+            "mean_queue_wait_seconds": statistics.fmean(waits),
+            "median_queue_wait_seconds": statistics.median(waits),
+            "max_queue_wait_seconds": max(waits),
+            "mean_service_seconds": statistics.fmean(services),
+            "median_service_seconds": statistics.median(services),
+            "max_service_seconds": max(services),
+        }
@@ -1 +1,112 @@
-from evaluation.core.agent_client import AgentClient
\ No newline at end of file
+import asyncio
+import json
+import unittest
+from unittest.mock import MagicMock
+
+import httpx
+import pandas as pd
+
+from evaluation.core.agent_client import AgentClient, AsyncAgentClient
+from evaluation.core.processor import InteractionProcessor
+
+
+class TestAgentClientPooling(unittest.TestCase):
+    def test_adapter_pool_is_sized_from_pool_size(self):
+        client = AgentClient("http://localhost:8080", "app", pool_size=32)
+        adapter = client._http.get_adapter("http://localhost:8080/run")
+        self.assertEqual(adapter._pool_maxsize, 32)
+        client.close()
+
+    def test_requests_go_through_shared_session(self):
+        client = AgentClient("http://localhost:8080", "app")
+        response = MagicMock()
+        response.json.return_value = {"id": "s1"}
+        client._http = MagicMock()
+        client._http.request.return_value = response
+
+        client.create_session()
+        client.get_session_state("s1")
+
+        self.assertEqual(client._http.request.call_count, 2)
+
+    def test_processor_reuses_one_client_per_agent(self):
+        shared = AsyncAgentClient("http://localhost:8080", "app", user_id="u1")
+        processor = InteractionProcessor({}, agent_client=shared)
+        rows = [
+            pd.Series({"base_url": "http://localhost:8080", "app_name": "app", "ADK_USER_ID": "u1"}),
+            pd.Series({"base_url": "http://localhost:8080/", "app_name": "app", "ADK_USER_ID": "u1"}),
+        ]
+
+        self.assertIs(processor._get_client(rows[0]), shared)
+        self.assertIs(processor._get_client(rows[1]), shared)
+        asyncio.run(processor.aclose())
+
+
+class TestAsyncAgentClient(unittest.TestCase):
+    def test_session_run_and_state_are_coroutines(self):
+        seen = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append((request.method, request.url.path))
+            if request.url.path == "/run":
+                body = json.loads(request.content)
+                return httpx.Response(200, json=[{"text": body["new_message"]["parts"][0]["text"]}])
+            return httpx.Response(200, json={"state": {"k": "v"}})
+
+        async def scenario():
+            async with AsyncAgentClient(
+                "http://localhost:8080", "app", transport=httpx.MockTransport(handler)
+            ) as client:
+                session_id = await client.create_session()
+                reply = await client.run_interaction(session_id, "hi")
+                state = await client.get_session_state(session_id)
+                return session_id, reply, state
+
+        session_id, reply, state = asyncio.run(scenario())
+
+        self.assertEqual(reply, [{"text": "hi"}])
+        self.assertEqual(state["state"], {"k": "v"})
+        self.assertEqual(
+            [m for m, _ in seen], ["POST", "POST", "GET"]
+        )
+        self.assertIn(session_id, seen[0][1])
+
+    def test_sync_close_and_with_are_rejected(self):
+        client = AsyncAgentClient("http://localhost:8080", "app")
+
+        with self.assertRaises(TypeError):
+            client.close()
+        with self.assertRaises(TypeError):
+            with client:
+                pass
+        asyncio.run(client.aclose())
+
+    def test_stream_interaction_records_first_token_latency(self):
+        sse_body = (
+            'data: {"author": "agent", "content": {"parts": [{"text": "thinking", "thought": true}]}}\n\n'
+            'data: {"author": "agent", "content": {"parts": [{"text": "Hello"}]}, "partial": true}\n\n'
+            'data: {"author": "agent", "content": {"parts": [{"text": "Hello there"}]}}\n\n'
+        )
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.assertEqual(request.url.path, "/run_sse")
+            self.assertTrue(json.loads(request.content)["streaming"])
+            return httpx.Response(200, text=sse_body, headers={"content-type": "text/event-stream"})
+
+        async def scenario():
+            async with AsyncAgentClient(
+                "http://localhost:8080", "app", transport=httpx.MockTransport(handler)
+            ) as client:
+                return await client.stream_interaction("s1", "hi")
+
+        result = asyncio.run(scenario())
+
+        self.assertEqual(len(result["events"]), 3)
+        latency = result["latency"]
+        self.assertEqual(latency["event_count"], 3)
+        self.assertEqual(len(latency["inter_event_gaps_seconds"]), 2)
+        self.assertLessEqual(latency["time_to_first_event_seconds"], latency["time_to_first_text_seconds"])
+
+
+if __name__ == "__main__":
+    unittest.main()
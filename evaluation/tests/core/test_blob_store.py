@@ -0,0 +1,74 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from evaluation.core.blob_store import (
+    BlobRef,
+    BlobWriter,
+    blob_path,
+    bundle_blob_file,
+    check_blob_file,
+    load_blob,
+    open_blob_ref,
+)
+
+
+class TestBlobStore(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.data_path = os.path.join(self.test_dir, "raw", "processed.jsonl")
+        os.makedirs(os.path.dirname(self.data_path))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_references_load_lazily_from_the_side_car_file(self):
+        base_dir = os.path.dirname(self.data_path)
+        record = {"question_id": "q1", "session_trace": [{"span_id": "1"}], "final_session_state": {"state": {"k": "é"}}}
+        with BlobWriter(blob_path(self.data_path), truncate=True) as blobs:
+            stored = blobs.externalize(record, base_dir)
+        with BlobWriter(blob_path(self.data_path)) as blobs:
+            appended = blobs.externalize({"session_trace": [{"span_id": "2"}]}, base_dir)
+
+        self.assertTrue(blob_path(self.data_path).endswith(os.path.join("raw", "processed.blobs")))
+        self.assertEqual(stored["question_id"], "q1")
+        self.assertGreater(appended["session_trace"]["offset"], stored["final_session_state"]["offset"])
+
+        # References survive a JSON round trip and are resolved against the referencing file's directory
+        trace = open_blob_ref(json.loads(json.dumps(stored["session_trace"])), base_dir)
+        state = open_blob_ref(stored["final_session_state"], base_dir)
+        self.assertIsInstance(trace, BlobRef)
+        self.assertEqual(load_blob(trace), record["session_trace"])
+        self.assertEqual(json.loads(state.raw()), record["final_session_state"])
+        self.assertEqual(str(state), json.dumps(record["final_session_state"], ensure_ascii=False))
+        self.assertEqual(open_blob_ref(appended["session_trace"], base_dir).load(), [{"span_id": "2"}])
+
+        # Re-referenced from another directory, the reference still points at the same blob
+        moved = open_blob_ref(state.reference(self.test_dir), self.test_dir)
+        self.assertEqual(moved.load(), record["final_session_state"])
+        self.assertEqual(load_blob({"inline": True}), {"inline": True})
+
+    def test_bundled_copy_survives_the_original_being_replaced_or_removed(self):
+        base_dir = os.path.dirname(self.data_path)
+        with BlobWriter(blob_path(self.data_path), truncate=True) as blobs:
+            ref = blobs.put({"v": 1}, base_dir)
+        results_dir = os.path.join(self.test_dir, "results")
+        os.makedirs(results_dir)
+        bundled = bundle_blob_file(blob_path(self.data_path), results_dir, "evaluation_results_1.blobs")
+        self.assertEqual(bundle_blob_file(bundled, results_dir, "other.blobs"), bundled)
+        moved = BlobRef(bundled, ref["offset"], ref["length"])
+
+        # Rewriting the interaction's blob file replaces it instead of truncating the linked data
+        with BlobWriter(blob_path(self.data_path), truncate=True) as blobs:
+            blobs.put({"other": "value"}, base_dir)
+        os.remove(blob_path(self.data_path))
+        self.assertEqual(moved.load(), {"v": 1})
+
+        with self.assertRaisesRegex(FileNotFoundError, "processed.jsonl"):
+            check_blob_file(blob_path(self.data_path), referenced_from=self.data_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from evaluation.core.converters import AdkHistoryConverter, ConversionManifest, read_jsonl
+
+
+def history_file(path: Path, eval_id: str, text: str = "hello") -> None:
+    events = [
+        {"author": "user", "timestamp": 1.0, "invocation_id": "i1",
+         "content": {"role": "user", "parts": [{"text": "hi"}]}},
+        {"author": "agent", "timestamp": 2.0, "invocation_id": "i1",
+         "content": {"role": "model", "parts": [{"text": text}]}},
+    ]
+    session = {"id": f"s_{eval_id}", "app_name": "app", "user_id": "u", "state": {}, "events": events}
+    with open(path, "w") as f:
+        json.dump({"eval_case_results": [{"eval_id": eval_id, "session_details": session}]}, f)
+
+
+class TestAdkHistoryConversion(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.agent_dir = Path(self.test_dir) / "agent"
+        self.history_dir = self.agent_dir / ".adk" / "eval_history"
+        self.history_dir.mkdir(parents=True)
+        for i in range(4):
+            history_file(self.history_dir / f"h{i}.json", f"q{i}")
+        self.output = os.path.join(self.test_dir, "out.jsonl")
+        self.manifest_path = os.path.join(self.test_dir, "manifest.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_pool_streams_rows_in_file_order(self):
+        converter = AdkHistoryConverter(str(self.agent_dir))
+        files = converter.history_files()
+
+        count = converter.convert(files, self.output, workers=2)
+
+        self.assertEqual(count, 4)
+        self.assertEqual([r["question_id"] for r in read_jsonl(self.output)], ["q0", "q1", "q2", "q3"])
+        self.assertEqual(len(converter.run()), 4)
+
+    def test_manifest_skips_converted_files_until_they_change(self):
+        converter = AdkHistoryConverter(str(self.agent_dir))
+        files = converter.history_files()
+        manifest = ConversionManifest(self.manifest_path)
+        converter.convert(files[:3], self.output, manifest=manifest)
+
+        manifest = ConversionManifest(self.manifest_path)
+        self.assertEqual([f for f in files if not manifest.is_converted(f)], [files[3]])
+
+        # Same size and a new mtime: the content hash tells a touched file from an edited one
+        stat = os.stat(files[0])
+        os.utime(files[0], (stat.st_atime, stat.st_mtime + 10))
+        history_file(Path(files[1]), "q1", text="HELLO")
+        self.assertTrue(manifest.is_converted(files[0]))
+        self.assertFalse(manifest.is_converted(files[1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
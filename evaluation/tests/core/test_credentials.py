@@ -0,0 +1,93 @@
+import asyncio
+import base64
+import json
+import threading
+import unittest
+
+from evaluation.core.agent_client import AgentClient, AsyncAgentClient
+from evaluation.core.credentials import CredentialProvider, token_expiry
+
+
+def make_jwt(exp):
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode()).decode().rstrip("=")
+    return f"header.{payload}.signature"
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestCredentialProvider(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.minted = []
+        self.refreshed = threading.Event()
+
+        def minter(audience):
+            self.minted.append(audience)
+            if len(self.minted) > 1:
+                self.refreshed.set()
+            return make_jwt(self.clock.now + 3600)
+
+        self.provider = CredentialProvider(minters=[minter], refresh_margin=300, clock=self.clock)
+
+    def test_token_expiry_reads_exp_claim(self):
+        self.assertEqual(token_expiry(make_jwt(1234)), 1234.0)
+        self.assertIsNone(token_expiry("not-a-jwt"))
+
+    def test_token_is_shared_across_clients(self):
+        clients = [
+            AgentClient("https://agent.run.app", "app", credentials=self.provider) for _ in range(5)
+        ]
+        tokens = {client.token for client in clients}
+
+        self.assertEqual(len(tokens), 1)
+        self.assertEqual(self.minted, ["https://agent.run.app"])
+
+    def test_token_close_to_expiry_is_refreshed_in_background(self):
+        first = self.provider.get_token("aud")
+        self.clock.now += 3600 - 100  # inside the refresh margin, still valid
+
+        self.assertEqual(self.provider.get_token("aud"), first)
+        self.assertTrue(self.refreshed.wait(timeout=2))
+        self.assertNotEqual(self.provider.get_token("aud"), first)
+
+    def test_expired_token_is_minted_again(self):
+        self.provider.get_token("aud")
+        self.clock.now += 7200
+
+        self.provider.get_token("aud")
+
+        self.assertEqual(len(self.minted), 2)
+
+    def test_falls_back_to_next_minter(self):
+        def failing(audience):
+            raise RuntimeError("no service account")
+
+        provider = CredentialProvider(minters=[failing, lambda audience: "plain-token"], clock=self.clock)
+
+        self.assertEqual(provider.get_token("aud"), "plain-token")
+
+    def test_async_clients_mint_once(self):
+        async def scenario():
+            clients = [
+                AsyncAgentClient("https://agent.run.app", "app", credentials=self.provider)
+                for _ in range(10)
+            ]
+            headers = await asyncio.gather(*(c._get_headers_async() for c in clients))
+            for c in clients:
+                await c.aclose()
+            return headers
+
+        headers = asyncio.run(scenario())
+
+        self.assertEqual(len({h["Authorization"] for h in headers}), 1)
+        self.assertEqual(len(self.minted), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
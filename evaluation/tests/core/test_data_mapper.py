@@ -1 +1,59 @@
-from evaluation.core.data_mapper import map_dataset_columns, robust_json_loads
\ No newline at end of file
+import json
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from evaluation.core import data_mapper
+from evaluation.core.data_mapper import MappingPlanner, map_dataset_columns, robust_json_loads
+
+
+class TestMappingPlanner(unittest.TestCase):
+    def setUp(self):
+        tools = [{"tool_name": "lookup", "input_arguments": {"id": 1}, "output_result": "ok"}]
+        self.original_df = pd.DataFrame({
+            "user_inputs": [["hi", "last"], ["one"]],
+            "final_response": [{"a": 1}, "text"],
+            "extracted_data": [json.dumps({"tool_interactions": tools, "docs": [{"d": 1}, 2]}), "{}"],
+        })
+        self.agent_df = self.original_df.copy()
+        self.agent_df["extracted_data"] = self.agent_df["extracted_data"].apply(robust_json_loads)
+        self.mappings = {
+            "tool_use_quality": {
+                "intermediate_events": {"source_column": "extracted_data:tool_interactions"},
+                "docs": {"source_column": "extracted_data:docs"},
+            },
+            "hallucination": {
+                "intermediate_events": {"source_column": "extracted_data:tool_interactions"},
+                "prompt": {"source_column": "user_inputs", "transform": "last_item"},
+                "note": {"template": "Q: {user_inputs}", "source_columns": ["user_inputs"]},
+                "missing": {"source_column": "nope:deep", "default": "N/A"},
+            },
+        }
+
+    def test_shared_columns_are_materialized_once(self):
+        planner = MappingPlanner(self.agent_df, self.original_df)
+        # prompt/response defaults, events, docs, last_item prompt and the template
+        self.assertEqual(planner.compile(self.mappings), 6)
+
+        with patch.object(
+            data_mapper, "convert_interactions_to_events", wraps=data_mapper.convert_interactions_to_events
+        ) as convert:
+            datasets = {name: planner.dataset(name, mapping) for name, mapping in self.mappings.items()}
+
+        self.assertEqual(convert.call_count, len(self.agent_df))
+        for name, mapping in self.mappings.items():
+            expected = map_dataset_columns(self.agent_df, self.original_df, mapping, name)
+            pd.testing.assert_frame_equal(datasets[name], expected)
+
+        hallucination = datasets["hallucination"]
+        self.assertEqual(list(hallucination["prompt"]), ["last", "one"])
+        self.assertEqual(list(hallucination["note"]), ["Q: ['hi', 'last']", "Q: ['one']"])
+        self.assertEqual(list(hallucination["missing"]), ["N/A", "N/A"])
+        self.assertEqual(len(hallucination["intermediate_events"][0]), 2)
+        self.assertEqual(hallucination["intermediate_events"][1], [])
+        self.assertEqual(list(datasets["tool_use_quality"]["docs"]), ['{"d": 1}\n2', ""])
+
+
+if __name__ == "__main__":
+    unittest.main()
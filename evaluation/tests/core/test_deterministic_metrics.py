@@ -1 +1,114 @@
-from evaluation.core.deterministic_metrics import evaluate_deterministic_metrics
\ No newline at end of file
+import json
+import unittest
+from unittest.mock import patch
+
+from evaluation.core import deterministic_metrics
+from evaluation.core.deterministic_metrics import (
+    DETERMINISTIC_METRICS,
+    TRACE_METRIC_ACCUMULATORS,
+    evaluate_deterministic_metrics,
+)
+
+
+def _llm_span(start, end, usage, model="gemini-2.5-flash"):
+    return {
+        "name": "call_llm",
+        "start_time": start,
+        "end_time": end,
+        "attributes": {
+            "gen_ai.request.model": model,
+            "gcp.vertex.agent.llm_response": json.dumps({"usage_metadata": usage}),
+        },
+    }
+
+
+SAMPLE_TRACE = [
+    {"name": "invoke_agent root_agent", "start_time": 1_000_000_000, "end_time": 9_000_000_000, "attributes": {}},
+    _llm_span(1_100_000_000, 2_000_000_000, {
+        "prompt_token_count": 100, "candidates_token_count": 20, "cached_content_token_count": 50,
+        "thoughts_token_count": 5, "total_token_count": 175,
+    }),
+    {
+        "name": "execute_tool read_file",
+        "start_time": 2_000_000_000,
+        "end_time": 3_000_000_000,
+        "attributes": {"gcp.vertex.agent.tool_response": json.dumps({"status": "error"})},
+    },
+    _llm_span(3_000_000_000, 4_500_000_000, {"prompt_token_count": 200, "candidates_token_count": 40, "total_token_count": 240}),
+    {"name": "call_llm", "start_time": 5_000_000_000, "end_time": 5_500_000_000,
+     "attributes": {"gcp.vertex.agent.llm_response": "{not json"}},
+]
+
+
+class TestFusedTraceMetrics(unittest.TestCase):
+    def test_matches_standalone_functions(self):
+        latency_data = [{"name": "invocation", "duration_seconds": 4.0}]
+        fused = evaluate_deterministic_metrics(
+            session_state={}, session_trace=SAMPLE_TRACE, agents_evaluated=[], question_metadata={},
+            metrics_to_run=list(TRACE_METRIC_ACCUMULATORS), latency_data=latency_data,
+        )
+
+        for name in TRACE_METRIC_ACCUMULATORS:
+            if name == "latency_metrics":
+                expected = DETERMINISTIC_METRICS[name](SAMPLE_TRACE, latency_data=latency_data)
+            else:
+                expected = DETERMINISTIC_METRICS[name](SAMPLE_TRACE)
+            self.assertEqual(
+                (fused[name]["score"], fused[name]["explanation"], fused[name]["details"]),
+                expected,
+                name,
+            )
+        self.assertEqual(fused["token_usage"]["details"]["llm_calls"], 2)
+        self.assertEqual(fused["tool_success_rate"]["score"], 0.0)
+
+    def test_decodes_each_payload_once(self):
+        with patch.object(deterministic_metrics.json, "loads", wraps=json.loads) as loads:
+            evaluate_deterministic_metrics(
+                session_state={}, session_trace=SAMPLE_TRACE, agents_evaluated=[], question_metadata={},
+            )
+        # Three LLM responses (one malformed) and one tool response
+        self.assertEqual(loads.call_count, 4)
+
+    def test_failing_metric_does_not_affect_others(self):
+        trace = SAMPLE_TRACE + [{"name": None, "start_time": 6_000_000_000, "end_time": 7_000_000_000}]
+        results = evaluate_deterministic_metrics(
+            session_state={}, session_trace=trace, agents_evaluated=[], question_metadata={},
+            metrics_to_run=["tool_utilization", "token_usage"],
+        )
+        self.assertTrue(results["tool_utilization"]["explanation"].startswith("Error evaluating metric tool_utilization"))
+        self.assertEqual(results["token_usage"]["details"]["llm_calls"], 2)
+
+
+class TestUserPerceivedLatency(unittest.TestCase):
+    def test_averages_streaming_turns(self):
+        streaming_latency = [
+            {"time_to_first_event_seconds": 0.2, "time_to_first_text_seconds": 1.0,
+             "inter_event_gaps_seconds": [0.1, 0.3]},
+            {"time_to_first_event_seconds": 0.4, "time_to_first_text_seconds": 3.0,
+             "inter_event_gaps_seconds": [0.5]},
+        ]
+        results = evaluate_deterministic_metrics(
+            session_state={},
+            session_trace=[],
+            agents_evaluated=[],
+            question_metadata={},
+            metrics_to_run=["user_perceived_latency"],
+            streaming_latency=streaming_latency,
+        )
+
+        result = results["user_perceived_latency"]
+        self.assertAlmostEqual(result["score"], 2.0)
+        self.assertAlmostEqual(result["details"]["average_time_to_first_event_seconds"], 0.3)
+        self.assertEqual(result["details"]["max_time_to_first_text_seconds"], 3.0)
+        self.assertEqual(result["details"]["max_inter_event_gap_seconds"], 0.5)
+
+    def test_missing_streaming_data_is_not_scored(self):
+        results = evaluate_deterministic_metrics(
+            session_state={}, session_trace=[], agents_evaluated=[], question_metadata={},
+            metrics_to_run=["user_perceived_latency"], streaming_latency=None,
+        )
+        self.assertIsNone(results["user_perceived_latency"]["score"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,7 +8,13 @@ from unittest.mock import MagicMock, patch
 import pandas as pd
 
 # Import the class under test
-from evaluation.core.evaluator import Evaluator
+from evaluation.core.evaluator import (
+    SCORE_TABLE_COLUMNS,
+    Evaluator,
+    build_scores_table,
+    llm_metric_results,
+    save_metrics_summary,
+)
 
 
 @patch("evaluation.core.evaluator.CONFIG")
@@ -54,6 +60,7 @@ class TestEvaluator(unittest.TestCase):
         """
         mock_config.GOOGLE_CLOUD_PROJECT = "test-project"
         mock_config.MAX_WORKERS = 1
+        mock_config.DETERMINISTIC_WORKERS = 1
         
         # Setup Input Data with ADK Scores in JSONL format
         input_data = [
@@ -108,6 +115,11 @@ class TestEvaluator(unittest.TestCase):
         """Test LLM metrics execution using JSONL input."""
         mock_config.GOOGLE_CLOUD_PROJECT = "test-project"
         mock_config.MAX_WORKERS = 2
+        mock_config.DETERMINISTIC_WORKERS = 1
+        mock_config.JUDGE_CHUNK_SIZE = 10
+        mock_config.JUDGE_MAX_CHUNK_SIZE = 100
+        mock_config.JUDGE_CHUNK_TARGET_SECONDS = 30.0
+        mock_config.JUDGE_MAX_CONCURRENCY = 8
         
         # Input data
         input_file = Path(self.test_dir) / "input.jsonl"
@@ -151,5 +163,279 @@ class TestEvaluator(unittest.TestCase):
         mock_executor_instance.submit.assert_called()
         mock_as_completed.assert_called()
 
+    def test_deterministic_metrics_process_pool_matches_serial(self, mock_client, mock_aiplatform, mock_config):
+        mock_config.GOOGLE_CLOUD_PROJECT = "test-project"
+        trace = [
+            {"span_id": i, "name": "call_llm", "start_time": i * 10, "end_time": i * 10 + 5,
+             "attributes": {"gcp.vertex.agent.llm_response": json.dumps(
+                 {"usage_metadata": {"prompt_token_count": i, "candidates_token_count": 2}}
+             )}}
+            for i in range(1, 4)
+        ]
+        raw_df = pd.DataFrame([
+            {"question_id": f"q{i}", "final_session_state": json.dumps({"id": i}),
+             "session_trace": json.dumps(trace[:i]), "latency_data": json.dumps([])}
+            for i in range(1, 4)
+        ] + [{"question_id": "q4", "final_session_state": None, "session_trace": None, "latency_data": None}])
+        parsed_df = raw_df.copy()
+        for col in ["final_session_state", "session_trace", "latency_data"]:
+            parsed_df[col] = parsed_df[col].apply(lambda v: json.loads(v) if isinstance(v, str) else None)
+
+        evaluator = Evaluator(self.config)
+        mock_config.DETERMINISTIC_WORKERS = 1
+        serial = evaluator._run_deterministic_metrics(parsed_df, raw_df)
+        mock_config.DETERMINISTIC_WORKERS = 2
+        pooled = evaluator._run_deterministic_metrics(parsed_df, raw_df)
+
+        self.assertEqual(list(pooled), [0, 1, 2])
+        self.assertEqual(dict(pooled), dict(serial))
+        self.assertEqual(pooled[2]["token_usage"]["details"]["prompt_tokens"], 6)
+
+    @patch("evaluation.core.evaluator.save_metrics_summary")
+    @patch("evaluation.core.evaluator.load_and_consolidate_metrics")
+    def test_resume_reuses_checkpointed_metrics(
+        self, mock_load_metrics, mock_save_summary, mock_client, mock_aiplatform, mock_config
+    ):
+        mock_config.GOOGLE_CLOUD_PROJECT = "test-project"
+        mock_config.MAX_WORKERS = 1
+        mock_config.DETERMINISTIC_WORKERS = 1
+        mock_config.MAX_RETRIES = 1
+        mock_config.RETRY_DELAY_SECONDS = 0
+        mock_config.JUDGE_CHUNK_SIZE = 10
+        mock_config.JUDGE_MAX_CHUNK_SIZE = 100
+        mock_config.JUDGE_CHUNK_TARGET_SECONDS = 30.0
+        mock_config.JUDGE_MAX_CONCURRENCY = 8
+
+        input_file = Path(self.test_dir) / "input.jsonl"
+        with open(input_file, "w") as f:
+            for i in range(2):
+                f.write(json.dumps({"question_id": f"q{i}", "agents_evaluated": ["agent1"], "final_response": "x" * (i + 1)}) + "\n")
+        mock_load_metrics.return_value = {
+            name: {"metric_type": "llm", "agents": ["agent1"], "template": "{response}"}
+            for name in ("clarity", "tone")
+        }
+
+        failing = set()
+
+        def judge(dataset, metrics):
+            name = metrics[0].name
+            if name in failing:
+                raise RuntimeError("interrupted")
+            score = {"clarity": 1.0, "tone": 2.0}[name]
+            return MagicMock(spec=["eval_case_results"], eval_case_results=[
+                MagicMock(spec=["metrics"], metrics={name: MagicMock(score=score + len(r), explanation="ok", rubric_verdicts=None, error_message=None)})
+                for r in dataset["response"]
+            ])
+
+        mock_client.return_value.evals.evaluate.side_effect = judge
+
+        def run(config):
+            Evaluator(config).evaluate(input_file, [], self.results_dir)
+            return mock_save_summary.call_args[0][0]["eval_results"].map(json.loads).tolist()
+
+        expected = run(self.config)
+        self.assertEqual((expected[1]["clarity"]["score"], expected[1]["tone"]["score"]), (3.0, 4.0))
+        checkpoint = self.results_dir / "raw" / "eval_checkpoint.jsonl"
+        self.assertEqual(len(checkpoint.read_text().splitlines()), 2)
+
+        # First attempt loses "tone"; the resumed run only sends "tone" to the judge
+        failing.add("tone")
+        partial = run(self.config)
+        self.assertNotIn("tone", partial[0])
+        self.assertEqual(len(checkpoint.read_text().splitlines()), 1)
+
+        failing.clear()
+        mock_client.return_value.evals.evaluate.reset_mock()
+        resumed = run({**self.config, "resume": True})
+        judged = [c.kwargs["metrics"][0].name for c in mock_client.return_value.evals.evaluate.call_args_list]
+        self.assertEqual(judged, ["tone"])
+        self.assertEqual(resumed, expected)
+
+    def test_judge_tasks_are_chunked_and_only_failed_chunks_retried(self, mock_client, mock_aiplatform, mock_config):
+        mock_config.GOOGLE_CLOUD_PROJECT = "test-project"
+        mock_config.MAX_WORKERS = 1
+        mock_config.JUDGE_CHUNK_SIZE = 4
+        mock_config.JUDGE_MAX_CHUNK_SIZE = 4
+        mock_config.JUDGE_CHUNK_TARGET_SECONDS = 30.0
+        mock_config.JUDGE_MAX_CONCURRENCY = 8
+
+        sent = []
+
+        def judge(dataset, metrics):
+            responses = list(dataset["response"])
+            sent.append(responses)
+            if "r5" in responses and len(sent) == 2:
+                raise RuntimeError("Deadline exceeded")
+            return MagicMock(spec=["eval_case_results"], eval_case_results=[
+                MagicMock(spec=["metrics"], metrics={"m": MagicMock(score=float(r[1:]), explanation="", rubric_verdicts=None, error_message=None)})
+                for r in responses
+            ])
+
+        mock_client.return_value.evals.evaluate.side_effect = judge
+        evaluator = Evaluator(self.config)
+        metric_df = pd.DataFrame({"question_id": range(10)}, index=range(100, 110))
+        eval_dataset = pd.DataFrame({"response": [f"r{i}" for i in range(10)]}, index=metric_df.index)
+        task = (eval_dataset, MagicMock(), metric_df, "m", evaluator.client, 3, 0)
+
+        (index, result_df, name, input_df), = evaluator._run_judge_tasks([(task, None)])
+
+        self.assertEqual((index, name), (0, "m"))
+        self.assertEqual(list(result_df["original_index"]), list(range(100, 110)))
+        self.assertEqual(list(result_df["m/score"]), [float(i) for i in range(10)])
+        self.assertEqual(list(input_df["response"]), [f"r{i}" for i in range(10)])
+        # Only the failed chunk is sent again, split in halves
+        self.assertEqual(sent[0], ["r0", "r1", "r2", "r3"])
+        self.assertEqual(sorted(map(tuple, sent)), [
+            ("r0", "r1", "r2", "r3"), ("r4", "r5"), ("r4", "r5", "r6", "r7"), ("r6", "r7"), ("r8", "r9"),
+        ])
+
+    def test_partial_judge_results_keep_their_inputs(self, mock_client, mock_aiplatform, mock_config):
+        mock_config.GOOGLE_CLOUD_PROJECT = "test-project"
+        mock_config.MAX_WORKERS = 1
+        mock_config.JUDGE_CHUNK_SIZE = 10
+        mock_config.JUDGE_MAX_CHUNK_SIZE = 10
+        mock_config.JUDGE_CHUNK_TARGET_SECONDS = 30.0
+        mock_config.JUDGE_MAX_CONCURRENCY = 1
+
+        sent = []
+
+        def judge(dataset, metrics):
+            responses = list(dataset["response"])
+            sent.append(responses)
+            # The first call drops its last two rows
+            answered = responses[:-2] if len(sent) == 1 else responses
+            return MagicMock(spec=["eval_case_results"], eval_case_results=[
+                MagicMock(spec=["metrics"], metrics={"m": MagicMock(score=float(r[1:]), explanation="", rubric_verdicts=None, error_message=None)})
+                for r in answered
+            ])
+
+        mock_client.return_value.evals.evaluate.side_effect = judge
+        evaluator = Evaluator(self.config)
+        metric_df = pd.DataFrame({"question_id": range(20)}, index=range(100, 120))
+        eval_dataset = pd.DataFrame({"response": [f"r{i}" for i in range(20)]}, index=metric_df.index)
+        task = (eval_dataset, MagicMock(), metric_df, "m", evaluator.client, 3, 0)
+
+        (_, result_df, name, input_df), = evaluator._run_judge_tasks([(task, None)])
+
+        self.assertEqual(sent[1], ["r8", "r9"])
+        self.assertEqual(len(input_df), len(result_df))
+        for idx, result in llm_metric_results(result_df, name, input_df):
+            self.assertEqual(result["input"]["response"], f"r{int(result['score'])}")
+            self.assertEqual(idx, 100 + int(result["score"]))
+
+    def test_quota_errors_back_off_without_using_retries(self, mock_client, mock_aiplatform, mock_config):
+        mock_config.GOOGLE_CLOUD_PROJECT = "test-project"
+        mock_config.MAX_WORKERS = 2
+        mock_config.JUDGE_MAX_CONCURRENCY = 4
+        mock_config.JUDGE_MAX_QUOTA_RETRIES = 3
+        mock_config.JUDGE_CHUNK_SIZE = 2
+        mock_config.JUDGE_MAX_CHUNK_SIZE = 2
+        mock_config.JUDGE_CHUNK_TARGET_SECONDS = 30.0
+
+        calls = []
+
+        def judge(dataset, metrics):
+            calls.append(list(dataset["response"]))
+            if len(calls) <= 2:
+                raise RuntimeError("429 RESOURCE_EXHAUSTED")
+            return MagicMock(spec=["eval_case_results"], eval_case_results=[
+                MagicMock(spec=["metrics"], metrics={"m": MagicMock(score=1.0, explanation="", rubric_verdicts=None, error_message=None)})
+                for _ in dataset["response"]
+            ])
+
+        mock_client.return_value.evals.evaluate.side_effect = judge
+        evaluator = Evaluator(self.config)
+        metric_df = pd.DataFrame({"question_id": range(6)})
+        eval_dataset = pd.DataFrame({"response": [f"r{i}" for i in range(6)]})
+        # retries=1: any other failure would not be retried
+        task = (eval_dataset, MagicMock(), metric_df, "m", evaluator.client, 1, 0)
+        timeline_path = Path(self.test_dir) / "judge_concurrency.csv"
+
+        (_, result_df, _, _), = evaluator._run_judge_tasks([(task, None)], timeline_path=timeline_path)
+
+        self.assertEqual(list(result_df["original_index"]), list(range(6)))
+        self.assertEqual(len(calls), 5)
+        timeline = pd.read_csv(timeline_path)
+        self.assertEqual(timeline["event"].iloc[0], "start")
+        self.assertIn("decrease", set(timeline["event"]))
+        self.assertEqual(timeline["limit"].min(), 1)
+
+
+class TestSaveMetricsSummary(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_scores_table_and_statistics(self):
+        def results(score, recall):
+            return json.dumps({
+                "helpfulness": {"score": score, "explanation": f"e{score}", "details": {"recall": recall, "label": "x"}},
+                "safety": {"score": None, "error": "failed"},
+            })
+
+        df = pd.DataFrame({
+            "question_id": ["q2", "q1", "q1"],
+            "run_id": [1, 1, 2],
+            "eval_results": [results(5, 0.5), results(1, 0.0), results(3, 1.0)],
+            # Metadata that is not a JSON object is left out of the question summary
+            "question_metadata": ['{"complexity": "low"}', "['not', 'a', 'dict']", "{}"],
+        })
+
+        scores, _ = build_scores_table(df)
+        self.assertEqual(list(scores.columns), SCORE_TABLE_COLUMNS)
+        self.assertEqual(len(scores), 6)
+        self.assertEqual(list(scores["question_id"].unique()), ["q1", "q2"])
+
+        save_metrics_summary(df, Path(self.test_dir), "exp", "test", "desc", {"helpfulness": {"score_range": [1, 5]}})
+        with open(Path(self.test_dir) / "eval_summary.json") as f:
+            summary = json.load(f)
+
+        overall = summary["overall_summary"]
+        self.assertEqual(overall["llm_based_metrics"]["helpfulness"], {"average": 3.0, "score_range": [1, 5]})
+        self.assertEqual(overall["llm_based_metrics"]["helpfulness.recall"], {"average": 0.5})
+        self.assertNotIn("safety", overall["llm_based_metrics"])
+        stats = overall["score_statistics"]["helpfulness"]
+        self.assertEqual(stats["count"], 3)
+        self.assertEqual((stats["min"], stats["max"], stats["p50"]), (1.0, 5.0, 3.0))
+        self.assertAlmostEqual(stats["p90"], 4.6)
+        self.assertAlmostEqual(stats["std"], 2.0)
+
+        q1, q2 = summary["per_question_summary"]
+        self.assertEqual((q1["question_id"], q1["runs"]), ("q1", 2))
+        self.assertEqual(q1["llm_metrics"]["helpfulness"]["score"], 3)
+        self.assertEqual(q1["llm_metrics"]["safety"], {"score": None, "error": "failed"})
+        self.assertEqual(q1["score_statistics"]["helpfulness"]["mean"], 2.0)
+        self.assertNotIn("complexity", q1)
+        self.assertEqual(q2["complexity"], "low")
+        # A single score has no standard deviation
+        self.assertIsNone(q2["score_statistics"]["helpfulness.recall"]["std"])
+
+
+class TestLlmMetricResults(unittest.TestCase):
+    def test_columnar_merge(self):
+        result_df = pd.DataFrame({
+            "original_index": [4, 7, 9],
+            "m/score": [5.0, float("nan"), 3.0],
+            "m/explanation": ['["a", "b"]', None, ""],
+            "m/error": [None, "Deadline exceeded", None],
+        })
+        input_df = pd.DataFrame({
+            "prompt": ["p" * 600, "short", None],
+            "tools": [[{"name": "t"}], [], None],
+        })
+
+        results = llm_metric_results(result_df, "m", input_df)
+
+        self.assertEqual([idx for idx, _ in results], [4, 7, 9])
+        first, second, third = (r for _, r in results)
+        self.assertEqual(first["explanation"], ["a", "b"])
+        self.assertEqual(first["input"]["prompt"], "p" * 500 + "... [truncated]")
+        self.assertEqual(first["input"]["tools"], [{"name": "t"}])
+        self.assertEqual(second, {"score": None, "error": "Deadline exceeded", "input": {"prompt": "short", "tools": []}})
+        # Empty explanation and an all-missing input row are left out
+        self.assertEqual(third, {"score": 3.0})
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
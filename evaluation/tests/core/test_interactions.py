@@ -0,0 +1,121 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from evaluation.cli.main import _run_and_enrich
+from evaluation.core.interactions import InteractionRunner
+from evaluation.core.journal import InteractionJournal, is_failed
+from evaluation.core.processor import InteractionProcessor
+
+
+class TestInteractionRunner(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.questions_file = os.path.join(self.test_dir, "golden.json")
+        questions = [{"id": f"q{i}", "user_inputs": ["hi", "and then?"]} for i in range(8)]
+        with open(self.questions_file, "w") as f:
+            json.dump({"golden_questions": questions}, f)
+        self.config = {
+            "app_name": "app",
+            "base_url": "http://localhost:8080",
+            "questions_file": self.questions_file,
+            "runs": 2,
+            "max_concurrency": 3,
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _fake_client(self, runner, calls):
+        state = {"in_flight": 0, "peak": 0}
+
+        async def track(entry):
+            state["in_flight"] += 1
+            state["peak"] = max(state["peak"], state["in_flight"])
+            calls.append(entry)
+            await asyncio.sleep(0.01)
+            state["in_flight"] -= 1
+
+        async def create_session(**kwargs):
+            session_id = f"s{len([c for c in calls if c[0] == 'create'])}"
+            await track(("create", session_id))
+            return session_id
+
+        async def run_interaction(session_id, turn):
+            await track(("turn", session_id, turn))
+
+        runner.agent_client.create_session = create_session
+        runner.agent_client.run_interaction = run_interaction
+        return state
+
+    def test_run_respects_max_concurrency(self):
+        runner = InteractionRunner(self.config)
+        calls = []
+        state = self._fake_client(runner, calls)
+
+        df = asyncio.run(runner.run())
+
+        self.assertEqual(len(df), 16)
+        self.assertEqual(state["peak"], 3)
+
+    def test_turns_stay_ordered_per_session_and_report_timings(self):
+        runner = InteractionRunner(self.config)
+        calls = []
+        self._fake_client(runner, calls)
+
+        df = asyncio.run(runner.run())
+
+        for session_id in df["session_id"]:
+            turns = [c[2] for c in calls if c[0] == "turn" and c[1] == session_id]
+            self.assertEqual(turns, ["hi", "and then?"])
+        timings = json.loads(df["turn_timings"].iloc[0])
+        self.assertEqual([t["turn"] for t in timings], ["create_session", 0, 1])
+        self.assertEqual(runner.turn_stats["steps"], 48)
+
+    def test_run_journals_each_finished_pair_and_skips_known_ones(self):
+        runner = InteractionRunner(self.config)
+        calls = []
+        self._fake_client(runner, calls)
+        journal = InteractionJournal(os.path.join(self.test_dir, "journal.jsonl"))
+
+        result = asyncio.run(runner.run(journal=journal, skip={("q0", 1), ("q0", 2), ("q1", 1)}))
+
+        # Journaled rows are not also collected in memory
+        self.assertIsNone(result)
+        self.assertEqual(len(journal.completed_keys()), 13)
+        self.assertNotIn(("q0", 1), journal.completed_keys())
+
+    def test_resume_runs_failed_pairs_again(self):
+        raw = InteractionJournal(os.path.join(self.test_dir, "journal.jsonl"))
+        processed = InteractionJournal(os.path.join(self.test_dir, "processed.jsonl"), parse_json_strings=True)
+        for q in range(8):
+            for r in (1, 2):
+                status = {"boolean": "failed", "error_message": "Connection reset"} if (q, r) == (0, 1) else {"boolean": "success"}
+                record = {"question_id": f"q{q}", "run_id": r, "status": json.dumps(status)}
+                raw.append(record)
+                processed.append(record)
+
+        runner = InteractionRunner(self.config)
+        calls = []
+        self._fake_client(runner, calls)
+        processor = InteractionProcessor({"skip_traces": True}, agent_client=runner.agent_client)
+
+        async def fake_enrich(row, results_dir, skip_traces, client):
+            return row
+
+        with patch("evaluation.core.processor.enrich_single_interaction", fake_enrich):
+            count = asyncio.run(_run_and_enrich(runner, processor, raw, processed))
+
+        self.assertEqual(count, 1)
+        self.assertEqual(len([c for c in calls if c[0] == "create"]), 1)
+        self.assertEqual(processed.compact(), 1)
+        self.assertEqual(len(processed.completed_keys()), 16)
+        self.assertFalse(any(is_failed(r) for r in processed.records()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from evaluation.core.blob_store import BLOB_FIELDS, blob_path, open_blob_ref
+from evaluation.core.journal import InteractionJournal, is_failed, journal_key
+
+
+class TestInteractionJournal(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "journal.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_appended_records_are_read_back_with_keys(self):
+        journal = InteractionJournal(self.path)
+        journal.append({"question_id": "q1", "run_id": 1, "status": json.dumps({"boolean": "success"})})
+        journal.append({"question_id": "q1", "run_id": 2, "status": json.dumps({"boolean": "failed"})})
+
+        reopened = InteractionJournal(self.path)
+
+        # A failed run is not complete, so a resumed run tries it again
+        self.assertEqual(reopened.completed_keys(), {("q1", 1)})
+        # Raw journals keep JSON-string fields untouched
+        self.assertIsInstance(reopened.records()[0]["status"], str)
+
+    def test_later_records_replace_failed_runs(self):
+        journal = InteractionJournal(self.path, parse_json_strings=True)
+        journal.append({"question_id": "q1", "run_id": 1, "status": json.dumps({"boolean": "failed"})})
+        journal.append({"question_id": "q2", "run_id": 1, "status": json.dumps({"boolean": "success"})})
+        self.assertEqual(journal.completed_keys(), {("q2", 1)})
+
+        journal.append({"question_id": "q1", "run_id": 1, "status": json.dumps({"boolean": "success"})})
+        self.assertEqual(journal.completed_keys(), {("q1", 1), ("q2", 1)})
+        self.assertFalse(is_failed(journal.latest_records()[("q1", 1)]))
+
+        self.assertEqual(journal.compact(), 1)
+        self.assertEqual(journal.compact(), 0)
+        records = journal.records()
+        self.assertEqual([journal_key(r) for r in records], [("q2", 1), ("q1", 1)])
+        self.assertEqual(records[1]["status"], {"boolean": "success"})
+
+    def test_parse_json_strings_writes_nested_objects(self):
+        journal = InteractionJournal(self.path, parse_json_strings=True)
+        journal.append({"question_id": 7, "run_id": "1", "status": json.dumps({"boolean": "success"})})
+
+        record = journal.records()[0]
+        self.assertEqual(record["status"], {"boolean": "success"})
+        self.assertEqual(journal_key(record), ("7", 1))
+
+    def test_truncated_last_line_is_dropped_on_reopen(self):
+        with open(self.path, "w") as f:
+            f.write(json.dumps({"question_id": "q1", "run_id": 1}) + "\n")
+            f.write('{"question_id": "q2", "ru')
+
+        journal = InteractionJournal(self.path)
+        journal.append({"question_id": "q2", "run_id": 1})
+
+        self.assertEqual(journal.completed_keys(), {("q1", 1), ("q2", 1)})
+
+    def test_blob_fields_are_written_to_the_side_car_file(self):
+        trace = [{"name": "invocation", "attributes": {"text": "é" * 10}}]
+        journal = InteractionJournal(self.path, parse_json_strings=True, blob_fields=BLOB_FIELDS)
+        journal.append({"question_id": "q1", "run_id": 1, "session_trace": json.dumps(trace), "final_session_state": None})
+        journal.append({"question_id": "q2", "run_id": 1, "session_trace": json.dumps(trace), "final_session_state": "{}"})
+
+        first, second = InteractionJournal(self.path).records()
+        self.assertTrue(os.path.exists(blob_path(self.path)))
+        self.assertEqual(first["session_trace"]["$blob"], "journal.blobs")
+        self.assertEqual(open_blob_ref(second["session_trace"], self.test_dir).load(), trace)
+        # Empty values stay inline
+        self.assertIsNone(first["final_session_state"])
+        self.assertEqual(second["final_session_state"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from evaluation.core.json_stream import (
+    LAZY,
+    JsonMemoryLimitError,
+    LazyValue,
+    iter_json_values,
+    json_default,
+    load_json,
+)
+
+
+class TestJsonStream(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.doc = {
+            "id": "q1",
+            "text": 'esc\\aped "quotes" é {not [a] bracket}',
+            "numbers": [1, -2.5e3, True, None, False],
+            "trace": [
+                {"name": "llm", "attributes": {"request": "x" * 5000, "response": {"ok": [1, {}]}}},
+                {"name": "tool", "attributes": {}},
+            ],
+            "nested": {"deep": [[[]], {}, ""]},
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write(self, name: str, text: str) -> str:
+        path = os.path.join(self.test_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_matches_json_loads_across_chunk_boundaries(self):
+        path = self.write("doc.json", json.dumps(self.doc, indent=2))
+        for chunk_size in (1, 3, 64, 1 << 20):
+            self.assertEqual(load_json(path, chunk_size=chunk_size), self.doc)
+
+    def test_json_lines_and_field_selection(self):
+        path = self.write("rows.jsonl", "\n".join(json.dumps(dict(self.doc, id=f"q{i}")) for i in range(3)) + "\n")
+        spec = {"id": True, "trace": [{"name": True, "attributes": {"*": True, "request": LAZY}}]}
+
+        rows = list(iter_json_values(path, spec, chunk_size=16, inline_bytes=1024))
+
+        self.assertEqual([r["id"] for r in rows], ["q0", "q1", "q2"])
+        self.assertEqual(set(rows[0]), {"id", "trace"})
+        request = rows[1]["trace"][0]["attributes"]["request"]
+        self.assertIsInstance(request, LazyValue)
+        self.assertEqual(request.load(), "x" * 5000)
+        self.assertEqual(str(request), "x" * 5000)
+        self.assertEqual(repr(request), f"LazyValue({path!r}, {request.offset}, {request.length})")
+        self.assertEqual(rows[1]["trace"][0]["attributes"]["response"], {"ok": [1, {}]})
+        self.assertEqual(json.loads(json.dumps(rows[2], default=json_default))["trace"], self.doc["trace"])
+
+        # Spans under inline_bytes are decoded in one call; the request then comes back decoded
+        inline = list(iter_json_values(path, spec, chunk_size=16))
+        self.assertEqual(inline[1]["trace"][0]["attributes"]["request"], "x" * 5000)
+        self.assertEqual(json.loads(json.dumps(inline, default=json_default)), json.loads(json.dumps(rows, default=json_default)))
+
+    def test_memory_limit_counts_kept_values_only(self):
+        path = self.write("doc.json", json.dumps(self.doc))
+
+        self.assertEqual(load_json(path, {"id": True}, max_bytes=100, chunk_size=8), {"id": "q1"})
+        with self.assertRaises(JsonMemoryLimitError):
+            load_json(path, max_bytes=1000, chunk_size=8)
+
+    def test_documents_over_the_limit_can_be_skipped(self):
+        lines = [{"id": "q1"}, dict(self.doc, id="q2"), {"id": "q3"}]
+        path = self.write("rows.jsonl", "".join(json.dumps(line) + "\n" for line in lines))
+        errors = []
+
+        rows = list(iter_json_values(path, {"*": True}, max_bytes=1000, chunk_size=8, on_limit=errors.append))
+
+        self.assertEqual(rows, [{"id": "q1"}, {"id": "q3"}])
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], JsonMemoryLimitError)
+
+    def test_malformed_input_raises(self):
+        for text in ('{"a": [1, 2}', '{"a": "open', '{"a" 1}', ""):
+            with self.assertRaises(ValueError):
+                load_json(self.write("bad.json", text))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from evaluation.core.evaluator import run_metric_chunk
+from evaluation.core.judge_cache import JudgeCache
+
+DEFINITION = {"metric_type": "llm", "agents": ["agent1"], "template": "Rate {response}"}
+
+
+def _judge(dataset, metrics):
+    """Fake client.evals.evaluate: scores each row by the length of its response."""
+    cases = [
+        SimpleNamespace(metrics={"helpfulness": SimpleNamespace(
+            score=float(len(response)), explanation=f"len {response}", rubric_verdicts=None, error_message=None
+        )})
+        for response in dataset["response"]
+    ]
+    return SimpleNamespace(eval_case_results=cases)
+
+
+class TestJudgeCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache = JudgeCache(Path(self.test_dir) / "judge")
+        self.client = MagicMock()
+        self.client.evals.evaluate.side_effect = _judge
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _run(self, responses, definition=DEFINITION, cache=None):
+        cache = cache or self.cache
+        agent_df = pd.DataFrame({"question_id": [f"q{i}" for i in range(len(responses))]}, index=range(10, 10 + len(responses)))
+        dataset = pd.DataFrame({"response": responses})
+        task = (dataset, MagicMock(), agent_df, "helpfulness", self.client, 1, 0)
+        return run_metric_chunk(task, cache, cache.metric_fingerprint("helpfulness", definition))
+
+    def test_only_misses_are_sent_to_the_judge(self):
+        first, _, _ = self._run(["a", "bb"])
+        result_df, name, input_df = self._run(["a", "bb", "ccc"])
+
+        self.assertEqual(self.client.evals.evaluate.call_count, 2)
+        sent = self.client.evals.evaluate.call_args.kwargs["dataset"]
+        self.assertEqual(list(sent["response"]), ["ccc"])
+        self.assertEqual(list(result_df["original_index"]), [10, 11, 12])
+        self.assertEqual(list(result_df["helpfulness/score"]), [1.0, 2.0, 3.0])
+        self.assertEqual(list(input_df["response"]), ["a", "bb", "ccc"])
+        self.assertEqual(first.to_dict("records"), result_df.iloc[:2].to_dict("records"))
+        self.assertEqual(self.cache.stats()["per_metric"]["helpfulness"], {"hits": 2, "misses": 3})
+
+    def test_definition_change_and_failures_are_not_reused(self):
+        self._run(["a"])
+        self._run(["a"], definition={**DEFINITION, "agents": ["agent2"]})
+        self.assertEqual(self.client.evals.evaluate.call_count, 1)
+
+        self._run(["a"], definition={**DEFINITION, "template": "Judge {response}"})
+        self.assertEqual(self.client.evals.evaluate.call_count, 2)
+
+        self.client.evals.evaluate.side_effect = RuntimeError("quota")
+        with self.assertRaises(RuntimeError):
+            self._run(["new"])
+        self.client.evals.evaluate.side_effect = _judge
+        self._run(["new"])
+        self.assertEqual(self.client.evals.evaluate.call_count, 4)
+
+        stats = JudgeCache(self.cache.directory).stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (0, 0, None))
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
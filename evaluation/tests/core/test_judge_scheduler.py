@@ -0,0 +1,137 @@
+import unittest
+
+import pandas as pd
+
+from evaluation.core.judge_scheduler import ChunkSizer, ConcurrencyController, JudgeScheduler, is_quota_error
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestChunkSizer(unittest.TestCase):
+    def test_grows_toward_target_latency(self):
+        sizer = ChunkSizer(initial=4, maximum=64, target_seconds=10.0)
+        sizer.observe(rows=4, seconds=0.4, failed=False)
+        self.assertEqual(sizer.next_size(), 8)  # at most doubles per chunk
+        for _ in range(30):
+            sizer.observe(rows=sizer.next_size(), seconds=sizer.next_size() * 0.5, failed=False)
+        self.assertEqual(sizer.next_size(), 20)  # 10s at 0.5s per row
+
+    def test_failures_shrink_chunks(self):
+        sizer = ChunkSizer(initial=16, maximum=64, target_seconds=10.0)
+        sizer.observe(rows=16, seconds=1.0, failed=True)
+        self.assertEqual(sizer.next_size(), 8)
+        sizer.observe(rows=8, seconds=1.0, failed=True)
+        sizer.observe(rows=4, seconds=1.0, failed=True)
+        sizer.observe(rows=2, seconds=1.0, failed=True)
+        sizer.observe(rows=1, seconds=1.0, failed=True)
+        self.assertEqual(sizer.next_size(), 1)
+
+        # Recovery is held back while the recent error rate is high
+        sizer.observe(rows=1, seconds=0.1, failed=False)
+        self.assertLess(sizer.next_size(), 3)
+        self.assertGreater(sizer.error_rate, 0.5)
+
+
+
+class TestConcurrencyController(unittest.TestCase):
+    def test_additive_increase_multiplicative_decrease(self):
+        clock = FakeClock()
+        controller = ConcurrencyController(initial=2, maximum=4, clock=clock)
+        for _ in range(2 + 3 + 4 + 4):
+            clock.now += 1
+            controller.on_success(rows=10, seconds=1.0, in_flight=1)
+        self.assertEqual(controller.limit, 4)  # +1 per window of `limit` successes, capped
+
+        # A burst of 429s from calls started before the decrease halves the limit once
+        started = clock.now
+        clock.now += 1
+        for _ in range(3):
+            controller.on_error(started, quota=True, in_flight=3)
+        self.assertEqual(controller.limit, 2)
+        self.assertEqual(controller.quota_errors, 3)
+        clock.now += 1
+        controller.on_error(clock.now, quota=True, in_flight=1)
+        self.assertEqual(controller.limit, 1)
+
+        events = [entry[3] for entry in controller.timeline]
+        self.assertEqual(events, ["start", "increase", "increase", "decrease", "decrease"])
+
+    def test_no_growth_when_latency_or_errors_degrade(self):
+        controller = ConcurrencyController(initial=1, maximum=8, clock=FakeClock())
+        controller.on_success(rows=10, seconds=1.0, in_flight=0)
+        self.assertEqual(controller.limit, 2)
+        for _ in range(6):
+            controller.on_success(rows=10, seconds=5.0, in_flight=1)
+        self.assertEqual(controller.limit, 2)
+
+        controller = ConcurrencyController(initial=1, maximum=8, clock=FakeClock())
+        controller.on_error(0.0, quota=False, in_flight=0)
+        controller.on_success(rows=10, seconds=1.0, in_flight=0)
+        self.assertEqual(controller.limit, 1)
+
+    def test_quota_errors_are_recognized(self):
+        class ClientError(Exception):
+            code = 429
+
+        self.assertTrue(is_quota_error(ClientError("Too many requests")))
+        self.assertTrue(is_quota_error(RuntimeError("429 RESOURCE_EXHAUSTED. Quota exceeded for aiplatform")))
+        self.assertFalse(is_quota_error(RuntimeError("row 14290 failed: invalid JSON")))
+        self.assertFalse(is_quota_error(TimeoutError("Deadline exceeded")))
+
+
+class TestJudgeScheduler(unittest.TestCase):
+    def make_task(self, rows: int, retries: int = 3):
+        metric_df = pd.DataFrame({"question_id": range(rows)}, index=range(100, 100 + rows))
+        eval_dataset = pd.DataFrame({"response": [f"r{i}" for i in range(rows)]}, index=metric_df.index)
+        return (eval_dataset, None, metric_df, "m", None, retries, 0)
+
+    def run_scheduler(self, tasks, run_chunk, chunk_size=10):
+        scheduler = JudgeScheduler(
+            tasks, run_chunk, ConcurrencyController(initial=1, maximum=1), chunk_size, chunk_size, 30.0, 3
+        )
+        return list(scheduler.run())
+
+    def test_partial_chunks_are_retried_and_rows_kept_in_order(self):
+        calls = []
+
+        def run_chunk(task_index, chunk_task):
+            eval_dataset, _, metric_df = chunk_task[:3]
+            calls.append(list(eval_dataset["response"]))
+            # The first call answers all but two rows
+            keep = [pos for pos in range(len(metric_df)) if len(calls) > 1 or pos not in (3, 6)]
+            result_df = pd.DataFrame({
+                "original_index": metric_df.index[keep],
+                "m/score": [float(r[1:]) for r in eval_dataset["response"].iloc[keep]],
+            })
+            return result_df, "m", eval_dataset.iloc[keep]
+
+        (index, result_df, name, input_df), = self.run_scheduler([self.make_task(10)], run_chunk)
+
+        self.assertEqual((index, name), (0, "m"))
+        self.assertEqual(calls[1], ["r3", "r6"])
+        self.assertEqual(list(result_df["original_index"]), list(range(100, 110)))
+        self.assertEqual(list(result_df["m/score"]), [float(i) for i in range(10)])
+        self.assertEqual(list(input_df["response"]), [f"r{i}" for i in range(10)])
+
+    def test_failed_rows_are_dropped_after_retries(self):
+        def run_chunk(task_index, chunk_task):
+            eval_dataset, _, metric_df = chunk_task[:3]
+            if task_index == 1:
+                raise RuntimeError("Deadline exceeded")
+            result_df = pd.DataFrame({"original_index": metric_df.index, "m/score": 1.0})
+            return result_df, "m", eval_dataset
+
+        results = self.run_scheduler([self.make_task(4), self.make_task(4, retries=2)], run_chunk, chunk_size=2)
+
+        self.assertEqual([r[0] for r in results], [0])
+        self.assertEqual(len(results[0][1]), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
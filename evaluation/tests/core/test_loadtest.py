@@ -0,0 +1,91 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import httpx
+import pandas as pd
+
+from evaluation.core.loadtest import LoadTester, error_status
+
+
+class TestLoadTester(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.questions_file = os.path.join(self.test_dir, "golden.json")
+        questions = [{"id": f"q{i}", "user_inputs": ["hi", "more"]} for i in range(3)]
+        with open(self.questions_file, "w") as f:
+            json.dump({"golden_questions": questions}, f)
+        self.config = {
+            "app_name": "app",
+            "base_url": "http://localhost:8080",
+            "questions_file": self.questions_file,
+            "duration": 0.2,
+            "seed": 7,
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _fake_client(self, tester, fail_every=None):
+        calls = {"n": 0}
+
+        async def create_session(**kwargs):
+            await asyncio.sleep(0.005)
+            return "s"
+
+        async def run_interaction(session_id, turn):
+            calls["n"] += 1
+            await asyncio.sleep(0.01)
+            if fail_every and calls["n"] % fail_every == 0:
+                request = httpx.Request("POST", "http://localhost:8080/run")
+                raise httpx.HTTPStatusError(
+                    "busy", request=request, response=httpx.Response(503, request=request)
+                )
+
+        tester.runner.agent_client.create_session = create_session
+        tester.runner.agent_client.run_interaction = run_interaction
+
+    def test_closed_loop_reports_each_stage_and_writes_curve(self):
+        tester = LoadTester({**self.config, "concurrency": [1, 4]})
+        self._fake_client(tester, fail_every=5)
+        self.assertEqual(tester.runner.agent_client.pool_size, 4)
+
+        report = asyncio.run(tester.run())
+        tester.write_report(report, self.test_dir)
+
+        low, high = report["stages"]
+        self.assertGreater(high["throughput_turns_per_second"], low["throughput_turns_per_second"])
+        self.assertLessEqual(low["latency_p50_seconds"], low["latency_p99_seconds"])
+        self.assertIn("503", high["errors_by_status"])
+        self.assertGreater(high["mean_concurrency"], low["mean_concurrency"])
+
+        curve = pd.read_csv(os.path.join(self.test_dir, "loadtest_curve.csv"))
+        self.assertEqual(list(curve["target"]), [1, 4])
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, "raw", "loadtest_requests.csv")))
+
+    def test_open_loop_starts_conversations_at_arrival_rate(self):
+        tester = LoadTester({**self.config, "arrival_rate": [50.0]})
+        self._fake_client(tester)
+        # Arrivals never queue for a connection inside the client
+        self.assertIsNone(tester.runner.agent_client.pool_size)
+
+        report = asyncio.run(tester.run())
+
+        stage = report["stages"][0]
+        self.assertGreater(stage["sessions_started"], 0)
+        self.assertEqual(stage["error_rate"], 0.0)
+
+    def test_requires_exactly_one_mode(self):
+        with self.assertRaises(ValueError):
+            LoadTester(self.config)
+
+    def test_error_status_classification(self):
+        self.assertEqual(error_status(None), "ok")
+        self.assertEqual(error_status(TimeoutError()), "TimeoutError")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from evaluation.core.analyzer import Analyzer
+from evaluation.core.parquet_store import (
+    read_frame,
+    read_parquet,
+    records_to_table,
+    write_parquet,
+    write_parquet_from_jsonl,
+)
+
+RECORDS = [
+    {
+        "question_id": "q1",
+        "run_id": 1,
+        "agents_evaluated": ["root_agent"],
+        "final_session_state": {"state": {"city": "Paris"}},
+        "session_trace": [{"span_id": 1, "name": "call_llm", "attributes": {"x": "1"}}],
+        "final_response": "Bonjour",
+    },
+    {
+        "question_id": "q2",
+        "run_id": 1,
+        "agents_evaluated": ["root_agent", "helper"],
+        "final_session_state": {"state": {}, "events": [1, 2]},
+        "session_trace": None,
+        "final_response": "Hello",
+    },
+]
+
+
+class TestParquetStore(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.path = self.test_dir / "processed_interaction_app.parquet"
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_round_trip_preserves_nested_values(self):
+        write_parquet(RECORDS, self.path)
+        df = read_parquet(self.path)
+
+        self.assertEqual(df.to_dict("records"), RECORDS)
+        schema = records_to_table(RECORDS).schema
+        self.assertEqual(str(schema.field("agents_evaluated").type), "list<item: string>")
+        self.assertEqual(str(schema.field("session_trace").type), "large_binary")
+        # Dicts with different keys per row fall back to JSON text
+        self.assertEqual(str(schema.field("final_session_state").type), "large_string")
+
+    def test_projection_and_predicate_pushdown(self):
+        write_parquet(RECORDS, self.path, row_group_size=1)
+        self.assertEqual(pq.ParquetFile(self.path).num_row_groups, 2)
+
+        df = read_parquet(self.path, columns=["question_id", "final_response"], filters=[("question_id", "=", "q2")])
+
+        self.assertEqual(list(df.columns), ["question_id", "final_response"])
+        self.assertEqual(df.to_dict("records"), [{"question_id": "q2", "final_response": "Hello"}])
+
+    def test_jsonl_is_streamed_one_row_group_at_a_time(self):
+        jsonl_path = self.test_dir / "processed_interaction_app.jsonl"
+        records = [dict(RECORDS[0], note=None), dict(RECORDS[1], note=["late"])]
+        jsonl_path.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+        self.assertEqual(write_parquet_from_jsonl(jsonl_path, self.path, row_group_size=1), 2)
+
+        self.assertEqual(pq.ParquetFile(self.path).num_row_groups, 2)
+        self.assertEqual(read_parquet(self.path).to_dict("records"), records)
+        schema = pq.read_schema(self.path)
+        self.assertEqual(str(schema.field("agents_evaluated").type), "list<element: string>")
+        self.assertEqual(str(schema.field("note").type), "list<element: string>")
+        # Row groups disagree on the struct's fields, so the column is JSON text
+        self.assertEqual(str(schema.field("final_session_state").type), "large_string")
+
+    def test_analyzer_log_skips_trace_columns(self):
+        results = pd.DataFrame(RECORDS).assign(eval_results=['{"m": {"score": 1.0}}', "{}"])
+        results_file = self.test_dir / "evaluation_results_20250101_000000.parquet"
+        write_parquet(results, results_file)
+
+        with patch("evaluation.core.analyzer.read_frame", wraps=read_frame) as reader:
+            ok = Analyzer({}).generate_question_answer_log(results_file, self.test_dir / "log.md")
+
+        self.assertTrue(ok)
+        selector = reader.call_args.kwargs["columns"]
+        self.assertFalse(selector("session_trace"))
+        self.assertFalse(selector("final_session_state"))
+        self.assertIn("Bonjour", (self.test_dir / "log.md").read_text())
+
+
+if __name__ == "__main__":
+    unittest.main()
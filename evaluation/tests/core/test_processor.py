@@ -0,0 +1,121 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+
+from evaluation.core.journal import InteractionJournal
+from evaluation.core.processor import InteractionProcessor
+
+
+class TestInteractionProcessorStreaming(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_consume_enriches_records_while_producer_is_running(self):
+        started = []
+
+        async def fake_enrich(row, results_dir, skip_traces, client):
+            started.append(row["question_id"])
+            await asyncio.sleep(0.01)
+            row = row.copy()
+            row["final_response"] = "done"
+            return row
+
+        journal = InteractionJournal(os.path.join(self.test_dir, "processed.jsonl"), parse_json_strings=True)
+        processor = InteractionProcessor({"skip_traces": True})
+
+        async def scenario():
+            queue = asyncio.Queue()
+            consumer = asyncio.create_task(processor.consume(queue, journal=journal))
+            for i in range(3):
+                queue.put_nowait({
+                    "question_id": f"q{i}", "run_id": 1, "base_url": "http://localhost",
+                    "app_name": "app", "ADK_USER_ID": "u", "status": json.dumps({"boolean": "success"}),
+                })
+                await asyncio.sleep(0.02)
+                # The record is being enriched before the producer has finished
+                self.assertIn(f"q{i}", started)
+            queue.put_nowait(None)
+            count = await consumer
+            await processor.aclose()
+            return count
+
+        with patch("evaluation.core.processor.enrich_single_interaction", fake_enrich):
+            count = asyncio.run(scenario())
+
+        self.assertEqual(count, 3)
+        records = journal.records()
+        self.assertEqual([r["final_response"] for r in records], ["done"] * 3)
+        self.assertEqual(records[0]["status"], {"boolean": "success"})
+
+    def test_consume_caps_records_enriched_at_once(self):
+        in_flight = []
+        peak = []
+
+        async def fake_enrich(row, results_dir, skip_traces, client):
+            in_flight.append(row["question_id"])
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.remove(row["question_id"])
+            return row
+
+        processor = InteractionProcessor({"skip_traces": True, "max_concurrency": 2})
+
+        async def scenario():
+            queue = asyncio.Queue()
+            for i in range(7):
+                queue.put_nowait({"question_id": f"q{i}", "run_id": 1, "base_url": "http://localhost", "app_name": "app", "ADK_USER_ID": "u"})
+            queue.put_nowait(None)
+            try:
+                return await processor.consume(queue)
+            finally:
+                await processor.aclose()
+
+        with patch("evaluation.core.processor.enrich_single_interaction", fake_enrich):
+            count = asyncio.run(scenario())
+
+        self.assertEqual(count, 7)
+        self.assertEqual(max(peak), 2)
+
+    def test_consume_reports_journal_failures_after_the_other_records(self):
+        async def fake_enrich(row, results_dir, skip_traces, client):
+            return row
+
+        journal = InteractionJournal(os.path.join(self.test_dir, "processed.jsonl"))
+        append = journal.append
+
+        def failing_append(record):
+            if record["question_id"] == "q1":
+                raise OSError("No space left on device")
+            append(record)
+
+        journal.append = failing_append
+        processor = InteractionProcessor({"skip_traces": True})
+
+        async def scenario():
+            queue = asyncio.Queue()
+            for i in range(3):
+                queue.put_nowait({"question_id": f"q{i}", "run_id": 1, "base_url": "http://localhost", "app_name": "app", "ADK_USER_ID": "u"})
+            queue.put_nowait(None)
+            try:
+                return await processor.consume(queue, journal=journal)
+            finally:
+                await processor.aclose()
+
+        with patch("evaluation.core.processor.enrich_single_interaction", fake_enrich):
+            with self.assertRaises(RuntimeError) as raised:
+                asyncio.run(scenario())
+
+        self.assertIsInstance(raised.exception.__cause__, OSError)
+        self.assertEqual(sorted(r["question_id"] for r in journal.records()), ["q0", "q2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+import asyncio
+import time
+import unittest
+
+from evaluation.core.rate_limiter import TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_acquire_paces_requests_after_burst(self):
+        async def scenario():
+            bucket = TokenBucket(rate=50, burst=1)
+            start = time.monotonic()
+            for _ in range(6):
+                await bucket.acquire()
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(scenario())
+        # First token is free, the remaining five need 5 / 50 = 0.1s
+        self.assertGreaterEqual(elapsed, 0.09)
+
+    def test_rejects_non_positive_rate(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
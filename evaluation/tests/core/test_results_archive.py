@@ -0,0 +1,101 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from evaluation.core.analyzer import Analyzer, find_results_files
+from evaluation.core.parquet_store import write_parquet
+from evaluation.core.results_archive import ResultsArchive, archive_paths, write_results_archive
+
+
+class TestResultsArchive(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.eval_results = [
+            {"helpfulness": {"score": 4, "explanation": "good"}, "latency": {"score": 1.5}},
+            {"helpfulness": {"score": 2, "explanation": "weak é"}, "latency": {"score": None}},
+            {"helpfulness": {"score": 5, "explanation": "great"}},
+        ]
+        self.df = pd.DataFrame(
+            {
+                "question_id": ["q1", "q2", "q1"],
+                "run_id": [1, 1, 2],
+                "user_inputs": [json.dumps(["hi"]), json.dumps(["hello", "again"]), json.dumps(["hi"])],
+                "final_response": ["a", "b", "c"],
+                "adk_score.safety": [1.0, 0.5, 1.0],
+                "eval_results": [json.dumps(r) for r in self.eval_results],
+            }
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write(self, name: str = "evaluation_results_1.parquet") -> str:
+        path = os.path.join(self.test_dir, name)
+        write_parquet(self.df, path)
+        write_results_archive(self.df, self.eval_results, path)
+        return path
+
+    def test_index_filters_and_records(self):
+        path = self.write()
+        archive = ResultsArchive.find(path)
+
+        self.assertEqual(len(archive), 3)
+        self.assertEqual(archive.select("helpfulness")["question_id"].tolist(), ["q1", "q2", "q1"])
+        self.assertEqual(len(archive.select("latency")), 1)
+        self.assertEqual(len(archive.select("missing")), 0)
+
+        records = list(archive.records(archive.select("latency")))
+        self.assertEqual([r["final_response"] for r in records], ["a"])
+        self.assertEqual(records[0]["eval_results"], self.eval_results[0])
+        self.assertEqual([r["final_response"] for r in archive.records()], ["a", "b", "c"])
+
+        self.assertEqual(find_results_files(Path(self.test_dir)), [Path(path)])
+        self.assertIsNone(ResultsArchive.find(os.path.join(self.test_dir, "other.csv")))
+
+    def test_stale_archive_is_ignored(self):
+        path = self.write()
+        self.df = self.df.iloc[:1]
+        write_parquet(self.df, path)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        self.assertIsNone(ResultsArchive.find(path))
+
+    def test_explanation_samples_match_results_file(self):
+        path = self.write()
+        summary_path = Path(self.test_dir, "eval_summary.json")
+        summary_path.write_text(json.dumps({"overall_summary": {"average_metrics": {"helpfulness": 3.67, "latency": 1.5}}}))
+        analyzer = Analyzer({})
+
+        _, from_archive = analyzer.analyze_evaluation_results(summary_path, Path(path))
+        for archive_file in archive_paths(path):
+            archive_file.unlink()
+        _, from_file = analyzer.analyze_evaluation_results(summary_path, Path(path))
+
+        self.assertIn("[Score: 2] weak é", from_archive)
+        self.assertEqual(from_archive, from_file)
+
+    def test_question_answer_log_matches_results_file(self):
+        path = self.write()
+        analyzer = Analyzer({})
+
+        from_archive = Path(self.test_dir, "from_archive.md")
+        self.assertTrue(analyzer.generate_question_answer_log(Path(path), from_archive))
+        for archive_file in archive_paths(path):
+            archive_file.unlink()
+        from_csv = Path(self.test_dir, "from_csv.md")
+        self.assertTrue(analyzer.generate_question_answer_log(Path(path), from_csv))
+
+        def body(p: Path) -> str:
+            return "\n".join(line for line in p.read_text().splitlines() if not line.startswith("**Generated:**"))
+
+        self.assertEqual(body(from_archive), body(from_csv))
+
+
+if __name__ == "__main__":
+    unittest.main()
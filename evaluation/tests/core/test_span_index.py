@@ -0,0 +1,63 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from evaluation.core.agent_client import AgentClient
+from evaluation.core.span_index import AGENT_RUN, LLM_CALL, TOOL_CALL, SpanIndex
+
+TRACE = [
+    {"span_id": 1, "name": "invoke_agent root_agent", "start_time": 1_000_000, "end_time": 9_000_000, "attributes": {}},
+    {"span_id": 2, "parent_span_id": 1, "name": "call_llm", "start_time": 2_000_000, "end_time": 4_000_000,
+     "attributes": {
+         "gen_ai.request.model": "gemini-2.5-flash",
+         "gcp.vertex.agent.llm_response": json.dumps(
+             {"usage_metadata": {"prompt_token_count": 10, "candidates_token_count": 3, "total_token_count": 13}}
+         ),
+     }},
+    {"span_id": 3, "parent_span_id": 1, "name": "execute_tool lookup_order", "start_time": 4_000_000, "end_time": 6_000_000,
+     "attributes": {"gcp.vertex.agent.tool_call_args": '{"id": 7}', "gcp.vertex.agent.tool_response": '{"status": "ok"}'}},
+    {"span_id": 4, "parent_span_id": 3, "name": "execute_tool BillingAgent", "attributes": {}},
+    {"span_id": 5, "parent_span_id": 42, "name": "agent_run [orphan]", "attributes": {}},
+]
+
+
+class TestSpanIndex(unittest.TestCase):
+    def test_tree_and_lookups(self):
+        index = SpanIndex(TRACE)
+
+        self.assertEqual(index.tree_roots(), [0, 4])
+        self.assertEqual(list(index.children(0)), [1, 2])
+        self.assertEqual(list(index.children(2)), [3])
+        self.assertEqual(index.rows_of_kind(AGENT_RUN), [0, 4])
+        self.assertEqual(index.rows_of_kind(LLM_CALL), [1])
+        self.assertEqual(index.rows_of_kind(TOOL_CALL), [2, 3])
+        self.assertEqual(index.agents(), ["root_agent", "orphan"])
+        self.assertEqual(index.tool_rows("BillingAgent"), [3])
+        self.assertEqual(index.duration_ms[1], 2.0)
+        self.assertEqual(index.token_usage(1)["total_token_count"], 13)
+        self.assertIsNone(index.token_usage(0))
+
+    def test_summaries_match_analyzed_trace(self):
+        analyzed = AgentClient.analyze_trace_and_extract_spans(TRACE)
+        index = SpanIndex(TRACE)
+
+        self.assertEqual(AgentClient.get_latency_from_spans(index), AgentClient.get_latency_from_spans(analyzed))
+        self.assertEqual(AgentClient.get_agent_trajectory(index), AgentClient.get_agent_trajectory(analyzed))
+        self.assertEqual(
+            AgentClient.get_agent_trajectory(index),
+            ["agent:root_agent", "tool:lookup_order", "sub-agent:BillingAgent", "agent:orphan"],
+        )
+        self.assertEqual(analyzed[0]["children"][1]["details"]["arguments"], {"id": 7})
+
+    def test_payloads_decoded_once_across_consumers(self):
+        index = SpanIndex(TRACE)
+        with patch("evaluation.core.span_index.json.loads", wraps=json.loads) as loads:
+            AgentClient.analyze_trace_and_extract_spans(index)
+            index.llm_response(1)
+            index.tool_response(2)
+        # llm_response, tool_call_args and tool_response, once each
+        self.assertEqual(loads.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import asyncio
+import unittest
+
+import httpx
+from opentelemetry.sdk.trace import TracerProvider
+
+from evaluation.core.agent_client import AsyncAgentClient
+from evaluation.core.trace_fetcher import SessionSpanCollector, TraceFetcher
+
+
+class TestTraceFetcher(unittest.TestCase):
+    def setUp(self):
+        TraceFetcher._working_endpoints.clear()
+
+    def test_poll_delays_stop_at_deadline(self):
+        fetcher = TraceFetcher("http://agent", "app", deadline=0.05, poll_interval=0.01)
+        delays = []
+        for delay in fetcher.poll_delays():
+            delays.append(delay)
+            asyncio.run(asyncio.sleep(delay))
+
+        self.assertEqual(delays[0], 0.0)
+        self.assertTrue(all(0 < d <= 0.05 for d in delays[1:]))
+        self.assertAlmostEqual(sum(delays), 0.05, delta=0.03)
+
+    def test_working_endpoint_is_remembered_per_base_url(self):
+        seen = []
+        ready = {"s1": False}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request.url.path)
+            if not request.url.path.startswith("/dev/apps/"):
+                return httpx.Response(404, json={"detail": "Not Found"})
+            session_id = request.url.path.rsplit("/", 1)[-1]
+            if not ready.get(session_id, True):
+                ready[session_id] = True
+                return httpx.Response(200, json=[])
+            return httpx.Response(200, json=[{"name": "invocation"}])
+
+        async def scenario():
+            async with AsyncAgentClient(
+                "http://localhost:8080", "app", transport=httpx.MockTransport(handler),
+                trace_deadline=5.0,
+            ) as client:
+                client.trace_fetcher.poll_interval = 0.01
+                first = await client.get_session_trace("s1")
+                seen.clear()
+                second = await client.get_session_trace("s2")
+                return first, second
+
+        first, second = asyncio.run(scenario())
+
+        self.assertEqual(first, [{"name": "invocation"}])
+        self.assertEqual(second, [{"name": "invocation"}])
+        # Once the /dev route answered, the dead routes are never probed again
+        self.assertEqual(seen, ["/dev/apps/app/debug/trace/session/s2"])
+
+    def test_missing_trace_raises_after_deadline(self):
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json=[]))
+
+        async def scenario():
+            async with AsyncAgentClient(
+                "http://localhost:8080", "app", transport=transport, trace_deadline=0.05
+            ) as client:
+                await client.get_session_trace("s1")
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(scenario())
+
+
+class TestSessionSpanCollector(unittest.TestCase):
+    def test_groups_spans_of_a_session_trace(self):
+        collector = SessionSpanCollector()
+        provider = TracerProvider()
+        provider.add_span_processor(collector)
+        tracer = provider.get_tracer("test")
+
+        with tracer.start_as_current_span("invocation") as root:
+            root.set_attribute("gcp.vertex.agent.session_id", "s1")
+            with tracer.start_as_current_span("call_llm"):
+                pass
+        with tracer.start_as_current_span("unrelated"):
+            pass
+
+        spans = collector.get_session_trace("s1")
+
+        self.assertEqual(sorted(s["name"] for s in spans), ["call_llm", "invocation"])
+        child = next(s for s in spans if s["name"] == "call_llm")
+        parent = next(s for s in spans if s["name"] == "invocation")
+        self.assertEqual(child["parent_span_id"], parent["span_id"])
+        # Handed-over spans are dropped
+        self.assertEqual(collector.get_session_trace("s1"), [])
+
+    def test_unclaimed_traces_are_evicted(self):
+        collector = SessionSpanCollector(max_traces=2)
+        provider = TracerProvider()
+        provider.add_span_processor(collector)
+        tracer = provider.get_tracer("test")
+        for session_id in ("s1", "s2", "s3"):
+            with tracer.start_as_current_span("invocation") as span:
+                span.set_attribute("gcp.vertex.agent.session_id", session_id)
+
+        self.assertEqual(collector.get_session_trace("s1"), [])
+        self.assertEqual([s["name"] for s in collector.get_session_trace("s2")], ["invocation"])
+        self.assertEqual([s["name"] for s in collector.get_session_trace("s3")], ["invocation"])
+
+    def test_async_client_reads_spans_without_http(self):
+        collector = SessionSpanCollector()
+        provider = TracerProvider()
+        provider.add_span_processor(collector)
+        with provider.get_tracer("test").start_as_current_span("invocation") as span:
+            span.set_attribute("gen_ai.conversation.id", "s1")
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise AssertionError("trace must not be fetched over HTTP")
+
+        async def scenario():
+            async with AsyncAgentClient(
+                "http://localhost", "app", transport=httpx.MockTransport(handler),
+                span_collector=collector,
+            ) as client:
+                return await client.get_session_trace("s1")
+
+        self.assertEqual([s["name"] for s in asyncio.run(scenario())], ["invocation"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import asyncio
+import unittest
+
+from evaluation.core.turn_scheduler import TurnScheduler
+
+
+class FakeConversation:
+    def __init__(self, name, num_steps, log, fail_at=None):
+        self.name = name
+        self.num_steps = num_steps
+        self.log = log
+        self.fail_at = fail_at
+        self.timings = []
+        self.error = None
+
+    async def step(self, index):
+        self.log.append((self.name, index))
+        await asyncio.sleep(0.005)
+        if index == self.fail_at:
+            raise RuntimeError("boom")
+
+    def fail(self, error):
+        self.error = error
+
+
+class TestTurnScheduler(unittest.TestCase):
+    def test_interleaves_sessions_and_keeps_step_order(self):
+        log = []
+        conversations = [FakeConversation(f"c{i}", 3, log) for i in range(4)]
+
+        asyncio.run(TurnScheduler(workers=2).run(conversations))
+
+        for c in conversations:
+            self.assertEqual([i for name, i in log if name == c.name], [0, 1, 2])
+            self.assertEqual(len(c.timings), 3)
+        # More than one session is open before the first one finishes
+        first_done = log.index(("c0", 2))
+        self.assertIn(("c1", 0), log[:first_done])
+
+    def test_failed_step_drops_remaining_steps(self):
+        log = []
+        failing = FakeConversation("bad", 3, log, fail_at=1)
+        healthy = FakeConversation("good", 2, log)
+
+        scheduler = TurnScheduler(workers=1)
+        asyncio.run(scheduler.run([failing, healthy]))
+
+        self.assertIsInstance(failing.error, RuntimeError)
+        self.assertNotIn(("bad", 2), log)
+        self.assertEqual(scheduler.summary()["steps"], 4)
+
+    def test_open_sessions_are_served_before_new_ones(self):
+        log = []
+        conversations = [FakeConversation(f"c{i}", 2, log) for i in range(3)]
+
+        asyncio.run(TurnScheduler(workers=1).run(conversations))
+
+        self.assertEqual(log, [("c0", 0), ("c0", 1), ("c1", 0), ("c1", 1), ("c2", 0), ("c2", 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()